@@ -0,0 +1,81 @@
+"""
+Fixtures for the luxin benchmark suite.
+
+Run with pytest-benchmark (``pip install -e .[bench]``)::
+
+    pytest benchmarks                          # 10k rows
+    pytest benchmarks --bench-scale medium     # 1M rows
+    pytest benchmarks --bench-scale large      # 10M rows, needs several GB
+    
+Every benchmark also records the peak Python memory of one call
+(tracemalloc) as ``peak_memory_mb`` in its extra info. Save a baseline with
+``--benchmark-autosave`` and compare against it with
+``--benchmark-compare --benchmark-compare-fail=mean:10%``.
+"""
+
+import tracemalloc
+from typing import Any, Callable
+
+import pytest
+
+from datagen import GROUP_COUNTS, SCALES, make_aggregate, make_detail
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    # Benchmarks need pytest-benchmark (pip install -e .[bench])
+    collect_ignore_glob = ['test_*.py']
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--bench-scale',
+        default='small',
+        choices=sorted(SCALES),
+        help="Detail rows in the benchmark data: small (10k), medium (1M) or large (10M)",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if 'n_groups' in metafunc.fixturenames:
+        n_rows = SCALES[metafunc.config.getoption('--bench-scale')]
+        counts = [n_groups for n_groups in GROUP_COUNTS if n_groups <= n_rows]
+        metafunc.parametrize('n_groups', counts, ids=[f'{n:,}groups' for n in counts], scope='module')
+
+
+@pytest.fixture(scope='module')
+def n_rows(request):
+    return SCALES[request.config.getoption('--bench-scale')]
+
+
+@pytest.fixture(scope='module')
+def detail_df(n_rows, n_groups):
+    return make_detail(n_rows, n_groups)
+
+
+@pytest.fixture(scope='module')
+def aggregate(detail_df):
+    """Aggregated TrackedDataFrame and its source mapping."""
+    return make_aggregate(detail_df)
+
+
+@pytest.fixture
+def measure(benchmark) -> Callable[..., Any]:
+    """
+    Benchmark a call and record its peak memory.
+    
+    The call runs once under tracemalloc (untimed), then is timed by
+    pytest-benchmark.
+    """
+    
+    def _measure(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info['peak_memory_mb'] = round(peak / 1e6, 2)
+        return benchmark(func, *args, **kwargs)
+    
+    return _measure
@@ -0,0 +1,59 @@
+"""
+Synthetic data for the luxin benchmarks.
+
+Frames are deterministic for a given size, so timings from different runs
+and machines compare the same work.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from luxin import TrackedDataFrame
+
+# Detail rows per benchmark scale (select with --bench-scale)
+SCALES = {
+    'small': 10_000,
+    'medium': 1_000_000,
+    'large': 10_000_000,
+}
+
+# Group counts benchmarked at every scale (capped at the number of rows)
+GROUP_COUNTS = (10, 1_000, 1_000_000)
+
+
+def make_detail(n_rows: int, n_groups: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Build a detail DataFrame with ``n_groups`` groups.
+    
+    Args:
+        n_rows: Number of rows
+        n_groups: Number of distinct ``group`` values (every group gets rows)
+        seed: Random seed
+        
+    Returns:
+        DataFrame with a ``group`` key, a low-cardinality ``region``
+        column, numeric ``units`` and ``price`` and a ``note`` text column
+    """
+    rng = np.random.default_rng(seed)
+    groups = np.concatenate([np.arange(n_groups), rng.integers(0, n_groups, n_rows - n_groups)])
+    rng.shuffle(groups)
+    return pd.DataFrame({
+        'group': groups,
+        'region': pd.Categorical.from_codes(rng.integers(0, 4, n_rows), ['North', 'South', 'East', 'West']),
+        'units': rng.integers(1, 100, n_rows),
+        'price': rng.random(n_rows) * 100,
+        'note': pd.Categorical.from_codes(rng.integers(0, 1000, n_rows), [f'note {i}' for i in range(1000)]),
+    })
+
+
+def make_aggregate(detail_df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[Any, List[int]]]:
+    """
+    Aggregate a detail frame by ``group`` with source tracking.
+    
+    Returns:
+        Tuple of (aggregated TrackedDataFrame, its source mapping)
+    """
+    agg = TrackedDataFrame(detail_df).groupby('group').agg({'units': 'sum', 'price': 'mean'})
+    return agg, agg._source_mapping
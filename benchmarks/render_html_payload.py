@@ -0,0 +1,67 @@
+"""
+Compare the size and render time of the drill-down HTML payload.
+
+The row-oriented encoding used before the columnar payload (one pretty-printed
+JSON object per detail row, keyed by index label) is rebuilt here as the
+baseline.
+
+Usage:
+    python benchmarks/render_html_payload.py [n_rows]
+"""
+
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from luxin.display import render_html
+
+
+def make_frames(n_rows: int):
+    """Build a detail frame, its aggregate and source mapping."""
+    rng = np.random.default_rng(0)
+    detail_df = pd.DataFrame({
+        'region': rng.choice(['North', 'South', 'East', 'West'], n_rows),
+        'product': rng.choice([f'product-{i}' for i in range(50)], n_rows),
+        'units': rng.integers(1, 100, n_rows),
+        'price': rng.random(n_rows) * 100,
+    })
+    grouped = detail_df.groupby(['region', 'product'])
+    agg_df = grouped.agg({'units': 'sum', 'price': 'mean'})
+    source_mapping = {key: list(labels) for key, labels in grouped.groups.items()}
+    return agg_df, detail_df, source_mapping
+
+
+def legacy_payload(detail_df: pd.DataFrame, source_mapping) -> int:
+    """Size in bytes of the row-oriented encoding."""
+    mapping = {'|'.join(map(str, key)): [str(label) for label in labels]
+               for key, labels in source_mapping.items()}
+    rows = {str(label): row for label, row in detail_df.to_dict('index').items()}
+    return len(json.dumps(mapping, indent=2)) + len(json.dumps(rows, indent=2, default=str))
+
+
+def main(n_rows: int) -> None:
+    agg_df, detail_df, source_mapping = make_frames(n_rows)
+    
+    start = time.perf_counter()
+    legacy_bytes = legacy_payload(detail_df, source_mapping)
+    legacy_seconds = time.perf_counter() - start
+    
+    print(f"detail rows:          {n_rows:,}")
+    print(f"row-oriented JSON:    {legacy_bytes / 1e6:8.2f} MB  {legacy_seconds:6.2f} s (payload only)")
+    
+    for compression in (None, 'deflate'):
+        start = time.perf_counter()
+        html = render_html(
+            agg_df, detail_df, source_mapping, ['region', 'product'],
+            max_payload_bytes=None, compression=compression
+        )
+        seconds = time.perf_counter() - start
+        label = f"columnar ({compression or 'plain'}):"
+        print(f"{label:<22}{len(html) / 1e6:8.2f} MB  {seconds:6.2f} s (full render_html)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
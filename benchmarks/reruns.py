@@ -0,0 +1,229 @@
+"""
+Scripted Inspector.render() sessions measured rerun by rerun.
+
+Each interaction (load, filter, select a row, page, export) triggers one
+Streamlit rerun, run headless and offline with ``streamlit.testing.v1.AppTest``.
+For every rerun the harness records the latency, the peak Python memory
+allocated (tracemalloc) and how many times each luxin stage ran
+(``luxin.perf`` spans), so a stage that starts running on every click
+shows up in the counts.
+
+Every interaction checks that it took effect (the table was filtered, the
+page changed, ...), so a broken widget fails the run instead of timing a
+rerun that did nothing.
+
+Usage:
+    python benchmarks/reruns.py [n_rows]
+"""
+
+import re
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from streamlit.testing.v1 import AppTest
+
+from luxin import perf
+
+# Seconds a single rerun may take before AppTest gives up
+RERUN_TIMEOUT = 600
+
+
+def _inspector_app(n_rows: int, n_groups: int) -> None:
+    """Streamlit script rendering an Inspector over synthetic data."""
+    import streamlit as st
+    from datagen import make_aggregate, make_detail
+    from luxin import Inspector
+    
+    @st.cache_resource
+    def load(n_rows: int, n_groups: int):
+        return make_aggregate(make_detail(n_rows, n_groups))[0]
+    
+    Inspector(load(n_rows, n_groups)).render()
+
+
+@dataclass
+class RerunStats:
+    """
+    Measurements of one rerun.
+    
+    Attributes:
+        step: Interaction that triggered the rerun
+        seconds: Wall-clock latency of the rerun
+        peak_bytes: Peak memory allocated during the rerun
+        stages: Number of times each luxin stage (span name) ran
+    """
+    step: str
+    seconds: float
+    peak_bytes: int
+    stages: Dict[str, int] = field(default_factory=dict)
+
+
+class InspectorSession:
+    """
+    A scripted browser session of ``Inspector.render()``.
+    
+    Groups hold about 1,000 detail rows each, so a selected group has
+    several detail pages. Each interaction raises RuntimeError if the app
+    fails or the interaction has no visible effect.
+    
+    Args:
+        n_rows: Detail rows in the synthetic data
+    """
+    
+    def __init__(self, n_rows: int) -> None:
+        self.n_rows = n_rows
+        self.n_groups = max(10, n_rows // 1000)
+        self.total_rows = 0
+        self.at = AppTest.from_function(
+            _inspector_app, args=(n_rows, self.n_groups), default_timeout=RERUN_TIMEOUT
+        )
+    
+    def load(self) -> None:
+        """Open the app."""
+        self._run(self.at.run)
+        self.total_rows = self.table_rows()
+        self._expect(self.total_rows == self.n_groups, f"table shows {self.total_rows} of {self.n_groups} groups")
+    
+    def filter(self, text: str) -> None:
+        """Type into the search box."""
+        self._run(self.at.text_input[0].input(text).run)
+        rows = self.table_rows()
+        if text:
+            self._expect(0 < rows < self.total_rows, f"search {text!r} left {rows} of {self.total_rows} rows")
+        else:
+            self._expect(rows == self.total_rows, f"clearing the search left {rows} of {self.total_rows} rows")
+    
+    def narrowing_filter(self) -> str:
+        """Search text matching some but not all rows: the first row's mean price."""
+        return str(self.at.dataframe[0].value['price'].iloc[0])
+    
+    def select_row(self, row: int) -> None:
+        """Select an aggregated row (an empty selection for -1)."""
+        key = self.at.dataframe[0].key
+        self.at.session_state[key] = {'selection': {'rows': [] if row < 0 else [row], 'columns': []}}
+        self._run(self.at.run)
+        shown = any(caption.value.startswith('Found ') for caption in self.at.caption)
+        self._expect(shown == (row >= 0), f"detail rows {'not ' if row >= 0 else ''}shown after selecting {row}")
+    
+    def page(self) -> Optional[int]:
+        """Current detail page, from the "Page N of M" caption (None without paging)."""
+        for caption in self.at.caption:
+            match = re.fullmatch(r'Page (\d+) of \d+', caption.value)
+            if match:
+                return int(match.group(1))
+        return None
+    
+    def next_page(self) -> None:
+        """Go to the next detail page."""
+        self._turn_page('Next ▶', 1)
+    
+    def previous_page(self) -> None:
+        """Go to the previous detail page."""
+        self._turn_page('◀ Previous', -1)
+    
+    def prepare_export(self) -> None:
+        """Ask for the selected group's exports."""
+        before = self.download_buttons()
+        self._click('Prepare export')
+        self._expect(self.download_buttons() > before, "no download buttons after preparing the export")
+    
+    def discard_export(self) -> None:
+        """Drop the prepared exports, if any, so the next one is prepared again."""
+        if any(button.label == 'Discard export' for button in self.at.button):
+            before = self.download_buttons()
+            self._click('Discard export')
+            self._expect(self.download_buttons() < before, "download buttons left after discarding the export")
+    
+    def download_buttons(self) -> int:
+        """Number of download buttons shown."""
+        return len(self.at.get('download_button'))
+    
+    def table_rows(self) -> int:
+        """Number of rows in the aggregated table."""
+        return len(self.at.dataframe[0].value)
+    
+    def _turn_page(self, label: str, step: int) -> None:
+        before = self.page()
+        self._expect(before is not None, "the selected group has a single page")
+        self._click(label)
+        after = self.page()
+        self._expect(after == before + step, f"{label!r} went from page {before} to {after}")
+    
+    def _click(self, label: str) -> None:
+        """Click the button with this label (e.g. ``'Next ▶'``)."""
+        button = next((b for b in self.at.button if b.label == label), None)
+        self._expect(button is not None and not button.disabled, f"no enabled {label!r} button")
+        self._run(button.click().run)
+    
+    def _run(self, rerun: Callable[[], object]) -> None:
+        rerun()
+        if self.at.exception:
+            raise RuntimeError(f"Rerun failed: {self.at.exception[0].message}")
+    
+    @staticmethod
+    def _expect(condition: bool, problem: str) -> None:
+        if not condition:
+            raise RuntimeError(f"Interaction had no effect: {problem}")
+
+
+def measure(step: str, rerun: Callable[[], None]) -> RerunStats:
+    """
+    Run one rerun and measure it.
+    
+    Args:
+        step: Name of the interaction
+        rerun: Function performing the interaction
+        
+    Returns:
+        Measurements of the rerun
+    """
+    buffer = perf.RingBufferSink(capacity=100_000)
+    perf.enable(buffer)
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        rerun()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        perf.disable()
+    stages = Counter(record.name for record in buffer.records())
+    return RerunStats(step, seconds, peak, dict(sorted(stages.items())))
+
+
+def run_session(n_rows: int) -> List[RerunStats]:
+    """
+    Script a full session and measure every rerun.
+    
+    Returns:
+        Measurements in interaction order
+    """
+    session = InspectorSession(n_rows)
+    steps = [
+        ('load', session.load),
+        ('filter', lambda: session.filter(session.narrowing_filter())),
+        ('clear filter', lambda: session.filter('')),
+        ('select row', lambda: session.select_row(0)),
+        ('next page', session.next_page),
+        ('previous page', session.previous_page),
+        ('export detail', session.prepare_export),
+        ('select other row', lambda: session.select_row(1)),
+    ]
+    return [measure(step, rerun) for step, rerun in steps]
+
+
+def main(n_rows: int) -> None:
+    print(f"detail rows: {n_rows:,}")
+    print(f"{'rerun':<18}{'ms':>10}{'peak MB':>10}  stages")
+    for stats in run_session(n_rows):
+        stages = ', '.join(f'{name}×{count}' for name, count in stats.stages.items())
+        print(f"{stats.step:<18}{stats.seconds * 1000:>10.1f}{stats.peak_bytes / 1e6:>10.2f}  {stages}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,121 @@
+"""
+Benchmarks of luxin's hot paths: aggregation tracking, source mappings,
+HTML rendering, filtering and detail lookup.
+"""
+
+import timeit
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+from luxin import TrackedDataFrame
+from luxin.components.detail_panel import gather_detail_rows
+from luxin.components.filters import FilterPlan
+from luxin.display import render_html
+from luxin.drill_table import _build_source_mapping
+from luxin.indexes import clear_index_cache
+from luxin.utils import optimize_source_mapping
+from luxin.validation import validate_source_mapping
+
+# _build_source_mapping scans the detail frame once per group
+_MAX_MAPPING_SCAN = 2_000_000_000
+
+# Slack allowed for timing noise when comparing two implementations
+_TIMING_TOLERANCE = 1.2
+
+
+def test_tracked_groupby_agg(measure, detail_df):
+    tracked = TrackedDataFrame(detail_df)
+    measure(lambda: tracked.groupby('group').agg({'units': 'sum', 'price': 'mean'}))
+
+
+def test_build_source_mapping(measure, detail_df, n_groups):
+    if len(detail_df) * n_groups > _MAX_MAPPING_SCAN:
+        pytest.skip("scans the detail frame once per group")
+    agg_df = pd.DataFrame(detail_df).groupby('group').agg({'units': 'sum'})
+    measure(_build_source_mapping, agg_df, detail_df, ['group'])
+
+
+def test_optimize_source_mapping(measure, aggregate):
+    _, source_mapping = aggregate
+    measure(optimize_source_mapping, source_mapping)
+
+
+def _with_duplicates(source_mapping):
+    """The mapping with each group's first label repeated at its end, so every group needs sorting."""
+    return {key: labels + labels[:1] for key, labels in source_mapping.items()}
+
+
+def test_optimize_source_mapping_duplicates(measure, aggregate):
+    _, source_mapping = aggregate
+    measure(optimize_source_mapping, _with_duplicates(source_mapping))
+
+
+@pytest.mark.parametrize('duplicates', [False, True], ids=['sorted', 'duplicates'])
+def test_optimize_source_mapping_vs_sorting_groups(aggregate, duplicates):
+    """Never slower than sorting every group, up to 1,000,000 groups (--bench-scale medium)."""
+    _, source_mapping = aggregate
+    if duplicates:
+        source_mapping = _with_duplicates(source_mapping)
+    
+    def sort_groups():
+        return {key: sorted(set(labels)) for key, labels in source_mapping.items()}
+    
+    assert optimize_source_mapping(source_mapping) == sort_groups()
+    optimized = min(timeit.repeat(lambda: optimize_source_mapping(source_mapping), number=1, repeat=5))
+    sorted_groups = min(timeit.repeat(sort_groups, number=1, repeat=5))
+    assert optimized <= sorted_groups * _TIMING_TOLERANCE
+
+
+def test_validate_source_mapping(measure, detail_df, aggregate):
+    agg, source_mapping = aggregate
+    measure(validate_source_mapping, source_mapping, agg, detail_df)
+
+
+def test_render_html(measure, detail_df, aggregate):
+    agg, source_mapping = aggregate
+    measure(render_html, agg, detail_df, source_mapping, ['group'], table_id='bench')
+
+
+def test_render_html_compressed(measure, detail_df, aggregate):
+    agg, source_mapping = aggregate
+    measure(render_html, agg, detail_df, source_mapping, ['group'], compression='deflate', table_id='bench')
+
+
+def _filter_plan() -> FilterPlan:
+    """The filters a user would set in render_filters: search, category and range."""
+    return FilterPlan(search='note 12', categories={'region': ['North']}, ranges={'price': (10.0, 20.0)})
+
+
+def test_filter_plan_cold(benchmark, detail_df):
+    """Filtering with the frame indexes built from scratch."""
+    plan = _filter_plan()
+    clear_index_cache()
+    tracemalloc.start()
+    try:
+        plan.positions(detail_df)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info['peak_memory_mb'] = round(peak / 1e6, 2)
+    benchmark.pedantic(plan.positions, args=(detail_df,), setup=clear_index_cache, rounds=5)
+
+
+def test_filter_plan_new_filter(measure, detail_df):
+    """Changing a filter on a rerun: indexes cached, result not."""
+    clear_index_cache()
+    _filter_plan().positions(detail_df)
+    bounds = iter(range(10 ** 9))
+    
+    def _rerun():
+        low = next(bounds) % 50
+        FilterPlan(categories={'region': ['North']}, ranges={'price': (low, low + 10.0)}).positions(detail_df)
+    
+    measure(_rerun)
+
+
+def test_detail_lookup(measure, detail_df, aggregate):
+    _, source_mapping = aggregate
+    labels = max(source_mapping.values(), key=len)
+    measure(gather_detail_rows, detail_df, labels)
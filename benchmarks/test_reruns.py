@@ -0,0 +1,65 @@
+"""
+Benchmarks of Streamlit reruns of Inspector.render(), one per interaction.
+
+Each benchmark records the peak memory of one rerun (``peak_memory_mb``)
+and the luxin stages it ran (``stages``) in its extra info.
+"""
+
+import pytest
+
+from reruns import InspectorSession, measure
+
+# Timed reruns per interaction
+ROUNDS = 5
+
+
+@pytest.fixture(scope='module')
+def session(n_rows):
+    session = InspectorSession(n_rows)
+    session.load()
+    return session
+
+
+def _bench(benchmark, step, rerun, setup=None):
+    """Time ``rerun`` (after an untimed ``setup``) and record one measured rerun."""
+    if setup is not None:
+        setup()
+    stats = measure(step, rerun)
+    benchmark.extra_info['peak_memory_mb'] = round(stats.peak_bytes / 1e6, 2)
+    benchmark.extra_info['stages'] = stats.stages
+    benchmark.pedantic(rerun, setup=setup, rounds=ROUNDS)
+
+
+def test_rerun_load(benchmark, n_rows):
+    sessions = []
+    _bench(
+        benchmark, 'load',
+        lambda: sessions[-1].load(),
+        setup=lambda: sessions.append(InspectorSession(n_rows)),
+    )
+
+
+def test_rerun_filter(benchmark, session):
+    text = session.narrowing_filter()
+    _bench(benchmark, 'filter', lambda: session.filter(text), setup=lambda: session.filter(''))
+
+
+def test_rerun_select_row(benchmark, session):
+    _bench(benchmark, 'select row', lambda: session.select_row(0), setup=lambda: session.select_row(-1))
+
+
+def test_rerun_next_page(benchmark, session):
+    def setup():
+        session.select_row(0)
+        if session.page() != 1:
+            session.previous_page()
+    
+    _bench(benchmark, 'next page', session.next_page, setup=setup)
+
+
+def test_rerun_export(benchmark, session):
+    def setup():
+        session.select_row(0)
+        session.discard_export()
+    
+    _bench(benchmark, 'export detail', session.prepare_export, setup=setup)
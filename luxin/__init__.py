@@ -6,6 +6,7 @@ from luxin.inspector import Inspector
 from luxin.tracked_df import TrackedDataFrame
 from luxin.drill_table import create_drill_table
 from luxin.polars_support import create_tracked_from_polars, convert_polars_to_pandas, is_polars_dataframe
+from luxin.report import export_report
 import warnings
 
 __version__ = "0.2.0"
@@ -15,12 +16,18 @@ __all__ = [
     "create_drill_table",
     "create_tracked_from_polars",
     "convert_polars_to_pandas",
-    "is_polars_dataframe"
+    "is_polars_dataframe",
+    "export_report",
+    "init_notebook"
 ]
 
 
 def __getattr__(name):
-    """Handle deprecated imports with warnings."""
+    """Handle lazily imported and deprecated names."""
+    if name == "init_notebook":
+        # Imported on first use so plain Streamlit apps do not load the Jupyter backend
+        from luxin.jupyter_backend import init_notebook
+        return init_notebook
     if name == "show_drill_table":
         warnings.warn(
             "show_drill_table is deprecated. Use Inspector(df).render() instead.",
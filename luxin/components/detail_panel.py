@@ -2,64 +2,125 @@
 Detail panel component for displaying individual row details.
 """
 
+import hashlib
+import numpy as np
 import pandas as pd
 import streamlit as st
-from typing import List, Optional
+from typing import Any, List, Optional, Sequence
+from luxin import perf
+from luxin.utils import frame_fingerprint, get_index_resolver
+
+# Session state key holding the page keys in use, least recently used first
+PAGE_REGISTRY_KEY = "luxin_detail_pages"
+
+# Number of groups whose page position is remembered per session
+MAX_TRACKED_PAGES = 32
+
+
+@perf.timed('detail.gather')
+def gather_detail_rows(detail_df: pd.DataFrame, labels: Sequence[Any]) -> pd.DataFrame:
+    """
+    Gather the detail rows with the given index labels.
+    
+    Args:
+        detail_df: The detail DataFrame
+        labels: Index labels of the rows to gather, in display order
+        
+    Returns:
+        DataFrame holding only the requested rows
+    """
+    resolver = get_index_resolver(detail_df.index)
+    if resolver.is_unique:
+        positions = resolver.positions(labels)
+        if (positions >= 0).all():
+            return detail_df.take(positions)
+    # Duplicate or missing labels: keep .loc semantics (and its KeyError)
+    return detail_df.loc[list(labels)]
 
 
 def render_detail_panel(
     detail_rows: pd.DataFrame,
     title: str = "Detail Rows",
     height: int = 300,
-    page_size: int = 100
+    page_size: int = 100,
+    detail_indices: Optional[Sequence[Any]] = None,
+    state_key: Optional[str] = None
 ) -> None:
     """
     Render a detail panel showing individual rows with pagination.
     
+    When ``detail_indices`` is given, ``detail_rows`` is the full detail
+    DataFrame and only the rows of the current page are gathered from it,
+    so large groups are never materialized as a whole.
+    
     Args:
-        detail_rows: DataFrame containing the detail rows to display
+        detail_rows: DataFrame containing the detail rows to display, or the
+            full detail DataFrame when ``detail_indices`` is given
         title: Title for the detail panel
         height: Height of the dataframe display in pixels
         page_size: Number of rows per page (for pagination)
+        detail_indices: Optional index labels of the rows to display
+        state_key: Stable identifier for this panel's pagination state, such
+            as the aggregate fingerprint plus the group key. Derived from the
+            rows when None.
     """
+    total_rows = len(detail_rows) if detail_indices is None else len(detail_indices)
+    
     st.subheader(f"🔍 {title}")
-    st.caption(f"Total: {len(detail_rows)} row(s)")
+    st.caption(f"Total: {total_rows} row(s)")
     
     # Add pagination for large datasets
-    if len(detail_rows) > page_size:
-        total_pages = (len(detail_rows) + page_size - 1) // page_size
-        page_key = f"detail_page_{id(detail_rows)}"
+    if total_rows > page_size:
+        total_pages = (total_rows + page_size - 1) // page_size
+        if state_key is None:
+            state_key = _default_state_key(detail_rows, detail_indices)
+        page_key = f"detail_page_{state_key}"
+        _track_page_key(page_key)
         
-        if page_key not in st.session_state:
-            st.session_state[page_key] = 1
+        input_key = f"{page_key}_input"
+        # The group may have shrunk since the page was stored
+        current = min(st.session_state.get(page_key, 1), total_pages)
+        st.session_state[page_key] = current
+        # The input widget reads its value from its own state key
+        st.session_state[input_key] = min(st.session_state.get(input_key, current), total_pages)
         
         col1, col2, col3 = st.columns([1, 2, 1])
         with col1:
-            if st.button("◀ Previous", disabled=st.session_state[page_key] == 1, key=f"{page_key}_prev"):
-                st.session_state[page_key] = max(1, st.session_state[page_key] - 1)
-                st.rerun()
+            st.button(
+                "◀ Previous",
+                disabled=current == 1,
+                key=f"{page_key}_prev",
+                on_click=_set_page,
+                args=(page_key, max(1, current - 1))
+            )
         
         with col2:
             page = st.number_input(
                 "Page",
                 min_value=1,
                 max_value=total_pages,
-                value=st.session_state[page_key],
-                key=f"{page_key}_input",
-                on_change=lambda: st.session_state.update({page_key: st.session_state[f"{page_key}_input"]})
+                key=input_key,
+                on_change=_sync_page_from_input,
+                args=(page_key,)
             )
-            st.session_state[page_key] = page
             st.caption(f"Page {page} of {total_pages}")
         
         with col3:
-            if st.button("Next ▶", disabled=st.session_state[page_key] == total_pages, key=f"{page_key}_next"):
-                st.session_state[page_key] = min(total_pages, st.session_state[page_key] + 1)
-                st.rerun()
+            st.button(
+                "Next ▶",
+                disabled=current == total_pages,
+                key=f"{page_key}_next",
+                on_click=_set_page,
+                args=(page_key, min(total_pages, current + 1))
+            )
         
         # Get page slice
-        start_idx = (st.session_state[page_key] - 1) * page_size
+        start_idx = (page - 1) * page_size
         end_idx = start_idx + page_size
-        paginated_rows = detail_rows.iloc[start_idx:end_idx]
+        if detail_indices is None:
+            paginated_rows = detail_rows.iloc[start_idx:end_idx]
+        else:
+            paginated_rows = gather_detail_rows(detail_rows, detail_indices[start_idx:end_idx])
         
         st.dataframe(
             paginated_rows,
@@ -68,9 +129,53 @@ def render_detail_panel(
         )
     else:
         # No pagination needed
+        if detail_indices is not None:
+            detail_rows = gather_detail_rows(detail_rows, detail_indices)
         st.dataframe(
             detail_rows,
             use_container_width=True,
             height=height
         )
 
+
+def _set_page(page_key: str, page: int) -> None:
+    """Button callback: go to ``page``, keeping the page input in sync."""
+    st.session_state[page_key] = page
+    st.session_state[f"{page_key}_input"] = page
+
+
+def _sync_page_from_input(page_key: str) -> None:
+    """Page input callback: go to the page typed in."""
+    st.session_state[page_key] = st.session_state[f"{page_key}_input"]
+
+
+def _default_state_key(detail_rows: pd.DataFrame, detail_indices: Optional[Sequence[Any]]) -> str:
+    """Derive a pagination state key from the displayed rows."""
+    if detail_indices is None:
+        return frame_fingerprint(detail_rows)
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(repr((len(detail_rows), len(detail_indices))).encode())
+    hasher.update(pd.util.hash_array(np.asarray(detail_indices, dtype=object)).tobytes())
+    return hasher.hexdigest()
+
+
+def _track_page_key(page_key: str) -> None:
+    """
+    Mark a page key as recently used and evict the least recently used ones.
+    
+    Keeps pagination state for at most MAX_TRACKED_PAGES groups so long
+    sessions that click through many groups do not grow without bound.
+    """
+    registry = st.session_state.get(PAGE_REGISTRY_KEY)
+    if not isinstance(registry, list):
+        registry = []
+    if page_key in registry:
+        registry.remove(page_key)
+    registry.append(page_key)
+    
+    while len(registry) > MAX_TRACKED_PAGES:
+        stale_key = registry.pop(0)
+        for key in (stale_key, f"{stale_key}_input", f"{stale_key}_prev", f"{stale_key}_next"):
+            st.session_state.pop(key, None)
+    
+    st.session_state[PAGE_REGISTRY_KEY] = registry
@@ -4,60 +4,159 @@ Export functionality for DataFrames.
 
 import pandas as pd
 import streamlit as st
-from typing import Optional
+from typing import Callable, IO, Optional, Sequence, Union
 import io
+import tempfile
+from luxin import perf
+from luxin.utils import DEFAULT_CHUNK_SIZE, iter_chunks
 
+# Supported export formats, in button order
+EXPORT_FORMATS = ('csv', 'json', 'excel')
 
-def render_export_buttons(df: pd.DataFrame, filename_prefix: str = "data") -> None:
+# CSV exports larger than this are spooled to a temporary file while written
+CSV_SPOOL_BYTES = 16 * 1024 * 1024
+
+
+def write_csv(
+    df: pd.DataFrame,
+    buffer: IO[bytes],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = 'utf-8'
+) -> None:
+    """
+    Write a DataFrame as CSV (without its index), one chunk at a time.
+    
+    Apart from what ``buffer`` keeps, only one chunk's CSV text is held in
+    memory at a time, so writing to a file keeps memory bounded.
+    
+    Args:
+        df: DataFrame to write
+        buffer: Binary file-like object to write to
+        chunk_size: Rows serialized at a time
+        encoding: Text encoding of the output
+    """
+    def to_csv(chunk: pd.DataFrame) -> bytes:
+        return chunk.to_csv(index=False, header=False).encode(encoding)
+    
+    buffer.write(df.iloc[:0].to_csv(index=False).encode(encoding))
+    for text in iter_chunks(df, chunk_size, transform=to_csv):
+        buffer.write(text)
+
+
+def render_export_buttons(
+    df: Union[pd.DataFrame, Callable[[], pd.DataFrame]],
+    filename_prefix: str = "data",
+    key: Optional[str] = None,
+    formats: Sequence[str] = EXPORT_FORMATS
+) -> None:
     """
     Render export buttons for DataFrame.
     
+    If ``df`` is a callable, nothing is serialized until the user asks for
+    an export; the callable is then invoked to produce the DataFrame on
+    every rerun until the user discards the export.
+    
     Args:
-        df: The DataFrame to export
+        df: The DataFrame to export, or a zero-argument callable returning it
         filename_prefix: Prefix for downloaded file names
+        key: Widget key for the "Prepare export" button used with a callable
+            ``df``, also prefixing the session state key of its prepared
+            flag; must be stable across reruns (defaults to one derived
+            from ``filename_prefix``)
+        formats: Export formats to offer, among ``EXPORT_FORMATS``
+        
+    Raises:
+        ValueError: If a format is not supported
     """
+    unsupported = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unsupported:
+        raise ValueError(
+            f"Unsupported export format(s) {unsupported}. "
+            f"Supported: {', '.join(EXPORT_FORMATS)}"
+        )
+    if not formats:
+        return
+    
     st.subheader("📥 Export Data")
     
-    col1, col2, col3 = st.columns(3)
+    if callable(df):
+        prepare_key = key if key is not None else f"export_prepare_{filename_prefix}"
+        # Prepared exports stay available across reruns until discarded
+        prepared_key = f"{prepare_key}_prepared"
+        if not st.session_state.get(prepared_key, False):
+            st.button("Prepare export", key=prepare_key, on_click=_set_prepared, args=(prepared_key, True))
+            st.caption("Exports are generated on request.")
+            return
+        st.button("Discard export", key=f"{prepare_key}_discard", on_click=_set_prepared, args=(prepared_key, False))
+        df = df()
     
-    with col1:
-        # CSV export
-        csv = df.to_csv(index=False)
-        st.download_button(
-            label="📄 Download CSV",
-            data=csv,
-            file_name=f"{filename_prefix}.csv",
-            mime="text/csv",
-            key=f"export_csv_{id(df)}"
-        )
+    columns = dict(zip(formats, st.columns(len(formats))))
     
-    with col2:
-        # JSON export
-        json_str = df.to_json(orient='records', indent=2)
-        st.download_button(
-            label="📋 Download JSON",
-            data=json_str,
-            file_name=f"{filename_prefix}.json",
-            mime="application/json",
-            key=f"export_json_{id(df)}"
-        )
+    if 'csv' in columns:
+        with columns['csv']:
+            _render_csv_button(df, filename_prefix)
     
-    with col3:
-        # Excel export (if openpyxl is available)
-        try:
-            import openpyxl
-            excel_buffer = io.BytesIO()
+    if 'json' in columns:
+        with columns['json']:
+            _render_json_button(df, filename_prefix)
+    
+    if 'excel' in columns:
+        with columns['excel']:
+            _render_excel_button(df, filename_prefix)
+
+
+def _set_prepared(prepared_key: str, prepared: bool) -> None:
+    """Button callback marking a lazy export as prepared or discarded."""
+    st.session_state[prepared_key] = prepared
+
+
+def _render_csv_button(df: pd.DataFrame, filename_prefix: str) -> None:
+    """Render the CSV download button."""
+    # Large exports are written to disk, so the CSV is only held in memory
+    # once: as the bytes handed to Streamlit
+    with tempfile.SpooledTemporaryFile(max_size=CSV_SPOOL_BYTES) as csv_file:
+        with perf.span('export.csv', rows=len(df)):
+            write_csv(df, csv_file)
+        csv_file.seek(0)
+        csv_data = csv_file.read()
+    st.download_button(
+        label="📄 Download CSV",
+        data=csv_data,
+        file_name=f"{filename_prefix}.csv",
+        mime="text/csv",
+        key=f"export_csv_{id(df)}"
+    )
+
+
+def _render_json_button(df: pd.DataFrame, filename_prefix: str) -> None:
+    """Render the JSON download button."""
+    with perf.span('export.json', rows=len(df)):
+        json_str = df.to_json(orient='records', indent=2)
+    st.download_button(
+        label="📋 Download JSON",
+        data=json_str,
+        file_name=f"{filename_prefix}.json",
+        mime="application/json",
+        key=f"export_json_{id(df)}"
+    )
+
+
+def _render_excel_button(df: pd.DataFrame, filename_prefix: str) -> None:
+    """Render the Excel download button (if openpyxl is available)."""
+    try:
+        import openpyxl
+        excel_buffer = io.BytesIO()
+        with perf.span('export.excel', rows=len(df)):
             with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
                 df.to_excel(writer, index=False, sheet_name='Data')
-            excel_buffer.seek(0)
-            
-            st.download_button(
-                label="📊 Download Excel",
-                data=excel_buffer,
-                file_name=f"{filename_prefix}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                key=f"export_excel_{id(df)}"
-            )
-        except ImportError:
-            st.info("💡 Install openpyxl for Excel export: `pip install openpyxl`")
-
+        excel_buffer.seek(0)
+        
+        st.download_button(
+            label="📊 Download Excel",
+            data=excel_buffer,
+            file_name=f"{filename_prefix}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key=f"export_excel_{id(df)}"
+        )
+    except ImportError:
+        st.info("💡 Install openpyxl for Excel export: `pip install openpyxl`")
@@ -2,62 +2,201 @@
 Filtering component for aggregated data tables.
 """
 
+import numpy as np
 import pandas as pd
 import streamlit as st
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Tuple
+from luxin import perf
+from luxin.indexes import (
+    get_frame_index,
+    mask_to_bitmap,
+    positions_to_bitmap,
+    bitmap_to_positions,
+)
+from luxin.utils import _column_position
 
+# By default, columns with more distinct values than this get no multiselect filter
+MAX_FILTER_CARDINALITY = 50
 
-def render_filters(df: pd.DataFrame, key_prefix: str = "luxin_filter") -> pd.DataFrame:
+
+@dataclass
+class FilterPlan:
+    """
+    A compiled set of filters that can be applied to any matching DataFrame.
+    
+    The plan is plain data, so it can be stored in ``st.session_state``,
+    reused across reruns and applied to new data with the same columns.
+    Every active filter contributes a row bitmap from the cached frame
+    indexes; the bitmaps are ANDed and the frame is materialized once.
+    
+    Attributes:
+        search: Case-insensitive text that must appear in some column
+        categories: Column label -> values to keep
+        ranges: Column label -> inclusive (low, high) bounds to keep
+    """
+    search: str = ''
+    categories: Dict[Any, List[Any]] = field(default_factory=dict)
+    ranges: Dict[Any, Tuple[float, float]] = field(default_factory=dict)
+    
+    @property
+    def is_empty(self) -> bool:
+        """Whether the plan keeps every row."""
+        return not self.search and not any(self.categories.values()) and not self.ranges
+    
+    def cache_key(self) -> str:
+        """Key identifying this plan's filters, for result caching."""
+        return repr((
+            self.search.lower(),
+            sorted((repr(col), repr(list(values))) for col, values in self.categories.items() if values),
+            sorted((repr(col), repr(tuple(bounds))) for col, bounds in self.ranges.items()),
+        ))
+    
+    def positions(
+        self,
+        df: pd.DataFrame,
+        fingerprint: Optional[str] = None,
+        max_cardinality: int = MAX_FILTER_CARDINALITY
+    ) -> Optional[np.ndarray]:
+        """
+        Compute the positions of the rows this plan keeps.
+        
+        Args:
+            df: DataFrame to filter
+            fingerprint: Optional precomputed fingerprint of ``df``
+            max_cardinality: Most distinct values a category column may have
+                to be filtered through its bitmap index
+                
+        Returns:
+            Sorted row positions, or None if the plan keeps every row
+            
+        Raises:
+            KeyError: If a filtered column is not in ``df``
+        """
+        if self.is_empty:
+            return None
+        
+        frame_index = get_frame_index(df, fingerprint)
+        key = self.cache_key()
+        cached = frame_index.get_result(key)
+        if cached is not None:
+            return cached
+        
+        n_rows = len(df)
+        # Packed bitmap of the rows kept so far; None means no filter applied yet
+        keep = None
+        
+        if self.search:
+            found = frame_index.search_index(df).search(self.search)
+            keep = positions_to_bitmap(found, n_rows)
+        
+        for col, selected in self.categories.items():
+            if not selected:
+                continue
+            position = _column_position(df, col)
+            category_index = frame_index.category_index(df, position, max_cardinality)
+            if category_index is not None:
+                bitmap = category_index.bitmap(selected)
+            else:
+                bitmap = mask_to_bitmap(df.iloc[:, position].isin(selected).to_numpy())
+            keep = _intersect(keep, bitmap)
+        
+        for col, (low, high) in self.ranges.items():
+            position = _column_position(df, col)
+            if keep is not None and not keep.any():
+                # Nothing left to narrow down
+                break
+            range_index = frame_index.range_index(df, position)
+            if range_index.covers_all(low, high):
+                continue
+            keep = _intersect(keep, positions_to_bitmap(range_index.range_positions(low, high), n_rows))
+        
+        result = np.arange(n_rows) if keep is None else bitmap_to_positions(keep, n_rows)
+        frame_index.store_result(key, result)
+        return result
+    
+    def apply(
+        self,
+        df: pd.DataFrame,
+        fingerprint: Optional[str] = None,
+        max_cardinality: int = MAX_FILTER_CARDINALITY
+    ) -> pd.DataFrame:
+        """
+        Filter a DataFrame with this plan.
+        
+        Args:
+            df: DataFrame to filter
+            fingerprint: Optional precomputed fingerprint of ``df``
+            max_cardinality: Most distinct values a category column may have
+                to be filtered through its bitmap index
+                
+        Returns:
+            The filtered rows. ``df`` itself is returned, not a copy, when
+            the plan keeps every row.
+        """
+        positions = self.positions(df, fingerprint, max_cardinality)
+        if positions is None or len(positions) == len(df):
+            return df
+        return df.take(positions)
+
+
+def render_filters(
+    df: pd.DataFrame,
+    key_prefix: str = "luxin_filter",
+    fingerprint: Optional[str] = None,
+    max_cardinality: int = MAX_FILTER_CARDINALITY
+) -> pd.DataFrame:
     """
     Render filter controls and return filtered DataFrame.
     
+    The widget values are compiled into a FilterPlan, which is stored in
+    ``st.session_state[f"{key_prefix}_plan"]`` and applied to ``df`` once.
+    
     Args:
         df: The DataFrame to filter
         key_prefix: Prefix for Streamlit widget keys
-        
+        fingerprint: Optional precomputed fingerprint of ``df``, used to look up
+            its cached filter indexes
+        max_cardinality: Most distinct values a text column may have to get
+            a multiselect filter
+            
     Returns:
-        Filtered DataFrame
+        Filtered DataFrame (``df`` itself when no filter is active)
     """
-    filtered_df = df.copy()
+    frame_index = get_frame_index(df, fingerprint)
+    plan = FilterPlan()
     
     # Text search filter
-    search_text = st.text_input(
+    plan.search = st.text_input(
         "🔍 Search",
         value="",
         key=f"{key_prefix}_search",
         placeholder="Search in all columns..."
     )
     
-    if search_text:
-        # Search across all string columns
-        mask = pd.Series([False] * len(df))
-        for col in df.columns:
-            if df[col].dtype == 'object':  # String columns
-                mask |= df[col].astype(str).str.contains(search_text, case=False, na=False)
-            else:
-                # For numeric columns, convert to string for search
-                mask |= df[col].astype(str).str.contains(search_text, case=False, na=False)
-        filtered_df = filtered_df[mask]
-    
     # Column-specific filters
     with st.expander("🔧 Column Filters", expanded=False):
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                # String column - use multiselect
-                unique_vals = sorted(df[col].dropna().unique().tolist())
-                if len(unique_vals) > 0 and len(unique_vals) <= 50:  # Limit to reasonable number
+        for position, col in enumerate(df.columns):
+            column = df.iloc[:, position]
+            if _is_categorical(column):
+                # String column - use multiselect over the indexed values
+                category_index = frame_index.category_index(df, position, max_cardinality)
+                if category_index is not None and len(category_index.values) > 0:
                     selected = st.multiselect(
                         f"Filter {col}",
-                        options=unique_vals,
+                        options=category_index.values,
                         default=[],
                         key=f"{key_prefix}_col_{col}"
                     )
                     if selected:
-                        filtered_df = filtered_df[filtered_df[col].isin(selected)]
-            elif pd.api.types.is_numeric_dtype(df[col]):
-                # Numeric column - use range slider
-                col_min = float(df[col].min())
-                col_max = float(df[col].max())
+                        plan.categories[col] = selected
+            elif pd.api.types.is_numeric_dtype(column):
+                # Numeric column - use range slider backed by the sorted index
+                range_index = frame_index.range_index(df, position)
+                if range_index.min_value is None:
+                    continue
+                col_min = float(range_index.min_value)
+                col_max = float(range_index.max_value)
                 if col_min < col_max:
                     range_vals = st.slider(
                         f"Filter {col}",
@@ -66,10 +205,12 @@ def render_filters(df: pd.DataFrame, key_prefix: str = "luxin_filter") -> pd.Dat
                         value=(col_min, col_max),
                         key=f"{key_prefix}_col_{col}"
                     )
-                    filtered_df = filtered_df[
-                        (filtered_df[col] >= range_vals[0]) & 
-                        (filtered_df[col] <= range_vals[1])
-                    ]
+                    if (range_vals[0], range_vals[1]) != (col_min, col_max):
+                        plan.ranges[col] = (range_vals[0], range_vals[1])
+    
+    st.session_state[f"{key_prefix}_plan"] = plan
+    with perf.span('filters.apply', rows=len(df)):
+        filtered_df = plan.apply(df, fingerprint=frame_index.fingerprint, max_cardinality=max_cardinality)
     
     # Show filter results count
     if len(filtered_df) != len(df):
@@ -77,3 +218,17 @@ def render_filters(df: pd.DataFrame, key_prefix: str = "luxin_filter") -> pd.Dat
     
     return filtered_df
 
+
+def _is_categorical(column: pd.Series) -> bool:
+    """Check whether a column should be filtered by picking values."""
+    dtype = column.dtype
+    return (
+        pd.api.types.is_object_dtype(dtype)
+        or isinstance(dtype, pd.CategoricalDtype)
+        or (pd.api.types.is_string_dtype(dtype) and not pd.api.types.is_numeric_dtype(dtype))
+    )
+
+
+def _intersect(keep: Optional[np.ndarray], bitmap: np.ndarray) -> np.ndarray:
+    """AND a filter's bitmap into the running selection."""
+    return bitmap if keep is None else keep & bitmap
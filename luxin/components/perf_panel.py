@@ -0,0 +1,72 @@
+"""
+Debug panel showing where the time of a Streamlit rerun went.
+"""
+
+import pandas as pd
+import streamlit as st
+from typing import List, Optional
+from luxin import perf
+
+# Name of the span wrapping one Inspector.render call
+RENDER_SPAN = 'inspector.render'
+
+# Session state key of the session's RingBufferSink
+SESSION_SINK_KEY = 'luxin_perf_sink'
+
+
+def get_session_sink() -> perf.RingBufferSink:
+    """
+    Get the current Streamlit session's span buffer, creating it if needed.
+    
+    Record into it with ``perf.capture`` so other sessions' reruns stay out.
+    """
+    if SESSION_SINK_KEY not in st.session_state:
+        st.session_state[SESSION_SINK_KEY] = perf.RingBufferSink()
+    return st.session_state[SESSION_SINK_KEY]
+
+
+def render_perf_panel(sink: Optional[perf.RingBufferSink] = None) -> None:
+    """
+    Render the timing breakdown of the last rerun.
+    
+    Shows the spans recorded since the previous ``inspector.render`` span
+    finished, up to and including the latest one, so work captured before
+    rendering is included.
+    
+    Args:
+        sink: Sink holding the recorded spans. Defaults to the session's
+            sink (see ``get_session_sink``).
+    """
+    if sink is None:
+        sink = get_session_sink()
+    records = _last_rerun(sink.records())
+    
+    with st.expander("⏱️ Performance", expanded=False):
+        if not records:
+            st.caption("No timings recorded yet. They appear after the next rerun.")
+            return
+        total = next((r.duration for r in reversed(records) if r.name == RENDER_SPAN), None)
+        if total is None:
+            total = sum(r.duration for r in records if r.depth == 0)
+        st.caption(f"Last rerun: {total * 1000:.1f} ms")
+        st.dataframe(_breakdown(records, total), use_container_width=True, hide_index=True)
+
+
+def _last_rerun(records: List[perf.SpanRecord]) -> List[perf.SpanRecord]:
+    """Get the spans from after the second-to-last render span to the last one."""
+    ends = [i for i, r in enumerate(records) if r.name == RENDER_SPAN and r.depth == 0]
+    if not ends:
+        return records
+    start = ends[-2] + 1 if len(ends) > 1 else 0
+    return records[start:ends[-1] + 1]
+
+
+def _breakdown(records: List[perf.SpanRecord], total: float) -> pd.DataFrame:
+    """Tabulate spans in the order they started, nested stages indented."""
+    ordered = sorted(records, key=lambda r: (r.started, r.depth))
+    return pd.DataFrame({
+        'Stage': ['\u2003' * r.depth + r.name for r in ordered],
+        'ms': [round(r.duration * 1000, 2) for r in ordered],
+        '% of rerun': [round(100 * r.duration / total, 1) if total else 0.0 for r in ordered],
+        'Details': [', '.join(f'{k}={v}' for k, v in r.attributes.items()) for r in ordered],
+    })
@@ -2,13 +2,18 @@
 Table view component for displaying aggregated data with drill-down.
 """
 
+import hashlib
 import pandas as pd
 import streamlit as st
 from typing import Dict, Any, List
-from luxin.components.detail_panel import render_detail_panel
-from luxin.components.filters import render_filters
+from luxin.components.detail_panel import render_detail_panel, gather_detail_rows
+from luxin.components.filters import FilterPlan, render_filters
 from luxin.components.export import render_export_buttons
 from luxin.config import InspectorConfig, get_default_config
+from luxin.indexes import trim_index_cache
+from luxin.stats import get_summary_stats, trim_stats_cache
+from luxin.utils import frame_fingerprint
+from luxin import perf
 from typing import Optional
 
 
@@ -34,6 +39,10 @@ def render_table_view(
     
     st.header("📊 Aggregated Data")
     
+    # Content fingerprint keys widgets and caches so they survive reruns
+    with perf.span('table_view.fingerprint', rows=len(agg_df)):
+        agg_fingerprint = frame_fingerprint(agg_df)
+    
     # Convert index to columns for better display
     display_df = agg_df.copy()
     if isinstance(display_df.index, pd.MultiIndex):
@@ -42,9 +51,21 @@ def render_table_view(
         display_df = display_df.reset_index()
     
     # Apply filters if enabled
+    unfiltered_df = display_df
+    plan = None
     if config.show_filters:
-        filter_key = f"luxin_filter_{id(agg_df)}"
-        display_df = render_filters(display_df, key_prefix=filter_key)
+        # display_df is derived from agg_df alone, so the aggregate
+        # fingerprint also identifies it for the filter index cache
+        filter_key = f"luxin_filter_{agg_fingerprint}"
+        display_df = render_filters(
+            display_df,
+            key_prefix=filter_key,
+            fingerprint=f"{agg_fingerprint}:display",
+            max_cardinality=config.max_filter_cardinality
+        )
+        plan = st.session_state.get(f"{filter_key}_plan")
+        if config.index_cache_max_bytes is not None:
+            trim_index_cache(config.index_cache_max_bytes)
     
     # Use clickable table rows with st.dataframe selection
     if len(display_df) > 0:
@@ -52,35 +73,47 @@ def render_table_view(
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            # Display the aggregated table with selection enabled
+            # Only the first rows are sent to the browser for very large tables
+            shown_df = display_df
+            if config.max_frontend_rows is not None and len(display_df) > config.max_frontend_rows:
+                shown_df = display_df.iloc[:config.max_frontend_rows]
+                st.caption(
+                    f"Showing the first {len(shown_df):,} of {len(display_df):,} rows. "
+                    "Use the filters to narrow them down."
+                )
+            
+            # Display the aggregated table with selection enabled, keyed by
+            # content so the selection survives reruns
             selected_rows = st.dataframe(
-                display_df,
+                shown_df,
                 use_container_width=True,
                 height=config.table_height,
                 on_select="rerun",
                 selection_mode="single-row",
-                key=f"luxin_table_{id(agg_df)}"
+                key=f"luxin_table_{agg_fingerprint}"
             )
         
         # Get selected row index
         selected_idx = None
         if selected_rows.selection.rows:
-            # Get the first selected row index
-            selected_row_num = selected_rows.selection.rows[0]
-            # Map display index to original agg_df index
-            if isinstance(agg_df.index, pd.MultiIndex):
-                # For MultiIndex, we need to map from display_df reset_index position
-                if isinstance(display_df.index, pd.RangeIndex):
-                    # display_df was reset_index, so selected_row_num maps directly
-                    selected_idx = selected_row_num
-                else:
-                    selected_idx = selected_row_num
-            else:
-                selected_idx = selected_row_num
+            # The selection is a position among the filtered rows; map it
+            # back to the aggregated row through the filter plan
+            selected_idx = selected_rows.selection.rows[0]
+            if isinstance(plan, FilterPlan):
+                positions = plan.positions(
+                    unfiltered_df,
+                    fingerprint=f"{agg_fingerprint}:display",
+                    max_cardinality=config.max_filter_cardinality
+                )
+                if positions is not None:
+                    selected_idx = int(positions[selected_idx]) if selected_idx < len(positions) else None
         
         # Show selected row details if a row is selected
         if selected_idx is not None and selected_idx < len(agg_df):
-            _show_row_details(selected_idx, agg_df, detail_df, source_mapping, groupby_cols, col2, config)
+            _show_row_details(
+                selected_idx, agg_df, detail_df, source_mapping, groupby_cols, col2, config,
+                fingerprint=agg_fingerprint
+            )
         else:
             with col2:
                 st.info("👆 Click on a row in the table to see detail data")
@@ -88,15 +121,27 @@ def render_table_view(
         st.warning("No data to display.")
     
     # Export functionality (if enabled)
-    if config.show_export_buttons:
+    if config.show_export_buttons and config.export_formats:
         with st.expander("📥 Export Data", expanded=False):
-            render_export_buttons(display_df, filename_prefix="aggregated_data")
+            render_export_buttons(
+                (lambda: display_df) if config.lazy_exports else display_df,
+                filename_prefix="aggregated_data",
+                key=f"export_prepare_{agg_fingerprint}",
+                formats=config.export_formats
+            )
     
     # Show summary stats below (if enabled)
     if config.show_summary_stats and len(agg_df) > 0 and len(agg_df.columns) > 0:
         with st.expander("📈 Summary Statistics"):
             try:
-                st.dataframe(agg_df.describe(), use_container_width=True)
+                summary = get_summary_stats(
+                    agg_df,
+                    fingerprint=agg_fingerprint,
+                    exact_quantiles=config.exact_quantiles
+                )
+                if config.stats_cache_max_bytes is not None:
+                    trim_stats_cache(config.stats_cache_max_bytes)
+                st.dataframe(summary, use_container_width=True)
             except ValueError:
                 # Empty DataFrame or no numeric columns
                 st.info("No statistics available for this data.")
@@ -109,7 +154,8 @@ def _show_row_details(
     source_mapping: Dict[Any, List[int]],
     groupby_cols: List[str],
     detail_col: Any,
-    config: Optional[InspectorConfig] = None
+    config: Optional[InspectorConfig] = None,
+    fingerprint: Optional[str] = None
 ) -> None:
     """
     Show detail rows for the selected aggregated row.
@@ -121,6 +167,8 @@ def _show_row_details(
         source_mapping: Dictionary mapping aggregated row keys to detail row indices
         groupby_cols: List of column names used to group the data
         detail_col: Streamlit column to render details in
+        config: Optional configuration object
+        fingerprint: Optional precomputed fingerprint of ``agg_df``
     """
     with detail_col:
         st.subheader("🔍 Detail Rows")
@@ -134,7 +182,7 @@ def _show_row_details(
         # Get the detail row indices
         detail_indices = source_mapping.get(row_key, [])
         
-        if not detail_indices:
+        if len(detail_indices) == 0:
             st.warning(
                 "No detail rows found for this selection.\n\n"
                 "This may happen if:\n"
@@ -144,21 +192,23 @@ def _show_row_details(
             )
             return
         
-        # Filter detail DataFrame to show only relevant rows
-        detail_rows = detail_df.loc[detail_indices]
+        # Show count without materializing the group
+        st.caption(f"Found {len(detail_indices)} detail row(s)")
         
-        # Show count
-        st.caption(f"Found {len(detail_rows)} detail row(s)")
-        
-        # Display the detail rows with pagination
+        # Display the detail rows with pagination; only the visible page is gathered
         if config is None:
             config = get_default_config()
-        from luxin.components.detail_panel import render_detail_panel
+        if fingerprint is None:
+            fingerprint = frame_fingerprint(agg_df)
+        group_token = _group_token(row_key)
         render_detail_panel(
-            detail_rows, 
+            detail_df,
             title="Detail Rows", 
             height=config.detail_height, 
-            page_size=config.detail_page_size
+            page_size=config.detail_page_size,
+            detail_indices=detail_indices,
+            # Pagination state follows the group across reruns
+            state_key=f"{fingerprint}_{group_token}"
         )
         
         # Show the aggregated row values for context
@@ -166,8 +216,17 @@ def _show_row_details(
             agg_row = agg_df.iloc[selected_idx]
             st.json(agg_row.to_dict())
         
-        # Export detail rows (if enabled)
-        if config.show_export_buttons:
+        # Export detail rows (if enabled); the group is gathered only on request
+        if config.show_export_buttons and config.export_formats:
             with st.expander("📥 Export Detail Data", expanded=False):
-                render_export_buttons(detail_rows, filename_prefix="detail_data")
+                render_export_buttons(
+                    lambda: gather_detail_rows(detail_df, detail_indices),
+                    filename_prefix="detail_data",
+                    key=f"detail_export_{fingerprint}_{group_token}",
+                    formats=config.export_formats
+                )
+
 
+def _group_token(row_key: Any) -> str:
+    """Short stable token identifying a group key, for widget keys."""
+    return hashlib.md5(repr(row_key).encode()).hexdigest()[:12]
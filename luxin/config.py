@@ -2,8 +2,27 @@
 Configuration management for luxin Inspector.
 """
 
-from typing import Optional, Dict, Any
-from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Tuple
+from dataclasses import dataclass, field, replace
+
+# Name of the profile choosing settings from the data size (see get_auto_config)
+AUTO_PROFILE = 'auto'
+
+# Aggregated rows above which the auto profile caps the table and makes
+# exports on-demand
+_AUTO_LARGE_AGG_ROWS = 50_000
+
+# Aggregated rows up to which the auto profile uses exact quantiles
+_AUTO_EXACT_QUANTILE_ROWS = 100_000
+
+# Detail rows up to which the auto profile validates the mapping eagerly
+_AUTO_EAGER_MAPPING_ROWS = 1_000_000
+
+# Filter index budget of the auto profile for large aggregates (256 MB)
+_AUTO_INDEX_CACHE_BYTES = 256 * 1024 * 1024
+
+# Rows (header included) that fit in an Excel worksheet
+_EXCEL_MAX_ROWS = 1_048_576
 
 
 @dataclass
@@ -19,6 +38,25 @@ class InspectorConfig:
         table_height: Height of the main table in pixels (default: 400)
         detail_height: Height of the detail panel in pixels (default: 300)
         theme: Theme preference ('light', 'dark', or 'auto') (default: 'auto')
+        exact_quantiles: Whether summary statistics use exact quantiles; large
+            tables use sampled quantiles otherwise (default: False)
+        show_perf_panel: Whether to record timing spans (see ``luxin.perf``)
+            and show each rerun's breakdown below the table (default: False)
+        max_frontend_rows: Most aggregated rows sent to the browser; larger
+            tables show their first rows until filtered (default: None, no cap)
+        max_filter_cardinality: Most distinct values a column may have to
+            get a multiselect filter (default: 50)
+        index_cache_max_bytes: Memory budget of the cached filter indexes in
+            bytes (default: None, only the entry count is bounded)
+        stats_cache_max_bytes: Memory budget of the cached summary statistics
+            in bytes (default: None, only the entry count is bounded)
+        eager_mapping: Whether to validate the source mapping and build its
+            detail row lookup when the Inspector is created, instead of on
+            the first drill-down (default: False)
+        lazy_exports: Whether aggregated-table exports are generated on
+            request instead of on every rerun (default: False)
+        export_formats: Export formats offered, among ``'csv'``, ``'json'``
+            and ``'excel'`` (default: all three)
     """
     show_summary_stats: bool = True
     show_export_buttons: bool = True
@@ -27,6 +65,15 @@ class InspectorConfig:
     table_height: int = 400
     detail_height: int = 300
     theme: str = 'auto'
+    exact_quantiles: bool = False
+    show_perf_panel: bool = False
+    max_frontend_rows: Optional[int] = None
+    max_filter_cardinality: int = 50
+    index_cache_max_bytes: Optional[int] = None
+    stats_cache_max_bytes: Optional[int] = None
+    eager_mapping: bool = False
+    lazy_exports: bool = False
+    export_formats: Tuple[str, ...] = ('csv', 'json', 'excel')
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert config to dictionary."""
@@ -38,15 +85,62 @@ class InspectorConfig:
             'table_height': self.table_height,
             'detail_height': self.detail_height,
             'theme': self.theme,
+            'exact_quantiles': self.exact_quantiles,
+            'show_perf_panel': self.show_perf_panel,
+            'max_frontend_rows': self.max_frontend_rows,
+            'max_filter_cardinality': self.max_filter_cardinality,
+            'index_cache_max_bytes': self.index_cache_max_bytes,
+            'stats_cache_max_bytes': self.stats_cache_max_bytes,
+            'eager_mapping': self.eager_mapping,
+            'lazy_exports': self.lazy_exports,
+            'export_formats': list(self.export_formats),
         }
     
     @classmethod
     def from_dict(cls, config_dict: Dict[str, Any]) -> 'InspectorConfig':
         """Create config from dictionary."""
-        return cls(**{k: v for k, v in config_dict.items() if k in cls.__dataclass_fields__})
+        config = cls(**{k: v for k, v in config_dict.items() if k in cls.__dataclass_fields__})
+        config.export_formats = tuple(config.export_formats)
+        return config
 
 
 def get_default_config() -> InspectorConfig:
     """Get default configuration."""
     return InspectorConfig()
 
+
+def get_auto_config(
+    agg_rows: int,
+    detail_rows: int = 0,
+    base: Optional[InspectorConfig] = None
+) -> InspectorConfig:
+    """
+    Get a configuration with performance settings chosen from the data size.
+    
+    Small tables get exact quantiles and eager mapping validation. Large
+    aggregates are capped in the browser, export on request and bound their
+    filter indexes. Excel export is dropped for tables that do not fit in a
+    worksheet.
+    
+    Args:
+        agg_rows: Number of rows in the aggregated DataFrame
+        detail_rows: Number of rows in the detail DataFrame, if any
+        base: Configuration whose other settings are kept (defaults if None)
+        
+    Returns:
+        New configuration
+    """
+    base = base if base is not None else get_default_config()
+    is_large = agg_rows > _AUTO_LARGE_AGG_ROWS
+    return replace(
+        base,
+        exact_quantiles=agg_rows <= _AUTO_EXACT_QUANTILE_ROWS,
+        eager_mapping=0 < detail_rows <= _AUTO_EAGER_MAPPING_ROWS,
+        max_frontend_rows=_AUTO_LARGE_AGG_ROWS if is_large else None,
+        lazy_exports=is_large,
+        index_cache_max_bytes=_AUTO_INDEX_CACHE_BYTES if is_large else None,
+        export_formats=tuple(
+            fmt for fmt in base.export_formats
+            if fmt != 'excel' or agg_rows < _EXCEL_MAX_ROWS
+        ),
+    )
@@ -3,9 +3,20 @@ Main display module that detects the environment and routes to the appropriate b
 """
 
 import pandas as pd
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 import json
 import os
+import re
+from luxin import perf
+from luxin.payload import DEFAULT_MAX_PAYLOAD_BYTES, build_drill_payload, encode_frame, encode_row_groups
+
+# Aggregate rows rendered as static HTML, shown until the script draws the
+# virtualized table (and by viewers that do not run scripts)
+_STATIC_PREVIEW_ROWS = 50
+
+# Placeholders in templates/table.html filled per table
+_PLACEHOLDERS = ('runtime', 'agg_table', 'payload', 'unique_id')
 
 
 def display_drill_table(
@@ -70,20 +81,43 @@ def _detect_environment() -> str:
     return 'unknown'
 
 
+@perf.timed('display.render_html')
 def render_html(
     agg_df: pd.DataFrame,
     detail_df: pd.DataFrame,
     source_mapping: Dict[Any, List[int]],
-    groupby_cols: List[str]
+    groupby_cols: List[str],
+    max_rows_per_group: Optional[int] = None,
+    max_payload_bytes: Optional[int] = DEFAULT_MAX_PAYLOAD_BYTES,
+    compression: Optional[str] = None,
+    table_id: Optional[str] = None,
+    kernel_fetch: bool = False,
+    page_size: int = 100,
+    include_runtime: bool = True
 ) -> str:
     """
     Render the HTML for the drill-down table.
     
+    Only detail rows referenced by ``source_mapping`` are embedded. Groups
+    are truncated to their first ``max_rows_per_group`` rows, and further
+    to a common per-group limit if the embedded rows would exceed
+    ``max_payload_bytes``; the panel then notes how many rows are shown.
+    
     Args:
         agg_df: The aggregated DataFrame to display
         detail_df: The detail DataFrame containing source rows
         source_mapping: Dictionary mapping aggregated row keys to detail row indices
         groupby_cols: List of column names used to group the data
+        max_rows_per_group: Optional cap on detail rows embedded per group
+        max_payload_bytes: Approximate budget for embedded detail data in
+            bytes, or None for no budget
+        compression: None, or ``'deflate'`` to compress the embedded detail
+            columns (decompressed in the browser with DecompressionStream)
+        table_id: Unique id of the table in the page. Generated if None.
+        kernel_fetch: Fetch detail rows from the Jupyter kernel a page at a
+            time (see ``luxin.jupyter_backend``), falling back to the
+            embedded rows when no kernel connection is available
+        page_size: Number of detail rows requested from the kernel at once
         
     Returns:
         Complete HTML string for the interactive table
@@ -92,63 +126,100 @@ def render_html(
     import string
     
     # Generate unique ID for this table instance
-    unique_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
-    
-    # Load templates
-    template_path = os.path.join(os.path.dirname(__file__), 'templates', 'table.html')
-    css_path = os.path.join(os.path.dirname(__file__), 'static', 'table.css')
-    js_path = os.path.join(os.path.dirname(__file__), 'static', 'table.js')
-    
-    with open(template_path, 'r') as f:
-        template = f.read()
-    
-    with open(css_path, 'r') as f:
-        css = f.read()
-    
-    with open(js_path, 'r') as f:
-        javascript = f.read()
-    
-    # Convert aggregated DataFrame to HTML table
-    agg_table_html = agg_df.to_html(classes='luxin-table', border=0)
-    
-    # Prepare detail data as JSON (convert to dict of dicts)
-    detail_data = detail_df.to_dict(orient='index')
-    # Convert index to string keys for JSON serialization
-    detail_data = {str(k): v for k, v in detail_data.items()}
-    
-    # Prepare source mapping for JSON (convert keys to strings)
-    json_mapping = {}
-    for key, indices in source_mapping.items():
-        # Convert tuple keys to strings
-        if isinstance(key, tuple):
-            str_key = '|'.join(str(k) for k in key)
-        else:
-            str_key = str(key)
-        json_mapping[str_key] = [str(idx) for idx in indices]
-    
-    # Inject data into JavaScript
-    javascript = javascript.replace(
-        '{source_mapping}',
-        json.dumps(json_mapping, indent=2)
-    )
-    javascript = javascript.replace(
-        '{detail_data}',
-        json.dumps(detail_data, indent=2, default=str)
-    )
-    javascript = javascript.replace(
-        '{groupby_cols}',
-        json.dumps(groupby_cols)
-    )
-    javascript = javascript.replace(
-        '{unique_id}',
-        unique_id
-    )
-    
-    # Assemble final HTML
-    html = template.replace('{css}', css)
-    html = html.replace('{agg_table}', agg_table_html)
-    html = html.replace('{javascript}', javascript)
-    html = html.replace('{unique_id}', unique_id)
+    unique_id = table_id or ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    
+    # Static preview of the aggregated table; the full table is drawn from
+    # the columnar data, only the visible rows at a time
+    agg_table_html = agg_df.head(_STATIC_PREVIEW_ROWS).to_html(classes='luxin-table', border=0)
+    
+    # Encode the detail rows to embed, column by column
+    with perf.span('display.detail_payload', groups=len(source_mapping)):
+        payload = build_drill_payload(
+            detail_df, source_mapping, max_rows_per_group, max_payload_bytes, compression
+        )
+    
+    with perf.span('display.agg_payload', rows=len(agg_df)):
+        row_groups = encode_row_groups(agg_df, source_mapping, compression)
+        agg_data = encode_frame(_agg_display_frame(agg_df), compression)
+    
+    # Data for window.luxin.mount, read from a JSON script element
+    table_payload = ''.join([
+        '{"rowGroups":', row_groups,
+        ',"groupSizes":', payload['group_sizes'],
+        ',"groupStarts":', payload['group_starts'],
+        ',"groupRows":', payload['group_rows'],
+        ',"detailData":', payload['detail_data'],
+        ',"groupbyCols":', json.dumps(groupby_cols).replace('</', '<\\/'),
+        ',"aggData":', agg_data,
+        ',"aggIndexColumns":', str(agg_df.index.nlevels),
+        ',"kernelFetch":', json.dumps(bool(kernel_fetch)),
+        ',"pageSize":', str(int(page_size)),
+        '}',
+    ])
+    
+    values = {
+        'runtime': render_runtime() if include_runtime else '',
+        'agg_table': agg_table_html,
+        'payload': table_payload,
+        'unique_id': unique_id,
+    }
+    
+    # Assemble final HTML in one pass over the pre-split template
+    fragments = _page_fragments()
+    html = ''.join(values[fragment] if i % 2 else fragment for i, fragment in enumerate(fragments))
     
     return html
 
+
+def _agg_display_frame(agg_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Flatten the aggregated DataFrame for display: index levels become the
+    leading columns and tuple column labels are joined with spaces.
+    """
+    index_frame = agg_df.index.to_frame(index=False)
+    index_frame.columns = ['' if name is None else _column_label(name) for name in agg_df.index.names]
+    values = agg_df.reset_index(drop=True)
+    values.columns = [_column_label(col) for col in agg_df.columns]
+    return pd.concat([index_frame, values], axis=1)
+
+
+def _column_label(col: Any) -> str:
+    """Get the display label of a (possibly multi-level) column."""
+    if isinstance(col, tuple):
+        return ' '.join(str(part) for part in col if str(part))
+    return str(col)
+
+
+@lru_cache(maxsize=1)
+def render_runtime() -> str:
+    """
+    Get the shared CSS and JavaScript runtime used by every rendered table.
+    
+    Loaded once per process. In a notebook it only needs to be displayed
+    once per session (see ``luxin.init_notebook``).
+    
+    Returns:
+        HTML ``<style>`` and ``<script>`` elements
+    """
+    runtime = _read_asset('templates', 'runtime.html')
+    runtime = runtime.replace('{css}', _read_asset('static', 'table.css'))
+    return runtime.replace('{javascript}', _read_asset('static', 'table.js'))
+
+
+@lru_cache(maxsize=1)
+def _page_fragments() -> Tuple[str, ...]:
+    """
+    Load the table template once per process.
+    
+    Returns:
+        The template split at its placeholders: literal text at even
+        positions and placeholder names at odd positions
+    """
+    template = _read_asset('templates', 'table.html')
+    return tuple(re.split(r'\{(' + '|'.join(_PLACEHOLDERS) + r')\}', template))
+
+
+def _read_asset(directory: str, name: str) -> str:
+    """Read a packaged template or static file."""
+    with open(os.path.join(os.path.dirname(__file__), directory, name), 'r') as f:
+        return f.read()
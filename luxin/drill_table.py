@@ -4,6 +4,7 @@ Manual API for creating drill-down tables from existing DataFrames.
 
 import pandas as pd
 from typing import List, Dict, Any, Optional
+from luxin import perf
 from luxin.validation import (
     validate_dataframe, 
     validate_groupby_cols, 
@@ -49,7 +50,8 @@ def create_drill_table(
         raise ValueError(str(e)) from e
     
     # Build the source mapping by matching groupby column values
-    source_mapping = _build_source_mapping(agg_df, detail_df, groupby_cols)
+    with perf.span('drill_table.source_mapping', groups=len(agg_df)):
+        source_mapping = _build_source_mapping(agg_df, detail_df, groupby_cols)
     
     from luxin.display import display_drill_table
     display_drill_table(agg_df, detail_df, source_mapping, groupby_cols, **kwargs)
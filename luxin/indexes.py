@@ -0,0 +1,531 @@
+"""
+Prebuilt per-frame indexes that make filtering aggregated tables cheap on rerun.
+
+Indexes are cached by frame fingerprint (see ``luxin.utils.frame_fingerprint``),
+so the work of building them is paid once per distinct DataFrame rather than
+on every Streamlit rerun.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from luxin.utils import frame_fingerprint
+
+# Shortest query looked up in the trigram postings; shorter ones are found
+# from the trigrams they start and the last characters of each value
+_TRIGRAM = 3
+
+_INDEX_CACHE_SIZE = 16
+_RESULT_CACHE_SIZE = 8
+_index_cache: "OrderedDict[str, FrameIndex]" = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+class SearchIndex:
+    """
+    Case-insensitive substring index over all columns of a DataFrame.
+    
+    Each column is factorized and its distinct values are rendered once as
+    lowercased text, with a trigram posting list (trigram -> values
+    containing it). A query looks up its trigrams, intersects their
+    postings to get candidate values, checks only those candidates for the
+    literal substring, and maps the matching values back to rows. Missing
+    values never match.
+    """
+    
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.n_rows = len(df)
+        self._columns = [_ColumnSearch(df.iloc[:, i]) for i in range(len(df.columns))]
+    
+    def search(self, query: str) -> np.ndarray:
+        """
+        Find rows containing ``query`` in any column.
+        
+        Args:
+            query: Text to search for (case-insensitive, literal substring)
+            
+        Returns:
+            Sorted array of matching row positions
+        """
+        needle = query.lower()
+        if not needle:
+            return np.arange(self.n_rows)
+        
+        keys = None
+        if len(needle) >= _TRIGRAM:
+            keys = np.unique(_trigram_keys(needle, np.array([len(needle)]))[0])
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for column in self._columns:
+            column.match_rows(needle, keys, mask)
+        return np.flatnonzero(mask)
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the index in bytes."""
+        return sum(column.nbytes for column in self._columns)
+
+
+class _ColumnSearch:
+    """Distinct lowercased values of one column and their trigram postings."""
+    
+    def __init__(self, column: pd.Series) -> None:
+        if column.dtype == object:
+            # Mixed objects are only comparable through their text
+            column = column.astype(str)
+        codes, uniques = pd.factorize(column)
+        self._codes = codes.astype(np.int32)
+        # Value texts, concatenated; value i spans _bounds[i]:_bounds[i + 1]
+        texts = _value_texts(uniques)
+        if len(codes) and codes.min() < 0:
+            # Missing values share one empty text, after the others
+            self._codes[codes < 0] = len(texts)
+            texts.append('')
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        self._text = ''.join(texts)
+        self._bounds = np.append(0, np.cumsum(lengths))
+        
+        keys, owners, tails = _trigram_keys(self._text, lengths)
+        # Last two characters of each value: the only place a short query
+        # can occur without starting a trigram
+        tail_codes, tails = pd.factorize(tails)
+        self._tail_codes = tail_codes.astype(np.int32)
+        self._tails = [_unpack_tail(int(tail)) for tail in tails]
+        
+        # Group (trigram, value) pairs by trigram, values staying ascending;
+        # numbering the trigrams first keeps the sort keys small
+        trigram_ids, self._keys = pd.factorize(keys, sort=True)
+        id_dtype = np.uint16 if len(self._keys) <= np.iinfo(np.uint16).max else np.int32
+        order = np.argsort(trigram_ids.astype(id_dtype), kind='stable')
+        trigram_ids = trigram_ids[order]
+        owners = owners[order]
+        distinct = np.ones(len(owners), dtype=bool)
+        distinct[1:] = (trigram_ids[1:] != trigram_ids[:-1]) | (owners[1:] != owners[:-1])
+        self._owners = owners[distinct]
+        self._offsets = np.searchsorted(trigram_ids[distinct], np.arange(len(self._keys) + 1))
+    
+    def match_rows(self, needle: str, keys: Optional[np.ndarray], mask: np.ndarray) -> None:
+        """
+        Set the rows whose value contains ``needle`` in a row mask.
+        
+        Args:
+            needle: Lowercased query
+            keys: Distinct trigram keys of ``needle`` (None if it is shorter)
+            mask: Row mask updated in place
+        """
+        if keys is None:
+            hits = self._short_matches(needle)
+        else:
+            candidates = self._candidates(keys)
+            if not len(candidates):
+                return
+            text = self._text
+            starts = self._bounds[candidates].tolist()
+            stops = self._bounds[candidates + 1].tolist()
+            found = np.fromiter(
+                (text.find(needle, start, stop) >= 0 for start, stop in zip(starts, stops)),
+                dtype=bool, count=len(candidates)
+            )
+            hits = np.zeros(len(self._tail_codes), dtype=bool)
+            hits[candidates[found]] = True
+        if hits.any():
+            mask |= hits[self._codes]
+    
+    def _short_matches(self, needle: str) -> np.ndarray:
+        """
+        Flag the values containing a query shorter than a trigram.
+        
+        Such a query occurs either at the start of one of the value's
+        trigrams (a contiguous range of the sorted keys) or in its tail.
+        """
+        hits = np.zeros(len(self._tail_codes), dtype=bool)
+        low = sum(ord(char) << (21 * (_TRIGRAM - 1 - i)) for i, char in enumerate(needle))
+        high = low + (1 << (21 * (_TRIGRAM - len(needle))))
+        start, stop = np.searchsorted(self._keys, np.array([low, high], dtype=np.uint64))
+        hits[self._owners[self._offsets[start]:self._offsets[stop]]] = True
+        tail_hits = np.fromiter((needle in tail for tail in self._tails), dtype=bool, count=len(self._tails))
+        hits |= tail_hits[self._tail_codes]
+        return hits
+    
+    def _candidates(self, keys: np.ndarray) -> np.ndarray:
+        """Get the values holding every trigram in ``keys``."""
+        found = np.searchsorted(self._keys, keys)
+        if (found >= len(self._keys)).any() or (self._keys[found] != keys).any():
+            # Some trigram of the query occurs in no value
+            return np.array([], dtype=np.int32)
+        postings = sorted(
+            (self._owners[self._offsets[i]:self._offsets[i + 1]] for i in found),
+            key=len
+        )
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+            if not len(candidates):
+                break
+        return candidates
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the column index in bytes."""
+        arrays = (self._codes, self._bounds, self._tail_codes, self._keys, self._offsets, self._owners)
+        return int(sys.getsizeof(self._text) + sum(array.nbytes for array in arrays))
+
+
+def _value_texts(values: Any) -> List[str]:
+    """
+    Render distinct column values as lowercased text, as ``astype(str)`` would.
+    
+    Missing values become empty text so they never match.
+    """
+    if isinstance(values.dtype, np.dtype) and (values.dtype.kind in 'iu' or values.dtype == np.float64):
+        # str() of a Python int or float matches astype(str) and skips
+        # building a string array
+        values = np.asarray(values)
+        texts = list(map(str, values.tolist()))
+        if values.dtype.kind == 'f':
+            for position in np.flatnonzero(np.isnan(values)):
+                texts[position] = ''
+        return texts
+    return pd.Series(values).astype(str).str.lower().fillna('').tolist()
+
+
+def _trigram_keys(text: str, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get every trigram of some concatenated texts, packed into integers.
+    
+    Args:
+        text: The texts, concatenated
+        lengths: Length of each text
+        
+    Returns:
+        Tuple of the trigram keys (three 21-bit code points per uint64), the
+        number of the text each trigram comes from, and the last two code
+        points of each text (shifted by one, so 0 marks a missing one)
+    """
+    points = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32).astype(np.uint64)
+    owners = np.repeat(np.arange(len(lengths), dtype=np.int32), lengths)
+    
+    ends = np.cumsum(lengths)
+    tails = np.zeros(len(lengths), dtype=np.uint64)
+    for back in (2, 1):
+        present = np.flatnonzero(lengths >= back)
+        point = np.zeros(len(lengths), dtype=np.uint64)
+        point[present] = points[ends[present] - back] + np.uint64(1)
+        tails = (tails << np.uint64(21)) | point
+    
+    if len(points) < _TRIGRAM:
+        return np.array([], dtype=np.uint64), np.array([], dtype=np.int32), tails
+    keys = (points[:-2] << np.uint64(42)) | (points[1:-1] << np.uint64(21)) | points[2:]
+    # Keep trigrams that lie within one text
+    within = owners[:-2] == owners[2:]
+    return keys[within], owners[:-2][within], tails
+
+
+def _unpack_tail(tail: int) -> str:
+    """Get the text of a tail packed by ``_trigram_keys``."""
+    return ''.join(chr(point - 1) for point in (tail >> 21, tail & 0x1FFFFF) if point)
+
+
+def mask_to_bitmap(mask: np.ndarray) -> np.ndarray:
+    """Pack a boolean row mask into a bitmap (one bit per row)."""
+    return np.packbits(np.asarray(mask, dtype=bool))
+
+
+def positions_to_bitmap(positions: np.ndarray, n_rows: int) -> np.ndarray:
+    """Build a bitmap with the bits at ``positions`` set."""
+    mask = np.zeros(n_rows, dtype=bool)
+    mask[positions] = True
+    return np.packbits(mask)
+
+
+def bitmap_to_positions(bitmap: np.ndarray, n_rows: int) -> np.ndarray:
+    """Get the sorted row positions whose bits are set in ``bitmap``."""
+    return np.flatnonzero(np.unpackbits(bitmap, count=n_rows))
+
+
+class CategoryIndex:
+    """
+    Per-value bitmaps for a low-cardinality column.
+    
+    The column is factorized once; the bitmap for each distinct value is
+    built the first time that value is selected. Selecting several values
+    is then a bitwise OR of their bitmaps instead of a rescan of the column.
+    
+    Attributes:
+        values: Sorted distinct non-null values of the column
+    """
+    
+    def __init__(self, column: pd.Series) -> None:
+        self.n_rows = len(column)
+        codes, uniques = pd.factorize(column, sort=True)
+        self.values: List[Any] = uniques.tolist()
+        self._code_of: Dict[Any, int] = {value: code for code, value in enumerate(self.values)}
+        self._codes = codes
+        self._bitmaps: Dict[int, np.ndarray] = {}
+    
+    def bitmap(self, selected: Iterable[Any]) -> np.ndarray:
+        """
+        Get the bitmap of rows whose value is one of ``selected``.
+        
+        Args:
+            selected: Values to keep; values not in the column are ignored
+            
+        Returns:
+            Packed bitmap over the column's rows
+        """
+        result = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        for value in selected:
+            code = self._code_of.get(value)
+            if code is None:
+                continue
+            value_bitmap = self._bitmaps.get(code)
+            if value_bitmap is None:
+                value_bitmap = mask_to_bitmap(self._codes == code)
+                self._bitmaps[code] = value_bitmap
+            result |= value_bitmap
+        return result
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the index in bytes."""
+        return int(self._codes.nbytes + sum(b.nbytes for b in self._bitmaps.values()))
+
+
+class SortedIndex:
+    """
+    Sorted view of a numeric column for range lookups.
+    
+    The column is argsorted once; a ``lo <= value <= hi`` filter is then two
+    binary searches into the sorted values instead of a full column scan.
+    Missing values sort last and never fall inside a range.
+    
+    Attributes:
+        min_value: Smallest non-missing value (None if there is none)
+        max_value: Largest non-missing value (None if there is none)
+    """
+    
+    def __init__(self, column: pd.Series) -> None:
+        self.n_rows = len(column)
+        if pd.api.types.is_bool_dtype(column.dtype) or pd.api.types.is_extension_array_dtype(column.dtype):
+            values = column.to_numpy(dtype='float64', na_value=np.nan)
+        else:
+            values = column.to_numpy()
+        self._order = np.argsort(values, kind='stable')
+        sorted_values = values[self._order]
+        if sorted_values.dtype.kind == 'f':
+            # NaNs sort to the end; keep only the comparable prefix
+            sorted_values = sorted_values[:self.n_rows - int(np.isnan(sorted_values).sum())]
+        self._sorted = sorted_values
+        self.min_value = sorted_values[0].item() if len(sorted_values) else None
+        self.max_value = sorted_values[-1].item() if len(sorted_values) else None
+    
+    def bounds(self, low: float, high: float) -> Tuple[int, int]:
+        """Get the slice of sorted order holding values in ``[low, high]``."""
+        start = int(np.searchsorted(self._sorted, low, side='left'))
+        stop = int(np.searchsorted(self._sorted, high, side='right'))
+        return start, max(start, stop)
+    
+    def covers_all(self, low: float, high: float) -> bool:
+        """Check whether every row has a value in ``[low, high]``."""
+        return self.bounds(low, high) == (0, self.n_rows)
+    
+    def range_positions(self, low: float, high: float) -> np.ndarray:
+        """
+        Find rows whose value lies in ``[low, high]``.
+        
+        Args:
+            low: Inclusive lower bound
+            high: Inclusive upper bound
+            
+        Returns:
+            Row positions (in value order, not position order)
+        """
+        start, stop = self.bounds(low, high)
+        return self._order[start:stop]
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the index in bytes."""
+        return int(self._order.nbytes + self._sorted.nbytes)
+
+
+class FrameIndex:
+    """
+    Lazily built filter indexes for one DataFrame.
+    
+    The index does not keep a reference to the DataFrame; builders take the
+    frame as an argument and are only run the first time they are needed.
+    
+    Attributes:
+        fingerprint: Fingerprint of the indexed DataFrame
+        n_rows: Number of rows in the indexed DataFrame
+    """
+    
+    def __init__(self, fingerprint: str, df: pd.DataFrame) -> None:
+        self.fingerprint = fingerprint
+        self.n_rows = len(df)
+        self.columns = list(df.columns)
+        self._search: Optional[SearchIndex] = None
+        # Column position -> (cardinality, index or None when over the limit)
+        self._categories: Dict[int, Tuple[int, Optional[CategoryIndex]]] = {}
+        self._ranges: Dict[int, SortedIndex] = {}
+        # Recent filter results, keyed by FilterPlan.cache_key()
+        self._results: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def matches(self, df: pd.DataFrame) -> bool:
+        """Check that ``df`` has the shape this index was built for."""
+        return len(df) == self.n_rows and list(df.columns) == self.columns
+    
+    def search_index(self, df: pd.DataFrame) -> SearchIndex:
+        """Get the text search index, building it from ``df`` if needed."""
+        if self._search is None:
+            with self._lock:
+                if self._search is None:
+                    self._search = SearchIndex(df)
+        return self._search
+    
+    def category_index(
+        self,
+        df: pd.DataFrame,
+        position: int,
+        max_values: int
+    ) -> Optional[CategoryIndex]:
+        """
+        Get the category index for a column, building it from ``df`` if needed.
+        
+        Args:
+            df: The indexed DataFrame
+            position: Position of the column in ``df``
+            max_values: Largest number of distinct values worth indexing
+            
+        Returns:
+            CategoryIndex, or None if the column has more than ``max_values``
+            distinct values
+        """
+        cached = self._categories.get(position)
+        if cached is None or (cached[1] is None and cached[0] <= max_values):
+            with self._lock:
+                index = CategoryIndex(df.iloc[:, position])
+                cardinality = len(index.values)
+                cached = (cardinality, index if cardinality <= max_values else None)
+                self._categories[position] = cached
+        cardinality, index = cached
+        return index if cardinality <= max_values else None
+    
+    def range_index(self, df: pd.DataFrame, position: int) -> SortedIndex:
+        """
+        Get the sorted index for a numeric column, building it from ``df`` if needed.
+        
+        Args:
+            df: The indexed DataFrame
+            position: Position of the column in ``df``
+            
+        Returns:
+            SortedIndex for the column
+        """
+        index = self._ranges.get(position)
+        if index is None:
+            with self._lock:
+                index = self._ranges.get(position)
+                if index is None:
+                    index = SortedIndex(df.iloc[:, position])
+                    self._ranges[position] = index
+        return index
+    
+    def get_result(self, key: str) -> Optional[np.ndarray]:
+        """Get a previously stored filter result."""
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+    
+    def store_result(self, key: str, positions: np.ndarray) -> None:
+        """Remember a filter result so identical reruns can skip the work."""
+        with self._lock:
+            self._results[key] = positions
+            while len(self._results) > _RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the built indexes and stored results in bytes."""
+        with self._lock:
+            indexes: List[Any] = [self._search, *self._ranges.values()]
+            indexes.extend(index for _, index in self._categories.values())
+            results = sum(positions.nbytes for positions in self._results.values())
+        return int(results + sum(index.nbytes for index in indexes if index is not None))
+
+
+def get_frame_index(df: pd.DataFrame, fingerprint: Optional[str] = None) -> FrameIndex:
+    """
+    Get the cached FrameIndex for a DataFrame.
+    
+    Args:
+        df: DataFrame to index
+        fingerprint: Precomputed fingerprint of ``df``. Computed if None.
+        
+    Returns:
+        FrameIndex shared by every caller that passes the same data
+    """
+    if fingerprint is None:
+        fingerprint = frame_fingerprint(df)
+    
+    with _index_cache_lock:
+        frame_index = _index_cache.get(fingerprint)
+        if frame_index is not None and frame_index.matches(df):
+            _index_cache.move_to_end(fingerprint)
+            return frame_index
+        
+        frame_index = FrameIndex(fingerprint, df)
+        _index_cache[fingerprint] = frame_index
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+        return frame_index
+
+
+def index_cache_nbytes(fingerprint_prefix: str = '') -> int:
+    """
+    Get the approximate memory held by cached frame indexes.
+    
+    Args:
+        fingerprint_prefix: Only count indexes whose fingerprint starts
+            with this text (every index by default)
+            
+    Returns:
+        Size in bytes
+    """
+    with _index_cache_lock:
+        frame_indexes = [index for key, index in _index_cache.items() if key.startswith(fingerprint_prefix)]
+    return sum(index.nbytes for index in frame_indexes)
+
+
+def trim_index_cache(max_bytes: int) -> None:
+    """
+    Drop least recently used frame indexes until the cache fits a budget.
+    
+    The most recently used index is always kept, so the table being shown
+    does not rebuild its indexes on every rerun.
+    
+    Args:
+        max_bytes: Memory budget of the cached indexes in bytes
+    """
+    with _index_cache_lock:
+        sizes = [index.nbytes for index in _index_cache.values()]
+        total = sum(sizes)
+        for size in sizes[:-1]:
+            if total <= max_bytes:
+                break
+            _index_cache.popitem(last=False)
+            total -= size
+
+
+def clear_index_cache() -> None:
+    """Drop all cached frame indexes."""
+    with _index_cache_lock:
+        _index_cache.clear()
@@ -6,8 +6,9 @@ import pandas as pd
 from typing import Optional, Dict, Any, List, Union
 import streamlit as st
 from luxin.polars_support import handle_polars_in_inspector, is_polars_dataframe
-from luxin.config import InspectorConfig, get_default_config
-from luxin.validation import validate_dataframe, ValidationError
+from luxin.config import AUTO_PROFILE, InspectorConfig, get_auto_config, get_default_config
+from luxin.validation import validate_dataframe, validate_source_mapping, ValidationError
+from luxin import perf
 
 
 class Inspector:
@@ -28,14 +29,25 @@ class Inspector:
         >>> inspector.render()
     """
     
-    def __init__(self, df: Union[pd.DataFrame, Any], config: Optional[InspectorConfig] = None) -> None:
+    def __init__(
+        self,
+        df: Union[pd.DataFrame, Any],
+        config: Optional[Union[InspectorConfig, str]] = None
+    ) -> None:
         """
         Initialize the Inspector with a DataFrame.
         
         Args:
             df: The DataFrame to inspect. Can be a regular pandas DataFrame,
                 Polars DataFrame, or a TrackedDataFrame with aggregation tracking.
-            config: Optional configuration object. If None, uses default config.
+            config: Optional configuration object, or ``'auto'`` to choose
+                performance settings from the data size (see
+                ``luxin.config.get_auto_config``). If None, uses default config.
+                
+        Raises:
+            ValueError: If ``df`` is invalid, ``config`` is an unknown
+                profile name, or ``config.eager_mapping`` is set and the
+                source mapping is invalid
         """
         # Handle Polars DataFrames
         if is_polars_dataframe(df):
@@ -48,7 +60,6 @@ class Inspector:
             raise ValueError(str(e)) from e
         
         self.df = df
-        self.config = config if config is not None else get_default_config()
         self._is_aggregated = False
         self._source_mapping: Dict[Any, List[int]] = {}
         self._groupby_cols: List[str] = []
@@ -60,6 +71,39 @@ class Inspector:
             self._source_mapping = getattr(df, '_source_mapping', {})
             self._groupby_cols = getattr(df, '_groupby_cols', [])
             self._source_df = getattr(df, '_source_df', None)
+        
+        if isinstance(config, str):
+            if config != AUTO_PROFILE:
+                raise ValueError(f"Unknown config profile {config!r}. Supported: {AUTO_PROFILE!r}")
+            detail_rows = len(self._source_df) if self._source_df is not None else 0
+            config = get_auto_config(len(df), detail_rows)
+        self.config = config if config is not None else get_default_config()
+        
+        if self.config.eager_mapping and self._source_mapping and self._source_df is not None:
+            self._prepare_mapping()
+    
+    def _prepare_mapping(self) -> None:
+        """Validate the source mapping and build the detail row lookup up front."""
+        with perf.span('inspector.prepare_mapping', groups=len(self._source_mapping)):
+            try:
+                # Also builds the cached IndexResolver used to gather detail rows
+                validate_source_mapping(self._source_mapping, self.df, self._source_df)
+            except ValidationError as e:
+                raise ValueError(str(e)) from e
+    
+    def memory_usage_report(self) -> pd.Series:
+        """
+        Break down the memory held by the inspected data.
+        
+        Returns:
+            Bytes held by the DataFrame, its source DataFrame and source
+            mapping (zero when not aggregated), cached filter indexes and
+            summary statistics, detail frames kept by a Jupyter kernel, and
+            their total
+            (see ``luxin.memory.memory_usage_report``)
+        """
+        from luxin.memory import memory_usage_report
+        return memory_usage_report(self.df, self._source_df, self._source_mapping)
     
     def render(self) -> None:
         """
@@ -68,6 +112,10 @@ class Inspector:
         This method must be called within a Streamlit app context.
         It will display the aggregated data (if available) or the
         source data, with interactive drill-down capabilities.
+        
+        With ``config.show_perf_panel``, the rendering is timed (see
+        ``luxin.perf``) for this session only and a breakdown of the rerun
+        is shown at the end.
         """
         try:
             import streamlit as st
@@ -78,27 +126,39 @@ class Inspector:
                 "Or install luxin with Streamlit: pip install luxin[streamlit]"
             ) from None
         
-        if self._is_aggregated and self._source_df is not None:
-            # Display aggregated view with drill-down
-            from luxin.components.table_view import render_table_view
-            render_table_view(
-                agg_df=self.df,
-                detail_df=self._source_df,
-                source_mapping=self._source_mapping,
-                groupby_cols=self._groupby_cols,
-                config=self.config
-            )
+        if self.config.show_perf_panel:
+            # Record this session's spans for the panel, only while rendering
+            from luxin.components.perf_panel import get_session_sink, render_perf_panel
+            sink = get_session_sink()
+            with perf.capture(sink):
+                self._render_view()
+            render_perf_panel(sink)
         else:
-            # Display source data only (no aggregation tracking)
-            st.dataframe(self.df, use_container_width=True)
-            st.info(
-                "💡 Tip: To enable drill-down capabilities, use TrackedDataFrame:\n\n"
-                "```python\n"
-                "from luxin import TrackedDataFrame, Inspector\n"
-                "df = TrackedDataFrame(your_data)\n"
-                "agg = df.groupby('column').agg({'value': 'sum'})\n"
-                "inspector = Inspector(agg)\n"
-                "inspector.render()\n"
-                "```"
-            )
-
+            self._render_view()
+    
+    def _render_view(self) -> None:
+        """Render the table view, or the plain data without drill-down."""
+        with perf.span('inspector.render', rows=len(self.df)):
+            if self._is_aggregated and self._source_df is not None:
+                # Display aggregated view with drill-down
+                from luxin.components.table_view import render_table_view
+                render_table_view(
+                    agg_df=self.df,
+                    detail_df=self._source_df,
+                    source_mapping=self._source_mapping,
+                    groupby_cols=self._groupby_cols,
+                    config=self.config
+                )
+            else:
+                # Display source data only (no aggregation tracking)
+                st.dataframe(self.df, use_container_width=True)
+                st.info(
+                    "💡 Tip: To enable drill-down capabilities, use TrackedDataFrame:\n\n"
+                    "```python\n"
+                    "from luxin import TrackedDataFrame, Inspector\n"
+                    "df = TrackedDataFrame(your_data)\n"
+                    "agg = df.groupby('column').agg({'value': 'sum'})\n"
+                    "inspector = Inspector(agg)\n"
+                    "inspector.render()\n"
+                    "```"
+                )
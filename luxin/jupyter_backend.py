@@ -2,9 +2,64 @@
 Jupyter notebook backend for displaying interactive drill-down tables.
 """
 
+import random
+import string
+import sys
+import threading
+import weakref
+from collections import OrderedDict
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from IPython.display import display, HTML
+from luxin import perf
+
+# Comm target the rendered tables open to fetch detail rows from the kernel
+COMM_TARGET = 'luxin.detail'
+
+# Detail rows per page fetched from the kernel (matches render_detail_panel)
+DEFAULT_PAGE_SIZE = 100
+
+# Number of displayed tables whose detail data stays fetchable per kernel
+MAX_REGISTERED_TABLES = 32
+
+# Table id -> (detail DataFrame, detail labels per group id)
+_detail_sources: "OrderedDict[str, Tuple[pd.DataFrame, List[List[Any]]]]" = OrderedDict()
+# Tables displayed with kernel fetching whose frontend has not connected
+# yet: their detail DataFrame is only weakly referenced until it does
+_pending_sources: "OrderedDict[str, Tuple[weakref.ref, List[List[Any]]]]" = OrderedDict()
+_detail_sources_lock = threading.Lock()
+_comm_target_registered = False
+# Whether the shared CSS/JS runtime was sent to the notebook this session
+_runtime_loaded = False
+# Cell whose output carries the runtime (its id, or its source when the
+# frontend sends no id), recorded once that cell finishes running
+_runtime_cell: Optional[str] = None
+_runtime_cell_pending = False
+_cell_hooks_registered = False
+
+
+def init_notebook(force: bool = False) -> None:
+    """
+    Load the shared luxin CSS and JavaScript runtime into the notebook.
+    
+    Drill tables displayed afterwards only carry their own data. Calling
+    this is optional: the first table displayed in a session loads the
+    runtime itself, and it is sent again when the cell carrying it is re-run.
+    Call it with ``force=True`` if that output was cleared or the notebook
+    was reopened; tables already on the page mount once it loads.
+    
+    Does nothing in frontends rendering each output in its own frame
+    (Google Colab), where every table carries the runtime instead.
+    
+    Args:
+        force: Send the runtime even if it was already loaded this session
+    """
+    if (_runtime_loaded and not force) or _outputs_isolated():
+        return
+    from luxin.display import render_runtime
+    
+    display(HTML(render_runtime()))
+    _mark_runtime_sent()
 
 
 def display_jupyter(
@@ -17,18 +72,282 @@ def display_jupyter(
     """
     Display an interactive drill-down table in Jupyter notebook.
     
+    Detail rows are embedded within the payload budget, as by
+    ``render_html``. When a kernel is running, groups cut short by the
+    budget (or by ``max_rows_per_group``) fetch their remaining rows from
+    it a page at a time over a comm channel. Only frontends exposing the
+    classic notebook ``Jupyter`` object can open that channel, so the
+    embedded rows are never reduced on the assumption that it works, and
+    the kernel keeps the detail rows only once the table opens it (until
+    then they stay fetchable while ``detail_df`` is alive elsewhere).
+    
+    The shared CSS/JS runtime is sent with the first table of the session
+    (or by ``init_notebook``), and again once the cell carrying it is re-run;
+    other tables carry only their data. Frontends rendering each output in
+    its own frame (Google Colab) cannot share it, so there every table
+    carries the runtime.
+    
     Args:
         agg_df: The aggregated DataFrame to display
         detail_df: The detail DataFrame containing source rows
         source_mapping: Dictionary mapping aggregated row keys to detail row indices
         groupby_cols: List of column names used to group the data
-        **kwargs: Additional options for display customization
+        **kwargs: Additional options for display customization. Supports
+            ``max_rows_per_group``, ``max_payload_bytes`` and ``compression``
+            (see render_html), ``lazy`` (default True; False never fetches
+            from the kernel) and ``page_size``.
     """
-    from luxin.display import render_html
+    from luxin.display import render_html, DEFAULT_MAX_PAYLOAD_BYTES
+    
+    table_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    isolated = _outputs_isolated()
+    include_runtime = isolated or not _runtime_loaded
+    page_size = kwargs.get('page_size', DEFAULT_PAGE_SIZE)
+    max_rows_per_group = kwargs.get('max_rows_per_group')
+    
+    kernel_fetch = kwargs.get('lazy', True) and _register_comm_target()
+    if kernel_fetch:
+        _add_pending_source(table_id, detail_df, source_mapping)
     
     # Render the HTML
-    html = render_html(agg_df, detail_df, source_mapping, groupby_cols)
+    html = render_html(
+        agg_df,
+        detail_df,
+        source_mapping,
+        groupby_cols,
+        max_rows_per_group=max_rows_per_group,
+        max_payload_bytes=kwargs.get('max_payload_bytes', DEFAULT_MAX_PAYLOAD_BYTES),
+        compression=kwargs.get('compression'),
+        table_id=table_id,
+        kernel_fetch=kernel_fetch,
+        page_size=page_size,
+        include_runtime=include_runtime
+    )
     
     # Display in notebook
     display(HTML(html))
+    if include_runtime and not isolated:
+        _mark_runtime_sent()
+
+
+def register_detail_source(
+    table_id: str,
+    detail_df: pd.DataFrame,
+    source_mapping: Dict[Any, List[int]]
+) -> None:
+    """
+    Make a table's detail rows fetchable with ``fetch_detail_page``.
+    
+    Only the most recent MAX_REGISTERED_TABLES tables are kept.
+    
+    Args:
+        table_id: Unique id of the rendered table
+        detail_df: The detail DataFrame containing source rows
+        source_mapping: Dictionary mapping aggregated row keys to detail row indices
+    """
+    _store_detail_source(table_id, detail_df, list(source_mapping.values()))
+
+
+def detail_sources_nbytes(exclude: Optional[pd.DataFrame] = None) -> int:
+    """
+    Measure the memory the kernel holds to serve detail pages.
+    
+    Args:
+        exclude: Detail DataFrame not to count (e.g. one measured elsewhere)
+        
+    Returns:
+        Deep size in bytes of the registered detail DataFrames, each counted
+        once, plus the per-group label lists of every registered table
+    """
+    with _detail_sources_lock:
+        sources = list(_detail_sources.values())
+    frames = {id(detail_df): detail_df for detail_df, _ in sources if detail_df is not exclude}
+    total = sum(int(df.memory_usage(index=True, deep=True).sum()) for df in frames.values())
+    return total + sum(sys.getsizeof(groups) for _, groups in sources)
+
+
+def _store_detail_source(table_id: str, detail_df: pd.DataFrame, groups: List[List[Any]]) -> None:
+    """Register a table's detail rows, dropping the oldest tables over the limit."""
+    with _detail_sources_lock:
+        _pending_sources.pop(table_id, None)
+        _detail_sources[table_id] = (detail_df, groups)
+        _detail_sources.move_to_end(table_id)
+        while len(_detail_sources) > MAX_REGISTERED_TABLES:
+            _detail_sources.popitem(last=False)
+
 
+def _add_pending_source(
+    table_id: str,
+    detail_df: pd.DataFrame,
+    source_mapping: Dict[Any, List[int]]
+) -> None:
+    """Remember a displayed table's detail rows without keeping them alive."""
+    with _detail_sources_lock:
+        _pending_sources[table_id] = (weakref.ref(detail_df), list(source_mapping.values()))
+        while len(_pending_sources) > MAX_REGISTERED_TABLES:
+            _pending_sources.popitem(last=False)
+
+
+def _activate_source(table_id: Any) -> None:
+    """Register a pending table once its frontend connects, if its rows still exist."""
+    with _detail_sources_lock:
+        pending = _pending_sources.pop(table_id, None) if isinstance(table_id, str) else None
+    if pending is None:
+        return
+    detail_ref, groups = pending
+    detail_df = detail_ref()
+    if detail_df is not None:
+        _store_detail_source(table_id, detail_df, groups)
+
+
+@perf.timed('jupyter.fetch_detail_page')
+def fetch_detail_page(
+    table_id: str,
+    group: int,
+    offset: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE
+) -> Dict[str, Any]:
+    """
+    Get one page of a group's detail rows for a rendered table.
+    
+    Args:
+        table_id: Unique id of the rendered table
+        group: Group id, the group's position in the table's source mapping
+        offset: Position of the first row of the page within the group
+        limit: Maximum number of rows in the page
+        
+    Returns:
+        Dictionary with ``offset``, ``total`` (rows in the group) and
+        ``detail_data`` (columnar JSON text of the page)
+        
+    Raises:
+        KeyError: If the table or group is not registered
+    """
+    from luxin.payload import encode_detail_page
+    
+    _activate_source(table_id)
+    with _detail_sources_lock:
+        source = _detail_sources.get(table_id)
+    if source is None:
+        raise KeyError(f"Table {table_id!r} is no longer registered. Re-run the cell to refresh it.")
+    detail_df, groups = source
+    if not isinstance(group, int) or not 0 <= group < len(groups):
+        raise KeyError(f"Group {group!r} not found in table {table_id!r}.")
+    
+    labels = groups[group]
+    offset = max(0, int(offset))
+    return {
+        'offset': offset,
+        'total': len(labels),
+        'detail_data': encode_detail_page(detail_df, labels, offset, max(1, int(limit))),
+    }
+
+
+def _register_comm_target() -> bool:
+    """
+    Register the detail comm target with the running kernel, once.
+    
+    Returns:
+        True if tables can fetch detail rows from the kernel
+    """
+    global _comm_target_registered
+    if _comm_target_registered:
+        return True
+    
+    manager = _get_comm_manager()
+    if manager is None:
+        return False
+    manager.register_target(COMM_TARGET, _open_detail_comm)
+    _comm_target_registered = True
+    return True
+
+
+def _outputs_isolated() -> bool:
+    """Check whether cell outputs render in separate frames (Google Colab)."""
+    return 'google.colab' in sys.modules
+
+
+def _mark_runtime_sent() -> None:
+    """Record that the running cell's output carries the runtime."""
+    global _runtime_loaded, _runtime_cell_pending
+    _runtime_loaded = True
+    _runtime_cell_pending = True
+    _register_cell_hooks()
+
+
+def _register_cell_hooks() -> None:
+    """Watch cell runs so the runtime is re-sent when its output is replaced."""
+    global _cell_hooks_registered
+    if _cell_hooks_registered:
+        return
+    try:
+        from IPython import get_ipython
+    except ImportError:
+        return
+    shell = get_ipython()
+    if shell is None:
+        return
+    shell.events.register('pre_run_cell', _on_pre_run_cell)
+    shell.events.register('post_run_cell', _on_post_run_cell)
+    _cell_hooks_registered = True
+
+
+def _cell_key(info: Any) -> Optional[str]:
+    """Identify a cell by its frontend id, falling back to its source."""
+    return getattr(info, 'cell_id', None) or getattr(info, 'raw_cell', None)
+
+
+def _on_pre_run_cell(info: Any) -> None:
+    """Forget the runtime when the cell whose output carries it runs again."""
+    global _runtime_loaded, _runtime_cell
+    if _runtime_cell is not None and _cell_key(info) == _runtime_cell:
+        _runtime_loaded = False
+        _runtime_cell = None
+
+
+def _on_post_run_cell(result: Any) -> None:
+    """Remember the cell that just sent the runtime."""
+    global _runtime_cell, _runtime_cell_pending
+    if _runtime_cell_pending:
+        _runtime_cell = _cell_key(result.info)
+        _runtime_cell_pending = False
+
+
+def _get_comm_manager() -> Optional[Any]:
+    """Get the kernel's comm manager, or None outside a kernel."""
+    try:
+        from IPython import get_ipython
+    except ImportError:
+        return None
+    kernel = getattr(get_ipython(), 'kernel', None)
+    if kernel is None:
+        return None
+    manager = getattr(kernel, 'comm_manager', None)
+    if manager is None:
+        try:
+            from comm import get_comm_manager
+        except ImportError:
+            return None
+        manager = get_comm_manager()
+    return manager
+
+
+def _open_detail_comm(comm: Any, open_msg: Dict[str, Any]) -> None:
+    """Register the table opening the comm and answer its page requests."""
+    _activate_source(open_msg.get('content', {}).get('data', {}).get('table'))
+    
+    def _on_msg(msg: Dict[str, Any]) -> None:
+        request = msg['content']['data']
+        reply: Dict[str, Any] = {'request': request.get('request')}
+        try:
+            reply.update(fetch_detail_page(
+                request['table'],
+                request['group'],
+                request.get('offset', 0),
+                request.get('limit', DEFAULT_PAGE_SIZE)
+            ))
+        except (KeyError, ValueError) as exc:
+            reply['error'] = str(exc.args[0] if exc.args else exc)
+        comm.send(reply)
+    
+    comm.on_msg(_on_msg)
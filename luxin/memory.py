@@ -0,0 +1,81 @@
+"""
+Memory accounting for luxin's data structures.
+"""
+
+import sys
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from luxin.indexes import index_cache_nbytes
+from luxin.stats import stats_cache_nbytes
+from luxin.utils import frame_fingerprint
+
+
+def memory_usage_report(
+    agg_df: pd.DataFrame,
+    source_df: Optional[pd.DataFrame] = None,
+    source_mapping: Optional[Dict[Any, List[Any]]] = None
+) -> pd.Series:
+    """
+    Break down the memory held for a drill-down table.
+    
+    DataFrames are measured deeply (``memory_usage(deep=True)``, including
+    their index). The source mapping is measured as Python objects: the
+    dict, its key tuples, the index lists and every label in them. Cached
+    artifacts are the filter indexes and summary statistics cached for
+    ``agg_df`` (found by its fingerprint). Detail sources are the frames a
+    Jupyter kernel keeps so displayed tables can fetch detail pages; they
+    are shared by every table, and ``source_df`` is not counted again.
+    
+    Sizes are upper bounds where memory is shared: ``source_df`` may share
+    column buffers with the frame it was built from, and small integers in
+    the mapping are shared by the interpreter.
+    
+    Args:
+        agg_df: The aggregated DataFrame
+        source_df: The detail DataFrame behind it, if any
+        source_mapping: Dictionary mapping aggregated row keys to detail row indices
+        
+    Returns:
+        Series of sizes in bytes indexed by ``aggregate``, ``source_df``,
+        ``source_mapping``, ``filter_indexes``, ``summary_stats``,
+        ``detail_sources`` and ``total``
+    """
+    from luxin.jupyter_backend import detail_sources_nbytes
+    
+    fingerprint = frame_fingerprint(agg_df)
+    report = pd.Series({
+        'aggregate': _frame_nbytes(agg_df),
+        'source_df': _frame_nbytes(source_df) if source_df is not None else 0,
+        'source_mapping': source_mapping_nbytes(source_mapping) if source_mapping else 0,
+        'filter_indexes': index_cache_nbytes(fingerprint),
+        'summary_stats': stats_cache_nbytes(fingerprint),
+        'detail_sources': detail_sources_nbytes(exclude=source_df),
+    }, dtype='int64', name='bytes')
+    report['total'] = report.sum()
+    return report
+
+
+def source_mapping_nbytes(source_mapping: Dict[Any, List[Any]]) -> int:
+    """
+    Measure a source mapping including Python object overhead.
+    
+    Args:
+        source_mapping: Dictionary mapping aggregated row keys to detail row indices
+        
+    Returns:
+        Size in bytes of the dict, its keys, the index lists and their labels
+    """
+    total = sys.getsizeof(source_mapping)
+    for key, labels in source_mapping.items():
+        total += sys.getsizeof(key)
+        if isinstance(key, tuple):
+            total += sum(map(sys.getsizeof, key))
+        total += sys.getsizeof(labels) + sum(map(sys.getsizeof, labels))
+    return total
+
+
+def _frame_nbytes(df: pd.DataFrame) -> int:
+    """Deep size of a DataFrame, index included."""
+    return int(df.memory_usage(index=True, deep=True).sum())
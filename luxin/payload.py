@@ -0,0 +1,364 @@
+"""
+Compact columnar encoding of drill-down data for the HTML/JavaScript frontend.
+
+Detail rows are shipped column by column: column names appear once, numeric
+columns are base64-encoded typed arrays (optionally deflate-compressed), and
+other columns are dictionary encoded (distinct values once, plus an integer
+code per row). Groups refer to embedded rows by integer position.
+"""
+
+import base64
+import json
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from luxin.utils import get_index_resolver
+
+# Default cap on the detail data embedded in a rendered table (20 MB)
+DEFAULT_MAX_PAYLOAD_BYTES = 20 * 1024 * 1024
+
+# Supported values for the ``compression`` option
+COMPRESSIONS = (None, 'deflate')
+
+# Typed array names used in the payload and their little-endian NumPy dtypes
+_BUFFER_DTYPES = {'float64': '<f8', 'int32': '<i4', 'int16': '<i2', 'int8': 'i1', 'uint8': 'u1'}
+
+# Integer typed arrays, smallest first
+_INT_BUFFERS = ('int8', 'int16', 'int32')
+
+# Number of rows encoded to estimate the payload size per detail row
+_SIZE_SAMPLE_ROWS = 200
+
+# Bytes of a buffer compressed and base64-encoded at a time (a multiple of
+# 3, so base64 pieces concatenate without padding)
+_ENCODE_CHUNK_BYTES = 3 * 1024 * 1024
+
+
+def encode_frame(
+    df: pd.DataFrame,
+    compression: Optional[str] = None,
+    rows: Optional[np.ndarray] = None
+) -> str:
+    """
+    Encode a DataFrame's columns (not its index) as columnar JSON.
+    
+    The result has the shape ``{"columns": [...], "length": n, "data": [...]}``.
+    Numeric and boolean columns are ``{"values": <buffer>}``; every other
+    column is dictionary encoded as ``{"dict": [...], "codes": <buffer>}``
+    with code -1 for missing values. A buffer is a little-endian typed
+    array, ``{"dtype": "float64" | "int32" | "int16" | "int8" | "uint8",
+    "base64": ...}``, with
+    ``"deflate": true`` when compressed. Missing numbers are NaN and
+    missing booleans are 2.
+    
+    Columns are encoded one at a time, so selecting ``rows`` copies a
+    single column at a time instead of the whole selection.
+    
+    Args:
+        df: DataFrame to encode
+        compression: None, or ``'deflate'`` to zlib-compress every buffer
+        rows: Optional row positions to encode, in order (all rows if None)
+        
+    Returns:
+        JSON text, safe to embed inside a ``<script>`` element
+        
+    Raises:
+        ValueError: If ``compression`` is not supported
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(
+            f"Unsupported compression {compression!r}. "
+            f"Supported: {', '.join(repr(c) for c in COMPRESSIONS)}"
+        )
+    columns = json.dumps([str(col) for col in df.columns])
+    length = len(df) if rows is None else len(rows)
+    data = ','.join(
+        _encode_column(df.iloc[:, i] if rows is None else df.iloc[:, i].take(rows), compression)
+        for i in range(len(df.columns))
+    )
+    return _script_safe(f'{{"columns":{columns},"length":{length},"data":[{data}]}}')
+
+
+def _encode_column(column: pd.Series, compression: Optional[str]) -> str:
+    """Encode one column as a typed array or a dictionary-encoded array."""
+    dtype = column.dtype
+    is_categorical = isinstance(dtype, pd.CategoricalDtype)
+    if is_categorical:
+        # Categories are shown as text, whatever their type
+        pass
+    elif pd.api.types.is_bool_dtype(dtype):
+        values = column.to_numpy(dtype='float64', na_value=np.nan)
+        flags = np.where(np.isnan(values), 2, values).astype(np.uint8)
+        return '{"values":' + _encode_buffer(flags, 'uint8', compression) + '}'
+    elif pd.api.types.is_integer_dtype(dtype) and not column.hasnans:
+        int_dtype = _smallest_int_buffer(column)
+        if int_dtype is not None:
+            values = column.to_numpy(dtype='int64')
+            return '{"values":' + _encode_buffer(values, int_dtype, compression) + '}'
+        # Too wide for an Int32Array
+        values = column.to_numpy(dtype='float64')
+        return '{"values":' + _encode_buffer(values, 'float64', compression) + '}'
+    elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_complex_dtype(dtype):
+        values = column.to_numpy(dtype='float64', na_value=np.nan)
+        return '{"values":' + _encode_buffer(values, 'float64', compression) + '}'
+    
+    # Everything else (including complex numbers) is shown as text: encode
+    # each distinct value once
+    try:
+        codes, uniques = pd.factorize(column)
+    except TypeError:
+        # Unhashable cells (lists, dicts) are told apart by their text
+        codes, uniques = pd.factorize(column.map(str, na_action='ignore'))
+    labels = [str(value) for value in uniques.tolist()]
+    return (
+        '{"dict":' + json.dumps(labels)
+        + ',"codes":' + _encode_buffer(codes, _smallest_int_buffer(codes), compression) + '}'
+    )
+
+
+def _smallest_int_buffer(values: Any) -> Optional[str]:
+    """Get the smallest integer typed array holding ``values``, if any."""
+    low = int(values.min()) if len(values) else 0
+    high = int(values.max()) if len(values) else 0
+    for name in _INT_BUFFERS:
+        info = np.iinfo(_BUFFER_DTYPES[name])
+        if info.min <= low and high <= info.max:
+            return name
+    return None
+
+
+def _encode_buffer(values: np.ndarray, dtype: str, compression: Optional[str]) -> str:
+    """Encode an array as a base64 little-endian typed array buffer."""
+    raw = memoryview(np.ascontiguousarray(values, dtype=_BUFFER_DTYPES[dtype])).cast('B')
+    if compression == 'deflate':
+        compressor = zlib.compressobj(6)
+        compressed = bytearray()
+        for start in range(0, len(raw), _ENCODE_CHUNK_BYTES):
+            compressed += compressor.compress(raw[start:start + _ENCODE_CHUNK_BYTES])
+        compressed += compressor.flush()
+        return f'{{"dtype":"{dtype}","deflate":true,"base64":"{_base64(memoryview(compressed))}"}}'
+    return f'{{"dtype":"{dtype}","base64":"{_base64(raw)}"}}'
+
+
+def _base64(raw: memoryview) -> str:
+    """Base64-encode a byte buffer in chunks, without copying it whole."""
+    return ''.join(
+        base64.b64encode(raw[start:start + _ENCODE_CHUNK_BYTES]).decode('ascii')
+        for start in range(0, len(raw), _ENCODE_CHUNK_BYTES)
+    )
+
+
+def _encode_int_buffer(values: np.ndarray, compression: Optional[str]) -> str:
+    """Encode integers in the smallest typed array that holds them."""
+    values = np.asarray(values, dtype=np.int64)
+    return _encode_buffer(values, _smallest_int_buffer(values) or 'float64', compression)
+
+
+def _script_safe(text: str) -> str:
+    """Escape sequences that would end an enclosing ``<script>`` element."""
+    return text.replace('</', '<\\/')
+
+
+def build_drill_payload(
+    detail_df: pd.DataFrame,
+    source_mapping: Dict[Any, List[int]],
+    max_rows_per_group: Optional[int] = None,
+    max_payload_bytes: Optional[int] = DEFAULT_MAX_PAYLOAD_BYTES,
+    compression: Optional[str] = None
+) -> Dict[str, str]:
+    """
+    Encode the detail data needed to drill into every group.
+    
+    Only detail rows referenced by ``source_mapping`` are embedded. Groups
+    are truncated to their first ``max_rows_per_group`` rows, and further
+    to a common per-group limit if the embedded rows would exceed
+    ``max_payload_bytes``.
+    
+    Args:
+        detail_df: The detail DataFrame containing source rows
+        source_mapping: Dictionary mapping aggregated row keys to detail row indices
+        max_rows_per_group: Optional cap on detail rows embedded per group
+        max_payload_bytes: Approximate budget for embedded detail data in
+            bytes, or None for no budget
+        compression: None, or ``'deflate'`` to compress the detail columns
+        
+    Returns:
+        Dictionary of JSON texts: ``detail_data`` (columnar embedded rows)
+        and integer buffers indexed by group id, the position of each group
+        in ``source_mapping``: ``group_sizes`` (total rows per group),
+        ``group_starts`` and ``group_rows`` (the embedded row positions of
+        group ``g`` are ``group_rows[group_starts[g]:group_starts[g + 1]]``)
+    """
+    group_labels, group_sizes = _group_source_mapping(source_mapping)
+    row_limit = _embedded_row_limit(
+        detail_df, group_labels, group_sizes, max_rows_per_group, max_payload_bytes, compression
+    )
+    if row_limit is not None:
+        group_labels = [labels[:row_limit] for labels in group_labels]
+    
+    detail_positions = _detail_positions(detail_df, group_labels)
+    embedded_positions, group_positions = _embedded_positions(detail_positions)
+    
+    group_starts = np.zeros(len(group_positions) + 1, dtype=np.int64)
+    np.cumsum([len(positions) for positions in group_positions], out=group_starts[1:])
+    group_rows = np.concatenate(group_positions) if group_positions else np.empty(0, dtype=np.int64)
+    
+    return {
+        'detail_data': encode_frame(detail_df, compression, rows=embedded_positions),
+        'group_sizes': _encode_int_buffer(group_sizes, compression),
+        'group_starts': _encode_int_buffer(group_starts, compression),
+        'group_rows': _encode_int_buffer(group_rows, compression),
+    }
+
+
+def encode_row_groups(
+    agg_df: pd.DataFrame,
+    source_mapping: Dict[Any, List[int]],
+    compression: Optional[str] = None
+) -> str:
+    """
+    Encode the group id of every aggregated row.
+    
+    Group ids are positions in ``source_mapping``. Rows are matched to
+    groups by index value, so the aggregate may be sorted or filtered
+    independently of the mapping.
+    
+    Args:
+        agg_df: The aggregated DataFrame being displayed
+        source_mapping: Dictionary mapping aggregated row keys to detail row indices
+        compression: None, or ``'deflate'`` to compress the buffer
+        
+    Returns:
+        Integer buffer JSON with one group id per row, -1 for rows without
+        detail data
+    """
+    group_ids = {key: group for group, key in enumerate(source_mapping)}
+    is_multi = isinstance(agg_df.index, pd.MultiIndex)
+    row_groups = np.empty(len(agg_df), dtype=np.int64)
+    for row, value in enumerate(agg_df.index):
+        # Keys are tuples, as in TrackedDataFrame; scalar keys are accepted too
+        group = group_ids.get(value if is_multi else (value,))
+        if group is None and not is_multi:
+            group = group_ids.get(value)
+        row_groups[row] = -1 if group is None else group
+    return _encode_int_buffer(row_groups, compression)
+
+
+def encode_detail_page(
+    detail_df: pd.DataFrame,
+    labels: Sequence[Any],
+    offset: int,
+    limit: int,
+    compression: Optional[str] = None
+) -> str:
+    """
+    Encode one page of a group's detail rows for on-demand fetching.
+    
+    Args:
+        detail_df: The detail DataFrame containing source rows
+        labels: Index labels of the group's detail rows
+        offset: Position of the first row of the page within the group
+        limit: Maximum number of rows in the page
+        compression: None, or ``'deflate'`` to compress the columns
+        
+    Returns:
+        Columnar JSON text of the page's rows (see ``encode_frame``)
+    """
+    page_labels = list(labels[offset:offset + limit])
+    positions = _detail_positions(detail_df, [page_labels])[0]
+    return encode_frame(detail_df, compression, rows=positions)
+
+
+def _group_source_mapping(
+    source_mapping: Dict[Any, List[int]]
+) -> Tuple[List[List[Any]], np.ndarray]:
+    """
+    Split a source mapping into parallel lists of labels and sizes.
+    
+    Args:
+        source_mapping: Dictionary mapping aggregated row keys to detail row indices
+        
+    Returns:
+        Tuple of (detail labels per group, group sizes), in mapping order
+    """
+    group_labels = list(source_mapping.values())
+    group_sizes = np.array([len(labels) for labels in group_labels], dtype=np.int64)
+    return group_labels, group_sizes
+
+
+def _embedded_row_limit(
+    detail_df: pd.DataFrame,
+    group_labels: List[List[Any]],
+    group_sizes: np.ndarray,
+    max_rows_per_group: Optional[int],
+    max_payload_bytes: Optional[int],
+    compression: Optional[str] = None
+) -> Optional[int]:
+    """
+    Choose how many detail rows to embed per group.
+    
+    The per-row size is estimated by encoding a small sample; the limit is
+    the largest one whose embedded rows fit ``max_payload_bytes``.
+    
+    Returns:
+        Rows to embed per group, or None to embed every referenced row
+    """
+    limit = max_rows_per_group
+    if max_payload_bytes is None or len(group_sizes) == 0:
+        return limit
+    
+    sample_labels: List[Any] = []
+    for labels in group_labels:
+        sample_labels.extend(labels[:_SIZE_SAMPLE_ROWS - len(sample_labels)])
+        if len(sample_labels) >= _SIZE_SAMPLE_ROWS:
+            break
+    if not sample_labels:
+        return limit
+    embedded_positions, sample_positions = _embedded_positions(_detail_positions(detail_df, [sample_labels]))
+    sample_bytes = (
+        len(encode_frame(detail_df, compression, rows=embedded_positions))
+        + len(_encode_int_buffer(sample_positions[0], compression))
+    )
+    row_bytes = max(1.0, sample_bytes / len(sample_labels))
+    budget_rows = int(max_payload_bytes // row_bytes)
+    
+    sizes = np.sort(group_sizes if limit is None else np.minimum(group_sizes, limit))
+    if sizes.sum() <= budget_rows:
+        return limit
+    
+    # Largest common limit c with sum(min(size, c)) <= budget_rows
+    prefix = np.concatenate([[0], np.cumsum(sizes)])
+    n_groups = len(sizes)
+    low, high = 0, int(sizes[-1])
+    while low < high:
+        candidate = (low + high + 1) // 2
+        n_small = int(np.searchsorted(sizes, candidate, side='right'))
+        embedded = prefix[n_small] + (n_groups - n_small) * candidate
+        if embedded <= budget_rows:
+            low = candidate
+        else:
+            high = candidate - 1
+    return low
+
+
+def _detail_positions(detail_df: pd.DataFrame, group_labels: List[List[Any]]) -> List[np.ndarray]:
+    """Translate each group's index labels to row positions in ``detail_df``."""
+    # Labels missing from the detail frame cannot be shown
+    return get_index_resolver(detail_df.index).group_positions(group_labels)
+
+
+def _embedded_positions(detail_positions: List[np.ndarray]) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """
+    Deduplicate the referenced detail rows.
+    
+    Returns:
+        Tuple of (sorted detail positions to embed, each group's positions
+        within the embedded rows)
+    """
+    if not detail_positions:
+        return np.empty(0, dtype=np.int64), []
+    embedded = np.unique(np.concatenate(detail_positions))
+    return embedded, [np.searchsorted(embedded, positions) for positions in detail_positions]
@@ -0,0 +1,272 @@
+"""
+Timing spans around luxin's processing stages.
+
+Instrumentation is off by default and then costs one flag check per span.
+Enable it with one or more sinks that receive every finished span::
+
+    from luxin import perf
+    
+    buffer = perf.RingBufferSink()
+    perf.enable(buffer, perf.LoggingSink())
+    ...
+    for record in buffer.last_trace():
+        print(record.name, record.duration)
+        
+Span names are ``<module>.<stage>``, e.g. ``groupby.agg``,
+``display.render_html`` or ``filters.apply``. Spans nest: a span opened
+while another is running on the same thread records its depth, and the
+outermost span (depth 0) closes a trace, e.g. one Streamlit rerun of
+``Inspector.render``.
+
+To time one thread only, such as one Streamlit session's script run, use
+``capture``; instrumentation stays off once no capture is running::
+
+    with perf.capture(buffer):
+        ...
+"""
+
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+# Records kept by a RingBufferSink by default
+DEFAULT_RING_BUFFER_SIZE = 1000
+
+_enabled = False
+# Whether enable() turned instrumentation on, apart from running captures
+_enabled_globally = False
+_active_captures = 0
+_sinks: Tuple[Any, ...] = ()
+_sinks_lock = threading.Lock()
+_local = threading.local()
+_DISABLED_SPAN = nullcontext()
+
+logger = logging.getLogger('luxin.perf')
+
+
+@dataclass
+class SpanRecord:
+    """
+    A finished timing span.
+    
+    Attributes:
+        name: Stage name, e.g. ``'display.render_html'``
+        duration: Wall-clock duration in seconds
+        depth: Number of spans open around this one on the same thread
+        started: Start time (``time.time()``)
+        attributes: Extra details given when the span was opened (row counts, ...)
+    """
+    name: str
+    duration: float
+    depth: int
+    started: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+class LoggingSink:
+    """Log every span to the ``luxin.perf`` logger (or another logger)."""
+    
+    def __init__(self, logger_: Optional[logging.Logger] = None, level: int = logging.DEBUG) -> None:
+        self.logger = logger_ if logger_ is not None else logger
+        self.level = level
+    
+    def emit(self, record: SpanRecord) -> None:
+        if self.logger.isEnabledFor(self.level):
+            details = ''.join(f' {key}={value}' for key, value in record.attributes.items())
+            self.logger.log(
+                self.level, '%s%s took %.2f ms%s',
+                '  ' * record.depth, record.name, record.duration * 1000, details
+            )
+
+
+class CallbackSink:
+    """Pass every span to a function."""
+    
+    def __init__(self, callback: Callable[[SpanRecord], Any]) -> None:
+        self.callback = callback
+    
+    def emit(self, record: SpanRecord) -> None:
+        self.callback(record)
+
+
+class RingBufferSink:
+    """
+    Keep the most recent spans in memory.
+    
+    Args:
+        capacity: Number of spans kept; older ones are dropped
+    """
+    
+    def __init__(self, capacity: int = DEFAULT_RING_BUFFER_SIZE) -> None:
+        self._records: "deque[SpanRecord]" = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+    
+    def emit(self, record: SpanRecord) -> None:
+        with self._lock:
+            self._records.append(record)
+    
+    def records(self) -> List[SpanRecord]:
+        """Get the kept spans, oldest first (in the order they finished)."""
+        with self._lock:
+            return list(self._records)
+    
+    def last_trace(self) -> List[SpanRecord]:
+        """
+        Get the spans of the most recently finished outermost span.
+        
+        Returns:
+            The outermost span's nested spans in the order they finished,
+            followed by the outermost span itself; empty if none finished
+        """
+        records = self.records()
+        end = next((i for i in range(len(records) - 1, -1, -1) if records[i].depth == 0), None)
+        if end is None:
+            return []
+        start = end
+        while start > 0 and records[start - 1].depth > 0:
+            start -= 1
+        return records[start:end + 1]
+    
+    def clear(self) -> None:
+        """Drop every kept span."""
+        with self._lock:
+            self._records.clear()
+
+
+def enable(*sinks: Union[Any, Callable[[SpanRecord], Any]]) -> None:
+    """
+    Turn instrumentation on and add sinks.
+    
+    Args:
+        *sinks: Objects with an ``emit(record)`` method, or plain functions
+            (wrapped in a CallbackSink). With no sinks, spans are only
+            logged if a LoggingSink was added before.
+    """
+    global _enabled, _enabled_globally, _sinks
+    added = tuple(sink if hasattr(sink, 'emit') else CallbackSink(sink) for sink in sinks)
+    with _sinks_lock:
+        _sinks = _sinks + tuple(sink for sink in added if sink not in _sinks)
+        _enabled_globally = True
+        _enabled = True
+
+
+def disable() -> None:
+    """Turn instrumentation off and remove every sink; running captures keep recording."""
+    global _enabled, _enabled_globally, _sinks
+    with _sinks_lock:
+        _enabled_globally = False
+        _enabled = _active_captures > 0
+        _sinks = ()
+
+
+@contextmanager
+def capture(sink: Union[Any, Callable[[SpanRecord], Any]]) -> Iterator[Any]:
+    """
+    Send the spans finished on the current thread to a sink while a block runs.
+    
+    Instrumentation is on while any capture is running, so spans on other
+    threads are timed too, but only reach the sinks added with ``enable``.
+    
+    Args:
+        sink: Object with an ``emit(record)`` method, or a plain function
+        
+    Yields:
+        The sink (wrapped in a CallbackSink if a function was given)
+    """
+    global _enabled, _active_captures
+    sink = sink if hasattr(sink, 'emit') else CallbackSink(sink)
+    outer = getattr(_local, 'sinks', ())
+    _local.sinks = outer + (sink,)
+    with _sinks_lock:
+        _active_captures += 1
+        _enabled = True
+    try:
+        yield sink
+    finally:
+        _local.sinks = outer
+        with _sinks_lock:
+            _active_captures -= 1
+            _enabled = _enabled_globally or _active_captures > 0
+
+
+def is_enabled() -> bool:
+    """Whether spans are being recorded."""
+    return _enabled
+
+
+def ring_buffer() -> RingBufferSink:
+    """
+    Get the active in-memory sink, enabling instrumentation with a new
+    RingBufferSink if there is none.
+    """
+    for sink in _sinks:
+        if isinstance(sink, RingBufferSink):
+            return sink
+    sink = RingBufferSink()
+    enable(sink)
+    return sink
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """
+    Time a block of code::
+    
+        with perf.span('filters.apply', rows=len(df)):
+            ...
+            
+    Args:
+        name: Stage name
+        **attributes: Details recorded with the span
+        
+    Returns:
+        A context manager; a shared no-op one while instrumentation is off
+    """
+    if not _enabled:
+        return _DISABLED_SPAN
+    return _timed_span(name, attributes)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """
+    Decorate a function so every call is recorded as a span.
+    
+    Args:
+        name: Stage name
+    """
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _timed_span(name, {}):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+@contextmanager
+def _timed_span(name: str, attributes: Dict[str, Any]) -> Iterator[None]:
+    """Measure a span and send it to the sinks."""
+    depth = getattr(_local, 'depth', 0)
+    _local.depth = depth + 1
+    started = time.time()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        _local.depth = depth
+        record = SpanRecord(name, duration, depth, started, attributes)
+        for sink in _sinks + getattr(_local, 'sinks', ()):
+            try:
+                sink.emit(record)
+            except Exception:
+                # A broken sink must not break the instrumented code
+                logger.exception("luxin.perf sink %r failed", sink)
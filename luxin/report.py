@@ -0,0 +1,189 @@
+"""
+Export drill-down tables as standalone HTML reports.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from luxin import perf
+from luxin.utils import get_index_resolver
+
+# Default size cap of an exported report (10 MB, small enough to email)
+DEFAULT_REPORT_MAX_BYTES = 10 * 1024 * 1024
+
+# Attempts at shrinking the embedded detail rows when the estimate overshoots
+_MAX_FIT_ATTEMPTS = 4
+
+
+@perf.timed('report.export')
+def export_report(
+    agg: pd.DataFrame,
+    path: Union[str, "os.PathLike[str]"],
+    max_bytes: int = DEFAULT_REPORT_MAX_BYTES,
+    detail_df: Optional[pd.DataFrame] = None,
+    groupby_cols: Optional[List[str]] = None,
+    top_n: Optional[int] = None,
+    sort_by: Optional[str] = None,
+    ascending: bool = False,
+    compression: Optional[str] = 'deflate'
+) -> int:
+    """
+    Write a drill-down table to a self-contained HTML file of bounded size.
+    
+    The report embeds the CSS/JS runtime and the data, so it opens in a
+    browser without a server or kernel. At most ``top_n`` detail rows are
+    embedded per group (the first rows, or the top rows by ``sort_by``),
+    fewer if they would not fit ``max_bytes``; the panel shows each
+    group's total row count. Trailing aggregated rows are left out only if
+    the aggregate table alone does not fit.
+    
+    Args:
+        agg: Aggregated TrackedDataFrame (from ``groupby().agg()``), or a
+            plain aggregated DataFrame together with ``detail_df`` and
+            ``groupby_cols``
+        path: File to write
+        max_bytes: Maximum size of the written file in bytes
+        detail_df: The detail DataFrame, if ``agg`` is not tracked
+        groupby_cols: Columns ``agg`` was grouped by, if it is not tracked
+        top_n: Optional cap on detail rows embedded per group
+        sort_by: Detail column ranking the rows of each group; the first
+            rows of the group are kept if None
+        ascending: Keep the smallest ``sort_by`` values instead of the largest
+        compression: None, or ``'deflate'`` (default) to compress the
+            embedded columns
+            
+    Returns:
+        Size of the written file in bytes
+        
+    Raises:
+        ValueError: If the detail data cannot be determined, ``sort_by`` is
+            not a detail column, or ``max_bytes`` is too small for the report
+    """
+    from luxin.display import render_html
+    
+    detail_df, source_mapping, groupby_cols = _report_source(agg, detail_df, groupby_cols)
+    if sort_by is not None:
+        if sort_by not in detail_df.columns:
+            raise ValueError(f"sort_by column '{sort_by}' not found in detail DataFrame")
+        source_mapping = _rank_source_mapping(detail_df, source_mapping, sort_by, ascending)
+    
+    def _render(agg_rows: int, max_rows_per_group: Optional[int], max_payload_bytes: Optional[int]) -> str:
+        agg_df, mapping = _report_rows(agg, source_mapping, agg_rows)
+        return render_html(
+            agg_df,
+            detail_df,
+            mapping,
+            groupby_cols,
+            max_rows_per_group=max_rows_per_group,
+            max_payload_bytes=max_payload_bytes,
+            compression=compression
+        )
+    
+    # Size of the report without detail rows; drop aggregated rows if needed
+    agg_rows = len(agg)
+    html = _render(agg_rows, 0, None)
+    if _html_bytes(html) > max_bytes:
+        agg_rows = _fit_agg_rows(lambda n: _html_bytes(_render(n, 0, None)), len(agg), max_bytes)
+        if agg_rows is None:
+            raise ValueError(f"max_bytes ({max_bytes}) is too small for a report; the page alone needs more.")
+        html = _render(agg_rows, 0, None)
+    
+    # Spend the rest of the budget on detail rows
+    detail_budget = max_bytes - _html_bytes(html)
+    for _ in range(_MAX_FIT_ATTEMPTS):
+        if detail_budget <= 0 or top_n == 0:
+            break
+        candidate = _render(agg_rows, top_n, detail_budget)
+        overshoot = _html_bytes(candidate) - max_bytes
+        if overshoot <= 0:
+            html = candidate
+            break
+        detail_budget -= overshoot + detail_budget // 10
+    
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    return _html_bytes(html)
+
+
+def _report_source(
+    agg: pd.DataFrame,
+    detail_df: Optional[pd.DataFrame],
+    groupby_cols: Optional[List[str]]
+) -> Tuple[pd.DataFrame, Dict[Any, List[Any]], List[str]]:
+    """
+    Get the detail DataFrame, source mapping and groupby columns of a report.
+    
+    Returns:
+        Tuple of (detail DataFrame, source mapping, groupby columns)
+    """
+    if detail_df is None and getattr(agg, '_is_aggregated', False):
+        return agg._source_df, agg._source_mapping, list(agg._groupby_cols)
+    if detail_df is None or groupby_cols is None:
+        raise ValueError(
+            "export_report() needs an aggregated TrackedDataFrame, "
+            "or detail_df and groupby_cols for a plain DataFrame."
+        )
+    from luxin.drill_table import _build_source_mapping
+    
+    return detail_df, _build_source_mapping(agg, detail_df, groupby_cols), list(groupby_cols)
+
+
+def _rank_source_mapping(
+    detail_df: pd.DataFrame,
+    source_mapping: Dict[Any, List[Any]],
+    sort_by: str,
+    ascending: bool
+) -> Dict[Any, List[Any]]:
+    """Order each group's detail rows by ``sort_by``, missing values last."""
+    ranks = detail_df[sort_by].rank(method='first', ascending=ascending, na_option='bottom').to_numpy()
+    positions = get_index_resolver(detail_df.index).group_positions(list(source_mapping.values()))
+    return {
+        key: detail_df.index[group_positions[ranks[group_positions].argsort(kind='stable')]].tolist()
+        for key, group_positions in zip(source_mapping, positions)
+    }
+
+
+def _report_rows(
+    agg: pd.DataFrame,
+    source_mapping: Dict[Any, List[Any]],
+    agg_rows: int
+) -> Tuple[pd.DataFrame, Dict[Any, List[Any]]]:
+    """Keep the first ``agg_rows`` aggregated rows and only their groups."""
+    agg_df = agg.iloc[:agg_rows]
+    keys = set()
+    for value in agg_df.index:
+        keys.add(value)
+        if not isinstance(value, tuple):
+            keys.add((value,))
+    return agg_df, {key: labels for key, labels in source_mapping.items() if key in keys}
+
+
+def _fit_agg_rows(size_of: Any, total_rows: int, max_bytes: int) -> Optional[int]:
+    """
+    Find the most leading aggregated rows whose report fits ``max_bytes``.
+    
+    Args:
+        size_of: Function giving the report size for a number of rows
+        total_rows: Number of aggregated rows
+        max_bytes: Maximum report size in bytes
+        
+    Returns:
+        Number of rows, or None if not even an empty table fits
+    """
+    if size_of(0) > max_bytes:
+        return None
+    low, high = 0, total_rows
+    while low < high:
+        candidate = (low + high + 1) // 2
+        if size_of(candidate) <= max_bytes:
+            low = candidate
+        else:
+            high = candidate - 1
+    return low
+
+
+def _html_bytes(html: str) -> int:
+    """Size of the HTML once written as UTF-8."""
+    return len(html.encode('utf-8'))
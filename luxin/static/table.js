@@ -1,132 +1,455 @@
 // Luxin Interactive Table JavaScript
+//
+// Shared runtime, loaded once per page or notebook session. Each rendered
+// table embeds its data in a <script type="application/json"> element and
+// calls window.luxin.mount(uniqueId), or queues its id in window.luxinPending
+// when displayed before the runtime.
 
 (function() {
-    // Store the source mapping and detail data
-    const sourceMapping = {source_mapping};
-    const detailData = {detail_data};
-    const groupbyCols = {groupby_cols};
+    const luxin = window.luxin = window.luxin || {};
     
-    // Use unique ID to target this specific instance
-    const uniqueId = '{unique_id}';
-    
-    // Get DOM elements
-    const detailPanel = document.getElementById('detail-panel-' + uniqueId);
-    const detailContent = document.getElementById('detail-content-' + uniqueId);
-    const closeButton = document.getElementById('close-panel-' + uniqueId);
-    const mainTable = document.getElementById('main-table-' + uniqueId);
-    
-    if (!detailPanel || !detailContent || !closeButton || !mainTable) {
-        console.error('Luxin: Could not find required DOM elements for instance', uniqueId);
-        return;
-    }
-    
-    // Get all data rows (skip header)
-    const dataRows = mainTable.querySelectorAll('tbody tr');
-    
-    // Add click handlers to rows
-    dataRows.forEach((row, index) => {
-        row.addEventListener('click', function() {
-            // Remove selected class from all rows
-            dataRows.forEach(r => r.classList.remove('selected'));
-            
-            // Add selected class to clicked row
-            this.classList.add('selected');
-            
-            // Get the row key based on index values
-            const rowKey = getRowKey(index);
+    luxin.mount = function(uniqueId) {
+        const payloadElement = document.getElementById('luxin-payload-' + uniqueId);
+        if (!payloadElement) {
+            console.error('Luxin: Could not find the data for instance', uniqueId);
+            return;
+        }
+        const payload = JSON.parse(payloadElement.textContent);
+        
+        // Integer buffers indexed by aggregate row or group id, decoded on mount:
+        // rowGroups[row] is the row's group id (-1 for none), groupSizes[group]
+        // its total rows (groups may embed fewer), and the embedded rows of a
+        // group are groupRows[groupStarts[group] .. groupStarts[group + 1]]
+        let rowGroups = null;
+        let groupSizes = null;
+        let groupStarts = null;
+        let groupRows = null;
+        // Embedded detail rows, column by column (see luxin/payload.py)
+        const detailData = payload.detailData;
+        // One reader per detail column; decompressing buffers is asynchronous
+        const detailReaders = Promise.all(detailData.data.map(decodeColumn));
+        const groupbyCols = payload.groupbyCols;
+        // Aggregate rows, column by column; the first aggIndexColumns are the index
+        const aggData = payload.aggData;
+        const aggIndexColumns = payload.aggIndexColumns;
+        // Rows drawn above and below the visible window of the aggregate table
+        const overscanRows = 10;
+        // Browsers cap element heights (about 33.5M px in Chrome, less in
+        // Firefox); taller tables map the scroll position onto rows instead
+        const maxScrollHeight = 10000000;
+        let rowHeight = 41;
+        let renderedWindow = null;
+        let selectedRow = -1;
+        // Fetch detail pages from the Jupyter kernel when connected
+        const kernelFetch = payload.kernelFetch;
+        const pageSize = payload.pageSize;
+        const kernelTimeoutMs = 10000;
+        let detailComm = null;
+        let nextRequest = 0;
+        const pendingRequests = {};
+        // Group currently shown, so late replies for other groups are dropped
+        let activeGroup = -1;
+        
+        // Get DOM elements
+        const detailPanel = document.getElementById('detail-panel-' + uniqueId);
+        const detailContent = document.getElementById('detail-content-' + uniqueId);
+        const closeButton = document.getElementById('close-panel-' + uniqueId);
+        const mainTable = document.getElementById('main-table-' + uniqueId);
+        const viewport = document.getElementById('agg-viewport-' + uniqueId);
+        
+        if (!detailPanel || !detailContent || !closeButton || !mainTable || !viewport) {
+            console.error('Luxin: Could not find required DOM elements for instance', uniqueId);
+            return;
+        }
+        // Queued tables show a "not loaded" notice until mounted
+        setPlaceholder('Click on a row to see details');
+        
+        // Replace the static preview with a virtualized table once decoded
+        let aggBody = null;
+        let aggReaders = [];
+        Promise.all([
+            Promise.all(aggData.data.map(decodeColumn)),
+            Promise.all([payload.rowGroups, payload.groupSizes, payload.groupStarts, payload.groupRows].map(decodeBuffer))
+        ]).then(([readers, groupBuffers]) => {
+            aggReaders = readers;
+            [rowGroups, groupSizes, groupStarts, groupRows] = groupBuffers;
+            buildAggTable();
+        }).catch(error => {
+            console.error('Luxin: Could not decode aggregate data', error);
+        });
+        
+        // One delegated handler for every aggregate row
+        viewport.addEventListener('click', function(event) {
+            const row = event.target.closest('tr');
+            if (!aggBody || !row || row.dataset.row === undefined) {
+                return;
+            }
+            selectRow(Number(row.dataset.row));
             
-            // Show detail panel with data
-            showDetailPanel(rowKey);
+            // Show detail panel with the row's group
+            showDetailPanel(rowGroups[selectedRow]);
         });
-    });
-    
-    // Close button handler
-    closeButton.addEventListener('click', function() {
-        closeDetailPanel();
-    });
-    
-    // Close panel when clicking outside
-    document.addEventListener('click', function(event) {
-        if (detailPanel.classList.contains('open') && 
-            !detailPanel.contains(event.target) && 
-            !mainTable.contains(event.target)) {
+        
+        let scrollPending = false;
+        viewport.addEventListener('scroll', function() {
+            if (scrollPending) {
+                return;
+            }
+            scrollPending = true;
+            requestAnimationFrame(() => {
+                scrollPending = false;
+                renderAggRows();
+            });
+        }, {passive: true});
+        
+        // Close button handler
+        closeButton.addEventListener('click', function() {
             closeDetailPanel();
+        });
+        
+        // Close panel when clicking outside
+        document.addEventListener('click', function(event) {
+            if (detailPanel.classList.contains('open') && 
+                !detailPanel.contains(event.target) && 
+                !mainTable.contains(event.target)) {
+                closeDetailPanel();
+            }
+        });
+        
+        function buildAggTable() {
+            const table = document.createElement('table');
+            table.className = 'luxin-table';
+            const head = document.createElement('thead');
+            const headRow = document.createElement('tr');
+            aggData.columns.forEach(col => {
+                const th = document.createElement('th');
+                th.textContent = col;
+                headRow.appendChild(th);
+            });
+            head.appendChild(headRow);
+            aggBody = document.createElement('tbody');
+            table.appendChild(head);
+            table.appendChild(aggBody);
+            viewport.replaceChildren(table);
+            viewport.classList.add('luxin-virtual');
+            
+            renderAggRows();
+            // Use the rendered row height for the window arithmetic
+            const firstRow = aggBody.querySelector('tr[data-row]');
+            const measured = firstRow ? firstRow.getBoundingClientRect().height : 0;
+            if (measured > 0 && Math.abs(measured - rowHeight) > 0.5) {
+                rowHeight = measured;
+                renderedWindow = null;
+                renderAggRows();
+            }
         }
-    });
-    
-    function getRowKey(rowIndex) {
-        // Get the row key from the data
-        const keys = Object.keys(sourceMapping);
-        if (rowIndex < keys.length) {
-            return keys[rowIndex];
+        
+        function renderAggRows() {
+            // Draw only the rows in and near the visible window
+            const viewHeight = viewport.clientHeight || 600;
+            const visible = Math.ceil(viewHeight / rowHeight);
+            const contentHeight = Math.min(aggData.length * rowHeight, maxScrollHeight);
+            // Row at the top of the view (fractional); equal to
+            // scrollTop / rowHeight unless the height is capped
+            const scrollRange = Math.max(1, contentHeight - viewHeight);
+            const rowRange = Math.max(0, aggData.length - viewHeight / rowHeight);
+            const topRow = Math.min(1, viewport.scrollTop / scrollRange) * rowRange;
+            const first = Math.max(0, Math.floor(topRow) - overscanRows);
+            const last = Math.min(aggData.length, first + visible + 2 * overscanRows);
+            // Place the drawn rows so that topRow sits at the top of the view
+            const windowHeight = (last - first) * rowHeight;
+            const offset = Math.round(viewport.scrollTop - (topRow - first) * rowHeight);
+            const windowTop = Math.max(0, Math.min(contentHeight - windowHeight, offset));
+            if (renderedWindow && renderedWindow[0] === first && renderedWindow[1] === last &&
+                    renderedWindow[2] === windowTop) {
+                return;
+            }
+            renderedWindow = [first, last, windowTop];
+            
+            const fragment = document.createDocumentFragment();
+            fragment.appendChild(spacerRow(windowTop));
+            for (let row = first; row < last; row++) {
+                fragment.appendChild(aggRow(row));
+            }
+            fragment.appendChild(spacerRow(Math.max(0, contentHeight - windowTop - windowHeight)));
+            aggBody.replaceChildren(fragment);
         }
-        return null;
-    }
-    
-    function showDetailPanel(rowKey) {
-        if (!rowKey || !sourceMapping[rowKey]) {
-            detailContent.innerHTML = '<p class="detail-placeholder">No detail data available for this row</p>';
-            detailPanel.classList.add('open');
-            return;
+        
+        function aggRow(row) {
+            const tr = document.createElement('tr');
+            tr.dataset.row = row;
+            if (row === selectedRow) {
+                tr.classList.add('selected');
+            }
+            aggReaders.forEach((read, col) => {
+                const cell = document.createElement(col < aggIndexColumns ? 'th' : 'td');
+                cell.textContent = read(row);
+                tr.appendChild(cell);
+            });
+            return tr;
         }
         
-        // Get the indices of detail rows
-        const detailIndices = sourceMapping[rowKey];
+        function spacerRow(height) {
+            // Stands in for the rows outside the window so the scrollbar stays right
+            const tr = document.createElement('tr');
+            tr.className = 'luxin-spacer';
+            const td = document.createElement('td');
+            td.colSpan = Math.max(1, aggData.columns.length);
+            td.style.height = height + 'px';
+            tr.appendChild(td);
+            return tr;
+        }
         
-        // Build the detail table
-        const detailHtml = buildDetailTable(detailIndices);
-        detailContent.innerHTML = detailHtml;
+        function selectRow(row) {
+            selectedRow = row;
+            Array.from(aggBody.children).forEach(tr => {
+                tr.classList.toggle('selected', tr.dataset.row !== undefined && Number(tr.dataset.row) === row);
+            });
+        }
         
-        // Open the panel
-        detailPanel.classList.add('open');
-    }
-    
-    function buildDetailTable(indices) {
-        if (!indices || indices.length === 0) {
-            return '<p class="detail-placeholder">No detail rows found</p>';
+        function showDetailPanel(group) {
+            if (group === undefined || group < 0) {
+                setPlaceholder('No detail data available for this row');
+                detailPanel.classList.add('open');
+                return;
+            }
+            
+            activeGroup = group;
+            // Only groups cut short by the payload budget need the kernel
+            const embeddedRows = groupStarts[group + 1] - groupStarts[group];
+            const comm = embeddedRows < groupSizes[group] ? kernelComm() : null;
+            if (comm) {
+                showKernelPage(comm, group, 0);
+            } else {
+                showEmbeddedPage(group, 0);
+            }
+            
+            // Open the panel
+            detailPanel.classList.add('open');
         }
         
-        // Get the detail rows
-        const rows = indices.map(idx => detailData[idx]).filter(row => row !== undefined);
+        function showEmbeddedPage(group, offset) {
+            // Positions of the group's embedded rows in detailData
+            const positions = groupRows.subarray(groupStarts[group], groupStarts[group + 1]);
+            
+            // Build the page once the columns are decoded
+            detailReaders.then(readers => {
+                if (activeGroup !== group) {
+                    return;
+                }
+                renderDetailPage({
+                    columns: detailData.columns,
+                    readers: readers,
+                    rows: positions.subarray(offset, offset + pageSize),
+                    offset: offset,
+                    available: positions.length,
+                    total: groupSizes[group],
+                    goTo: next => showEmbeddedPage(group, next)
+                });
+            }).catch(error => {
+                console.error('Luxin: Could not decode detail data', error);
+                setPlaceholder('Detail data could not be decoded in this browser');
+            });
+        }
         
-        if (rows.length === 0) {
-            return '<p class="detail-placeholder">No detail rows found</p>';
+        function showKernelPage(comm, group, offset) {
+            setPlaceholder('Loading detail rows...');
+            fetchPage(comm, group, offset).then(page => {
+                if (activeGroup !== group) {
+                    return;
+                }
+                renderDetailPage({
+                    columns: page.data.columns,
+                    readers: page.readers,
+                    rows: Array.from({length: page.data.length}, (_, i) => i),
+                    offset: page.offset,
+                    available: page.total,
+                    total: page.total,
+                    goTo: next => showKernelPage(comm, group, next)
+                });
+            }).catch(error => {
+                // Kernel restarted or table no longer registered: use the embedded preview
+                console.warn('Luxin: Falling back to embedded detail rows', error);
+                if (activeGroup === group) {
+                    showEmbeddedPage(group, 0);
+                }
+            });
         }
         
-        // Get column names from first row
-        const columns = Object.keys(rows[0]);
+        function kernelComm() {
+            if (!kernelFetch) {
+                return null;
+            }
+            if (detailComm) {
+                return detailComm;
+            }
+            const kernel = window.Jupyter && window.Jupyter.notebook && window.Jupyter.notebook.kernel;
+            if (!kernel || !kernel.comm_manager) {
+                return null;
+            }
+            detailComm = kernel.comm_manager.new_comm('luxin.detail', {table: uniqueId});
+            detailComm.on_msg(msg => {
+                const reply = msg.content.data;
+                const pending = pendingRequests[reply.request];
+                if (!pending) {
+                    return;
+                }
+                delete pendingRequests[reply.request];
+                if (reply.error) {
+                    pending.reject(new Error(reply.error));
+                } else {
+                    pending.resolve(reply);
+                }
+            });
+            return detailComm;
+        }
         
-        // Build HTML table
-        let html = '<table><thead><tr>';
-        columns.forEach(col => {
-            html += `<th>${escapeHtml(col)}</th>`;
-        });
-        html += '</tr></thead><tbody>';
+        function fetchPage(comm, group, offset) {
+            const request = nextRequest++;
+            return new Promise((resolve, reject) => {
+                pendingRequests[request] = {resolve, reject};
+                setTimeout(() => {
+                    if (pendingRequests[request]) {
+                        delete pendingRequests[request];
+                        reject(new Error('No reply from the kernel'));
+                    }
+                }, kernelTimeoutMs);
+                comm.send({request: request, table: uniqueId, group: group, offset: offset, limit: pageSize});
+            }).then(reply => {
+                const data = JSON.parse(reply.detail_data);
+                return Promise.all(data.data.map(decodeColumn)).then(readers => ({
+                    data: data,
+                    readers: readers,
+                    offset: reply.offset,
+                    total: reply.total
+                }));
+            });
+        }
         
-        rows.forEach(row => {
-            html += '<tr>';
-            columns.forEach(col => {
-                const value = row[col];
-                html += `<td>${escapeHtml(String(value))}</td>`;
+        function renderDetailPage(page) {
+            // page.available rows can be paged through; page.total may be larger
+            // when only part of the group was embedded
+            if (page.available === 0) {
+                setPlaceholder(page.total > 0
+                    ? `${page.total} detail rows were not embedded (payload size limit)`
+                    : 'No detail rows found');
+                return;
+            }
+            
+            const fragment = document.createDocumentFragment();
+            const summary = document.createElement('p');
+            summary.className = 'luxin-detail-summary';
+            summary.textContent = `Total: ${page.total} row${page.total !== 1 ? 's' : ''}`;
+            if (page.available < page.total) {
+                summary.textContent += ` (first ${page.available} embedded)`;
+            }
+            fragment.appendChild(summary);
+            
+            // Build only this page's rows
+            const table = document.createElement('table');
+            const head = document.createElement('thead');
+            const headRow = document.createElement('tr');
+            page.columns.forEach(col => {
+                const th = document.createElement('th');
+                th.textContent = col;
+                headRow.appendChild(th);
             });
-            html += '</tr>';
-        });
+            head.appendChild(headRow);
+            const body = document.createElement('tbody');
+            page.rows.forEach(row => {
+                const tr = document.createElement('tr');
+                page.readers.forEach(read => {
+                    const td = document.createElement('td');
+                    td.textContent = read(row);
+                    tr.appendChild(td);
+                });
+                body.appendChild(tr);
+            });
+            table.appendChild(head);
+            table.appendChild(body);
+            fragment.appendChild(table);
+            
+            if (page.available > pageSize) {
+                fragment.appendChild(pager(page));
+            }
+            detailContent.replaceChildren(fragment);
+            detailPanel.scrollTop = 0;
+        }
         
-        html += '</tbody></table>';
-        html += `<p style="margin-top: 15px; color: #666; font-size: 13px;">Showing ${rows.length} detail row${rows.length !== 1 ? 's' : ''}</p>`;
+        function pager(page) {
+            // Mirrors the Previous / Page x of y / Next controls of the Streamlit panel
+            const totalPages = Math.ceil(page.available / pageSize);
+            const current = Math.floor(page.offset / pageSize) + 1;
+            const nav = document.createElement('div');
+            nav.className = 'luxin-pager';
+            nav.appendChild(pagerButton('\u25C0 Previous', current === 1, () => page.goTo(page.offset - pageSize)));
+            const label = document.createElement('span');
+            label.textContent = `Page ${current} of ${totalPages}`;
+            nav.appendChild(label);
+            nav.appendChild(pagerButton('Next \u25B6', current === totalPages, () => page.goTo(page.offset + pageSize)));
+            return nav;
+        }
         
-        return html;
-    }
+        function pagerButton(text, disabled, onClick) {
+            const button = document.createElement('button');
+            button.textContent = text;
+            button.disabled = disabled;
+            button.addEventListener('click', event => {
+                // The pager is replaced, so keep the outside-click handler from closing the panel
+                event.stopPropagation();
+                onClick();
+            });
+            return button;
+        }
+        
+        function setPlaceholder(text) {
+            const placeholder = document.createElement('p');
+            placeholder.className = 'detail-placeholder';
+            placeholder.textContent = text;
+            detailContent.replaceChildren(placeholder);
+        }
+        
+        function closeDetailPanel() {
+            detailPanel.classList.remove('open');
+            if (aggBody) {
+                selectRow(-1);
+            }
+        }
+    };
     
-    function closeDetailPanel() {
-        detailPanel.classList.remove('open');
-        dataRows.forEach(r => r.classList.remove('selected'));
+    async function decodeBuffer(buffer) {
+        // Base64 little-endian typed array, optionally zlib-compressed
+        const binary = atob(buffer.base64);
+        let bytes = new Uint8Array(binary.length);
+        for (let i = 0; i < binary.length; i++) {
+            bytes[i] = binary.charCodeAt(i);
+        }
+        if (buffer.deflate) {
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+            bytes = new Uint8Array(await new Response(stream).arrayBuffer());
+        }
+        const ArrayType = {
+            float64: Float64Array, int32: Int32Array, int16: Int16Array, int8: Int8Array, uint8: Uint8Array
+        }[buffer.dtype];
+        return new ArrayType(bytes.buffer, 0, bytes.byteLength / ArrayType.BYTES_PER_ELEMENT);
     }
     
-    function escapeHtml(text) {
-        const div = document.createElement('div');
-        div.textContent = text;
-        return div.innerHTML;
+    async function decodeColumn(column) {
+        // Dictionary-encoded column: code -1 marks a missing value
+        if (column.dict) {
+            const codes = await decodeBuffer(column.codes);
+            return row => codes[row] < 0 ? '' : column.dict[codes[row]];
+        }
+        const values = await decodeBuffer(column.values);
+        if (column.values.dtype === 'uint8') {
+            // Booleans: 0 = false, 1 = true, 2 = missing
+            return row => ['false', 'true', ''][values[row]];
+        }
+        return row => Number.isNaN(values[row]) ? '' : String(values[row]);
     }
+    
+    // Mount the tables displayed before the runtime was loaded
+    const pending = window.luxinPending || [];
+    window.luxinPending = [];
+    pending.forEach(uniqueId => luxin.mount(uniqueId));
 })();
-
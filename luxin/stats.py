@@ -0,0 +1,248 @@
+"""
+Summary statistics for aggregated tables, computed once and updated incrementally.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from luxin import perf
+from luxin.utils import frame_fingerprint
+
+# Values kept per column for approximate quantiles. Columns with at most
+# this many values get exact quantiles anyway.
+DEFAULT_SAMPLE_SIZE = 10_000
+
+_STATS_CACHE_SIZE = 16
+_stats_cache: "OrderedDict[Tuple[str, bool], pd.DataFrame]" = OrderedDict()
+_stats_cache_lock = threading.Lock()
+
+_QUANTILES = (0.25, 0.5, 0.75)
+_ROW_LABELS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+
+class SummaryStats:
+    """
+    Running summary statistics for the numeric columns of a DataFrame.
+    
+    Count, mean, standard deviation, min and max are kept as running moments,
+    so appending rows with ``update`` never revisits earlier data. Quantiles
+    are exact when ``exact_quantiles`` is True (all values are retained);
+    otherwise they come from a uniform sample of at most ``sample_size``
+    values per column, which is exact for columns that fit in the sample.
+    
+    Example:
+        >>> stats = SummaryStats.from_frame(first_batch)
+        >>> stats.update(second_batch)
+        >>> stats.to_frame()  # same layout as DataFrame.describe()
+    """
+    
+    def __init__(
+        self,
+        exact_quantiles: bool = False,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        seed: int = 0
+    ) -> None:
+        self.exact_quantiles = exact_quantiles
+        self.sample_size = sample_size
+        self.columns: List[Any] = []
+        self._count: Dict[Any, int] = {}
+        self._mean: Dict[Any, float] = {}
+        self._m2: Dict[Any, float] = {}
+        self._min: Dict[Any, float] = {}
+        self._max: Dict[Any, float] = {}
+        self._values: Dict[Any, np.ndarray] = {}
+        self._rng = np.random.default_rng(seed)
+    
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        exact_quantiles: bool = False,
+        sample_size: int = DEFAULT_SAMPLE_SIZE
+    ) -> 'SummaryStats':
+        """Compute statistics for the numeric columns of ``df``."""
+        stats = cls(exact_quantiles=exact_quantiles, sample_size=sample_size)
+        stats.update(df)
+        return stats
+    
+    def update(self, df: pd.DataFrame) -> 'SummaryStats':
+        """
+        Fold new rows into the statistics.
+        
+        Args:
+            df: Rows to add; only numeric columns are used
+            
+        Returns:
+            self, for chaining
+        """
+        numeric = df.select_dtypes(include=[np.number])
+        for position, col in enumerate(numeric.columns):
+            values = numeric.iloc[:, position].to_numpy(dtype='float64', na_value=np.nan)
+            values = values[~np.isnan(values)]
+            self._merge(col, values)
+        return self
+    
+    def _merge(self, col: Any, values: np.ndarray) -> None:
+        """Merge one column's new values (parallel moments update)."""
+        if col not in self._count:
+            self.columns.append(col)
+            self._count[col] = 0
+            self._mean[col] = 0.0
+            self._m2[col] = 0.0
+            self._min[col] = np.nan
+            self._max[col] = np.nan
+            self._values[col] = np.empty(0)
+        
+        n_new = len(values)
+        if n_new == 0:
+            return
+        
+        n_old = self._count[col]
+        mean_new = float(values.mean())
+        m2_new = float(((values - mean_new) ** 2).sum())
+        total = n_old + n_new
+        delta = mean_new - self._mean[col]
+        
+        self._mean[col] += delta * n_new / total
+        self._m2[col] += m2_new + delta * delta * n_old * n_new / total
+        self._count[col] = total
+        self._min[col] = float(np.fmin(self._min[col], values.min()))
+        self._max[col] = float(np.fmax(self._max[col], values.max()))
+        
+        if self.exact_quantiles:
+            self._values[col] = np.concatenate([self._values[col], values])
+        else:
+            self._values[col] = self._merge_samples(self._values[col], n_old, values)
+    
+    def _merge_samples(self, sample: np.ndarray, n_old: int, values: np.ndarray) -> np.ndarray:
+        """
+        Combine a uniform sample of ``n_old`` values with new values.
+        
+        The result is a uniform sample of at most ``sample_size`` values from
+        all ``n_old + len(values)`` values seen so far.
+        """
+        k = self.sample_size
+        if n_old + len(values) <= k:
+            return np.concatenate([sample, values])
+        
+        new_sample = values
+        if len(values) > k:
+            new_sample = self._rng.choice(values, size=k, replace=False)
+        # Number of sample slots owed to the old values
+        from_old = int(self._rng.hypergeometric(n_old, len(values), k)) if n_old else 0
+        kept_old = self._rng.choice(sample, size=from_old, replace=False) if from_old else sample[:0]
+        kept_new = self._rng.choice(new_sample, size=k - from_old, replace=False)
+        return np.concatenate([kept_old, kept_new])
+    
+    def is_exact(self, col: Any) -> bool:
+        """Whether the quantiles reported for ``col`` are exact."""
+        return self.exact_quantiles or self._count.get(col, 0) <= self.sample_size
+    
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Get the statistics in the layout of ``DataFrame.describe()``.
+        
+        Returns:
+            DataFrame indexed by count/mean/std/min/25%/50%/75%/max with
+            one column per numeric column
+        """
+        data = {}
+        for col in self.columns:
+            count = self._count[col]
+            std = np.sqrt(self._m2[col] / (count - 1)) if count > 1 else np.nan
+            if count:
+                quantiles = np.quantile(self._values[col], _QUANTILES).tolist()
+                mean = self._mean[col]
+            else:
+                quantiles = [np.nan] * len(_QUANTILES)
+                mean = np.nan
+            data[col] = [float(count), mean, std, self._min[col], *quantiles, self._max[col]]
+        return pd.DataFrame(data, index=_ROW_LABELS, columns=pd.Index(self.columns), dtype='float64')
+
+
+@perf.timed('stats.summary')
+def get_summary_stats(
+    df: pd.DataFrame,
+    fingerprint: Optional[str] = None,
+    exact_quantiles: bool = False
+) -> pd.DataFrame:
+    """
+    Get ``describe()``-style statistics for a DataFrame, cached by fingerprint.
+    
+    Args:
+        df: DataFrame to summarize
+        fingerprint: Optional precomputed fingerprint of ``df``
+        exact_quantiles: Compute exact quantiles instead of sampling large columns
+        
+    Returns:
+        Summary statistics DataFrame
+        
+    Raises:
+        ValueError: If ``df`` has no columns to describe
+    """
+    if fingerprint is None:
+        fingerprint = frame_fingerprint(df)
+    key = (fingerprint, exact_quantiles)
+    
+    with _stats_cache_lock:
+        cached = _stats_cache.get(key)
+        if cached is not None:
+            _stats_cache.move_to_end(key)
+            return cached
+    
+    if len(df.select_dtypes(include=[np.number]).columns) > 0:
+        summary = SummaryStats.from_frame(df, exact_quantiles=exact_quantiles).to_frame()
+    else:
+        summary = df.describe()
+    
+    with _stats_cache_lock:
+        _stats_cache[key] = summary
+        while len(_stats_cache) > _STATS_CACHE_SIZE:
+            _stats_cache.popitem(last=False)
+    return summary
+
+
+def stats_cache_nbytes(fingerprint: Optional[str] = None) -> int:
+    """
+    Get the memory held by cached summary statistics.
+    
+    Args:
+        fingerprint: Only count statistics of the DataFrame with this
+            fingerprint (every cached entry if None)
+            
+    Returns:
+        Size in bytes
+    """
+    with _stats_cache_lock:
+        summaries = [summary for key, summary in _stats_cache.items()
+                     if fingerprint is None or key[0] == fingerprint]
+    return int(sum(summary.memory_usage(deep=True).sum() for summary in summaries))
+
+
+def trim_stats_cache(max_bytes: int) -> None:
+    """
+    Drop least recently used summary statistics until the cache fits a budget.
+    
+    The most recently used entry is always kept.
+    
+    Args:
+        max_bytes: Memory budget of the cached statistics in bytes
+    """
+    with _stats_cache_lock:
+        sizes = [int(summary.memory_usage(deep=True).sum()) for summary in _stats_cache.values()]
+        total = sum(sizes)
+        for size in sizes[:-1]:
+            if total <= max_bytes:
+                break
+            _stats_cache.popitem(last=False)
+            total -= size
+
+
+def clear_stats_cache() -> None:
+    """Drop all cached summary statistics."""
+    with _stats_cache_lock:
+        _stats_cache.clear()
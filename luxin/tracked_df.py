@@ -2,9 +2,11 @@
 TrackedDataFrame - A pandas DataFrame subclass that tracks source rows during aggregations.
 """
 
+import numpy as np
 import pandas as pd
 from typing import Any, Dict, List, Optional
 import uuid
+from luxin import perf
 
 
 class TrackedDataFrame(pd.DataFrame):
@@ -35,6 +37,28 @@ class TrackedDataFrame(pd.DataFrame):
         """Override groupby to return a TrackedGroupBy object."""
         return TrackedGroupBy(self, by, **kwargs)
     
+    def memory_usage_report(self) -> pd.Series:
+        """
+        Break down the memory held by this aggregation and its tracking data.
+        
+        Returns:
+            Bytes held by the aggregate, ``_source_df`` (deep),
+            ``_source_mapping`` (with Python object overhead), cached filter
+            indexes and summary statistics, detail frames kept by a Jupyter
+            kernel, and their total
+            (see ``luxin.memory.memory_usage_report``)
+            
+        Raises:
+            ValueError: If this DataFrame is not an aggregation result
+        """
+        if not self._is_aggregated:
+            raise ValueError(
+                "memory_usage_report() can only be called on aggregated DataFrames. "
+                "Use groupby().agg() first, or DataFrame.memory_usage(deep=True)."
+            )
+        from luxin.memory import memory_usage_report
+        return memory_usage_report(self, self._source_df, self._source_mapping)
+    
     def show_drill_table(self):
         """
         Display the interactive drill-down table.
@@ -74,7 +98,8 @@ class TrackedGroupBy:
         Perform aggregation while tracking source row indices.
         """
         # Perform the actual aggregation on the underlying DataFrame
-        result = self.groupby_obj.agg(func, *args, **kwargs)
+        with perf.span('groupby.agg', rows=len(self.tracked_df)):
+            result = self.groupby_obj.agg(func, *args, **kwargs)
         
         # Create a TrackedDataFrame from the result
         tracked_result = TrackedDataFrame(result)
@@ -82,26 +107,49 @@ class TrackedGroupBy:
         tracked_result._groupby_cols = self.by
         tracked_result._source_df = pd.DataFrame(self.tracked_df)
         
-        # Build the source mapping (optimized for large datasets)
-        source_mapping = {}
+        with perf.span('groupby.source_mapping', groups=len(result)):
+            tracked_result._source_mapping = self._build_source_mapping()
         
-        # Get the groups and their indices
-        # Use groups.items() which is more efficient than iterating separately
-        groups = self.groupby_obj.groups
-        for group_key, group_indices in groups.items():
-            # Convert group_key to a tuple if it's not already
-            if not isinstance(group_key, tuple):
-                group_key = (group_key,)
-            
-            # Store the mapping using the group key
-            # Convert to list only once for efficiency
-            source_mapping[group_key] = list(group_indices) if isinstance(group_indices, (list, tuple)) else list(group_indices)
+        return tracked_result
+    
+    def _build_source_mapping(self) -> Dict[Any, List[Any]]:
+        """
+        Map each group key to the sorted, unique index labels of its rows.
         
-        # Optimize source mapping for performance
-        from luxin.utils import optimize_source_mapping
-        tracked_result._source_mapping = optimize_source_mapping(source_mapping)
+        Rows are numbered by group and ordered with one stable sort, so each
+        group's labels come out in row order without building a pandas
+        object per group. Labels from a unique, increasing index are then
+        already sorted and unique; other indexes go through
+        ``optimize_source_mapping``.
+        """
+        from luxin.utils import _gc_paused, optimize_source_mapping
         
-        return tracked_result
+        sizes = self.groupby_obj.size()
+        # Rows without a group (missing keys) are numbered -1
+        group_ids = self.groupby_obj.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+        counts = np.bincount(group_ids[group_ids >= 0], minlength=len(sizes))
+        if not isinstance(sizes, pd.Series) or not np.array_equal(counts, sizes.to_numpy()):
+            # Group numbers that do not line up with the group keys (e.g.
+            # unobserved categories): fall back to the per-group index
+            return optimize_source_mapping({
+                key if isinstance(key, tuple) else (key,): list(labels)
+                for key, labels in self.groupby_obj.groups.items()
+            })
+        
+        # Rows without a group sort first
+        order = np.argsort(group_ids, kind='stable')[len(group_ids) - int(counts.sum()):]
+        index = self.tracked_df.index
+        labels = index.take(order).tolist()
+        ends = np.cumsum(counts).tolist()
+        starts = [0] + ends[:-1]
+        with _gc_paused():
+            source_mapping = {
+                key if isinstance(key, tuple) else (key,): labels[start:end]
+                for key, start, end in zip(sizes.index, starts, ends)
+            }
+        if index.is_unique and index.is_monotonic_increasing:
+            return source_mapping
+        return optimize_source_mapping(source_mapping)
     
     def sum(self, *args, **kwargs):
         """Sum aggregation with tracking."""
@@ -2,48 +2,441 @@
 Utility functions for performance optimization and common operations.
 """
 
+import gc
+import hashlib
+import itertools
+import operator
+import queue
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Optional
-from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
+# Rows per chunk when iterating over large DataFrames
+DEFAULT_CHUNK_SIZE = 100_000
 
-@lru_cache(maxsize=128)
-def get_cached_index_mapping(df_index: tuple) -> Dict[Any, int]:
+# Number of distinct indexes whose resolvers are kept
+_RESOLVER_CACHE_SIZE = 16
+
+# Index fingerprint -> IndexResolver
+_resolver_cache: "OrderedDict[str, IndexResolver]" = OrderedDict()
+_resolver_cache_lock = threading.Lock()
+
+# id(object) -> (weak reference to the DataFrame or Index, header, fingerprint)
+_fingerprint_cache: Dict[int, Tuple[weakref.ref, str, str]] = {}
+_fingerprint_cache_lock = threading.Lock()
+
+
+class IndexResolver:
+    """
+    Bulk label -> position lookups against one DataFrame index.
+    
+    Lookups use the cheapest structure the index allows: arithmetic for a
+    RangeIndex, a binary search over the values of a sorted unique numeric
+    index, and the pandas Index engine (a hash table built once per index)
+    otherwise.
+    
+    Attributes:
+        index: The resolved index
+    """
+    
+    def __init__(self, index: pd.Index) -> None:
+        self.index = index
+        self.is_unique = bool(index.is_unique)
+        self._sorted: Optional[np.ndarray] = None
+        if (
+            self.is_unique
+            and not isinstance(index, (pd.RangeIndex, pd.MultiIndex))
+            and index.dtype.kind in 'iu'
+            and index.is_monotonic_increasing
+        ):
+            self._sorted = index.to_numpy()
+    
+    def positions(self, labels: Sequence[Any]) -> np.ndarray:
+        """
+        Get the position of every label.
+        
+        For a non-unique index every position of each label is returned
+        instead (``Index.get_indexer_for`` order) and missing labels are
+        left out.
+        
+        Args:
+            labels: Index labels to look up
+            
+        Returns:
+            Integer positions, -1 for labels not in a unique index
+        """
+        if len(labels) == 0:
+            return np.empty(0, dtype=np.intp)
+        if not self.is_unique:
+            positions = self.index.get_indexer_for(labels)
+            return positions[positions >= 0]
+        
+        index = self.index
+        values = np.asarray(labels) if isinstance(index, pd.RangeIndex) or self._sorted is not None else None
+        if values is not None and values.ndim == 1 and values.dtype.kind in 'iu':
+            if isinstance(index, pd.RangeIndex):
+                offsets = values.astype(np.int64) - index.start
+                positions = offsets // index.step
+                valid = (offsets % index.step == 0) & (positions >= 0) & (positions < len(index))
+                return np.where(valid, positions, -1).astype(np.intp)
+            if self._sorted is not None:
+                positions = np.searchsorted(self._sorted, values)
+                found = positions < len(self._sorted)
+                found[found] = self._sorted[positions[found]] == values[found]
+                return np.where(found, positions, -1).astype(np.intp)
+        return index.get_indexer(pd.Index(list(labels), tupleize_cols=isinstance(index, pd.MultiIndex)))
+    
+    def contains(self, labels: Sequence[Any]) -> np.ndarray:
+        """
+        Check which labels are in the index.
+        
+        Args:
+            labels: Index labels to look up
+            
+        Returns:
+            Boolean array, one entry per label
+        """
+        if self.is_unique:
+            return self.positions(labels) >= 0
+        return pd.Index(list(labels), tupleize_cols=isinstance(self.index, pd.MultiIndex)).isin(self.index)
+    
+    def group_positions(self, groups: Sequence[Sequence[Any]]) -> List[np.ndarray]:
+        """
+        Translate several label lists with one bulk lookup.
+        
+        Args:
+            groups: Label lists, such as the values of a source mapping
+            
+        Returns:
+            Positions of each group's labels (see ``positions``), with
+            labels missing from the index left out
+        """
+        if not groups:
+            return []
+        if not self.is_unique:
+            return [self.positions(labels) for labels in groups]
+        sizes = [len(labels) for labels in groups]
+        flat = self.positions(list(itertools.chain.from_iterable(groups)))
+        return [positions[positions >= 0] for positions in np.split(flat, np.cumsum(sizes)[:-1])]
+
+
+def get_index_resolver(index: pd.Index, fingerprint: Optional[str] = None) -> IndexResolver:
+    """
+    Get the cached IndexResolver for an index.
+    
+    Resolvers are cached by content (``index_fingerprint``, remembered per
+    index object), so an equal index arriving as a new object (e.g. on a
+    Streamlit rerun) reuses the resolver instead of building a new hash
+    table. Only the most recent distinct indexes are kept.
+    
+    Args:
+        index: Index of the detail DataFrame
+        fingerprint: Optional content fingerprint identifying the index,
+            such as that of the frame owning it (see ``frame_fingerprint``)
+            
+    Returns:
+        IndexResolver for ``index``
+    """
+    key = fingerprint if fingerprint is not None else index_fingerprint(index)
+    with _resolver_cache_lock:
+        resolver = _resolver_cache.get(key)
+        if resolver is not None and len(resolver.index) == len(index):
+            _resolver_cache.move_to_end(key)
+            return resolver
+        
+        resolver = IndexResolver(index)
+        _resolver_cache[key] = resolver
+        while len(_resolver_cache) > _RESOLVER_CACHE_SIZE:
+            _resolver_cache.popitem(last=False)
+        return resolver
+
+
+def clear_resolver_cache() -> None:
+    """Drop all cached index resolvers."""
+    with _resolver_cache_lock:
+        _resolver_cache.clear()
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Compute a content fingerprint for a DataFrame.
+    
+    Two DataFrames with the same shape, column labels, dtypes, index and
+    values produce the same fingerprint, so it can key caches that must
+    survive Streamlit reruns (where the same data arrives as a new object).
+    
+    The fingerprint is remembered for as long as the DataFrame object lives,
+    so a frame passed again on the next rerun (e.g. from
+    ``st.cache_resource``) is not hashed again. Changes to its shape, labels
+    or dtypes are noticed; in-place edits of values are not, so copy a
+    frame before editing it.
+    
+    Args:
+        df: DataFrame to fingerprint
+        
+    Returns:
+        Hex digest identifying the DataFrame contents
+    """
+    header = repr((df.shape, list(df.columns), [str(dtype) for dtype in df.dtypes]))
+    return _remembered_fingerprint(df, header, lambda: _hash_frame(df, header))
+
+
+def index_fingerprint(index: pd.Index) -> str:
+    """
+    Compute a content fingerprint for an index.
+    
+    Like ``frame_fingerprint``, it is remembered for as long as the index
+    object lives. A RangeIndex is identified by its bounds without hashing.
+    
+    Args:
+        index: Index to fingerprint
+        
+    Returns:
+        Hex digest identifying the index type, dtype, names and labels
+    """
+    header = repr((type(index).__name__, len(index), str(index.dtype), list(index.names)))
+    if isinstance(index, pd.RangeIndex):
+        return _digest(repr((header, index.start, index.stop, index.step)).encode())
+    return _remembered_fingerprint(index, header, lambda: _hash_index(index, header))
+
+
+def _remembered_fingerprint(obj: Any, header: str, compute: Callable[[], str]) -> str:
     """
-    Cache index to position mapping for faster lookups.
+    Get an object's fingerprint, computing it only once while the object lives.
     
     Args:
-        df_index: Tuple representation of DataFrame index
+        obj: Weakly referenceable pandas object
+        header: Cheap description of its shape; a change recomputes it
+        compute: Function computing the fingerprint
         
     Returns:
-        Dictionary mapping index values to positions
+        The fingerprint
     """
-    # This is a placeholder for caching index lookups
-    # In practice, we'd convert the index to a hashable format
-    return {}
+    with _fingerprint_cache_lock:
+        cached = _fingerprint_cache.get(id(obj))
+    if cached is not None and cached[0]() is obj and cached[1] == header:
+        return cached[2]
+    
+    fingerprint = compute()
+    key = id(obj)
+    
+    def _forget(_: Any) -> None:
+        with _fingerprint_cache_lock:
+            entry = _fingerprint_cache.get(key)
+            if entry is not None and entry[0]() is None:
+                del _fingerprint_cache[key]
+    
+    with _fingerprint_cache_lock:
+        _fingerprint_cache[key] = (weakref.ref(obj, _forget), header, fingerprint)
+    return fingerprint
+
+
+def _digest(data: bytes) -> str:
+    """Hex digest used for fingerprints."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _hash_index(index: pd.Index, header: str) -> str:
+    """Hash an index's header text and labels."""
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(header.encode())
+    try:
+        hasher.update(pd.util.hash_pandas_object(index).to_numpy().tobytes())
+    except (TypeError, ValueError):
+        # Mixed object labels pandas cannot hash (e.g. tuples among ints)
+        hasher.update(repr(index.tolist()).encode())
+    return hasher.hexdigest()
+
+
+def _hash_frame(df: pd.DataFrame, header: str) -> str:
+    """Hash a DataFrame's header text, index and values."""
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(header.encode())
+    
+    if len(df) > 0:
+        try:
+            if len(df.columns) > 0:
+                hashed = pd.util.hash_pandas_object(df, index=True)
+            else:
+                hashed = pd.util.hash_pandas_object(df.index)
+            hasher.update(hashed.to_numpy().tobytes())
+        except TypeError:
+            # Unhashable cell values (lists, dicts): fall back to their text form
+            hasher.update(df.to_csv().encode())
+    
+    return hasher.hexdigest()
 
 
 def optimize_source_mapping(source_mapping: Dict[Any, List[int]]) -> Dict[Any, List[int]]:
     """
     Optimize source mapping by ensuring indices are sorted and unique.
     
+    Groups averaging a few labels are sorted one by one, which costs no
+    more than checking them. Larger groups are first checked in a single
+    early-exit pass and copied when already strictly increasing (the usual
+    groupby output); once a group needs sorting, the rest are sorted
+    without checking.
+    
     Args:
         source_mapping: Original source mapping
         
     Returns:
         Optimized source mapping with sorted, unique indices
     """
+    total = sum(map(len, source_mapping.values()))
+    checking = total >= _MIN_CHECKED_GROUP_SIZE * len(source_mapping)
     optimized = {}
-    for key, indices in source_mapping.items():
-        # Remove duplicates and sort for faster lookups
-        optimized[key] = sorted(set(indices))
+    with _gc_paused():
+        for key, indices in source_mapping.items():
+            if checking and _is_strictly_increasing(indices):
+                # Copied, so callers never share lists with the input
+                optimized[key] = list(indices)
+            else:
+                checking = False
+                optimized[key] = sorted(set(indices))
     return optimized
 
 
+# Average labels per group from which groups are checked before sorting
+_MIN_CHECKED_GROUP_SIZE = 16
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Pause the cyclic garbage collector while building many containers.
+    
+    Allocating a million group lists otherwise triggers collections that
+    rescan every list built so far, which costs more than building them.
+    """
+    if not gc.isenabled():
+        yield
+        return
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+def _is_strictly_increasing(labels: Sequence[Any]) -> bool:
+    """Check that every label is greater than the previous one."""
+    return all(map(operator.lt, labels, itertools.islice(labels, 1, None)))
+
+
+def iter_chunks(
+    df: pd.DataFrame,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    columns: Optional[Sequence[Any]] = None,
+    transform: Optional[Callable[[pd.DataFrame], Any]] = None,
+    prefetch: int = 0
+) -> Iterator[Any]:
+    """
+    Lazily iterate over a DataFrame in row chunks.
+    
+    Chunks are positional ``iloc`` slices, so no rows are copied. The
+    column selection is resolved once, up front, and every chunk has the
+    same columns in the same order.
+    
+    Args:
+        df: DataFrame to iterate over
+        chunk_size: Rows per chunk (the last chunk may be shorter)
+        columns: Optional column labels to keep, in order
+        transform: Optional function applied to each chunk (e.g. to
+            serialize it); its results are yielded instead of the chunks
+        prefetch: Number of chunks prepared ahead in a background thread
+            while the caller works on the current one (0 for none)
+            
+    Yields:
+        DataFrame chunks, or ``transform`` results
+        
+    Raises:
+        ValueError: If ``chunk_size`` is not positive
+        KeyError: If a column in ``columns`` is not in ``df``
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    positions = None if columns is None else [_column_position(df, col) for col in columns]
+    
+    def _chunks() -> Iterator[Any]:
+        for start in range(0, len(df), chunk_size):
+            if positions is None:
+                chunk = df.iloc[start:start + chunk_size]
+            else:
+                chunk = df.iloc[start:start + chunk_size, positions]
+            yield chunk if transform is None else transform(chunk)
+    
+    if prefetch <= 0:
+        return _chunks()
+    return _prefetched(_chunks(), prefetch)
+
+
+def _column_position(df: pd.DataFrame, col: Any) -> int:
+    """Get the position of a column label, requiring it to be unique."""
+    try:
+        position = df.columns.get_loc(col)
+    except KeyError:
+        raise KeyError(
+            f"Column {col!r} not found in DataFrame. "
+            f"Available columns: {list(df.columns)}"
+        ) from None
+    if not isinstance(position, (int, np.integer)):
+        raise KeyError(f"Column {col!r} is not unique in the DataFrame")
+    return int(position)
+
+
+def _prefetched(items: Iterator[Any], depth: int) -> Iterator[Any]:
+    """Produce ``items`` in a background thread, up to ``depth`` ahead."""
+    ready: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    
+    def _produce() -> None:
+        try:
+            for item in items:
+                while not stop.is_set():
+                    try:
+                        ready.put(('item', item), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+            message: Tuple[str, Any] = ('done', None)
+        except BaseException as exc:
+            message = ('error', exc)
+        while not stop.is_set():
+            try:
+                ready.put(message, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    worker = threading.Thread(target=_produce, name='luxin-chunk-prefetch', daemon=True)
+    worker.start()
+    try:
+        while True:
+            kind, value = ready.get()
+            if kind == 'done':
+                return
+            if kind == 'error':
+                raise value
+            yield value
+    finally:
+        # Also reached when the caller stops iterating early
+        stop.set()
+        worker.join()
+
+
 def chunk_dataframe(df: pd.DataFrame, chunk_size: int = 1000) -> List[pd.DataFrame]:
     """
     Split DataFrame into chunks for lazy loading.
     
+    Prefer ``iter_chunks``, which produces the same chunks lazily.
+    
     Args:
         df: DataFrame to chunk
         chunk_size: Size of each chunk
@@ -51,8 +444,4 @@ def chunk_dataframe(df: pd.DataFrame, chunk_size: int = 1000) -> List[pd.DataFra
     Returns:
         List of DataFrame chunks
     """
-    chunks = []
-    for i in range(0, len(df), chunk_size):
-        chunks.append(df.iloc[i:i + chunk_size])
-    return chunks
-
+    return list(iter_chunks(df, chunk_size))
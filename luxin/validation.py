@@ -2,8 +2,11 @@
 Input validation for luxin APIs.
 """
 
+import itertools
+import numpy as np
 import pandas as pd
 from typing import List, Dict, Any, Optional
+from luxin.utils import get_index_resolver
 
 
 class ValidationError(Exception):
@@ -98,20 +101,35 @@ def validate_source_mapping(
             "source_mapping is empty. Ensure aggregation tracking is enabled."
         )
     
-    # Check that all indices in mapping are valid
+    # Index lists up to the first value that is not a list
+    groups = []
+    not_a_list = None
     for key, indices in source_mapping.items():
         if not isinstance(indices, list):
-            raise ValidationError(
-                f"source_mapping values must be lists of indices. "
-                f"Got {type(indices).__name__} for key {key}."
-            )
-        
-        invalid_indices = [idx for idx in indices if idx not in detail_df.index]
-        if invalid_indices:
-            raise ValidationError(
-                f"Invalid indices in source_mapping for key {key}: {invalid_indices}. "
-                f"Detail DataFrame has indices: {list(detail_df.index)[:10]}..."
-            )
+            not_a_list = (key, indices)
+            break
+        groups.append((key, indices))
+    
+    # Check that all indices in mapping are valid, with one bulk lookup
+    labels = list(itertools.chain.from_iterable(indices for _, indices in groups))
+    found = get_index_resolver(detail_df.index).contains(labels)
+    if not found.all():
+        ends = np.cumsum([len(indices) for _, indices in groups])
+        group = int(np.searchsorted(ends, int(np.argmin(found)), side='right'))
+        key, indices = groups[group]
+        start = int(ends[group]) - len(indices)
+        invalid_indices = [idx for idx, ok in zip(indices, found[start:start + len(indices)]) if not ok]
+        raise ValidationError(
+            f"Invalid indices in source_mapping for key {key}: {invalid_indices}. "
+            f"Detail DataFrame has indices: {list(detail_df.index[:10])}..."
+        )
+    
+    if not_a_list is not None:
+        key, indices = not_a_list
+        raise ValidationError(
+            f"source_mapping values must be lists of indices. "
+            f"Got {type(indices).__name__} for key {key}."
+        )
 
 
 def validate_aggregated_dataframe(df: pd.DataFrame) -> None:
@@ -129,7 +129,7 @@ def test_show_row_details():
         config = get_default_config()
         
         # Mock render_detail_panel since it's called inside
-        with patch('luxin.components.detail_panel.render_detail_panel') as mock_panel:
+        with patch('luxin.components.table_view.render_detail_panel') as mock_panel:
             _show_row_details(0, agg_df, detail_df, source_mapping, groupby_cols, mock_col, config)
             
             # Should show detail rows via render_detail_panel
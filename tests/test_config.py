@@ -1,7 +1,7 @@
 """Tests for configuration management."""
 
 import pytest
-from luxin.config import InspectorConfig, get_default_config
+from luxin.config import InspectorConfig, get_auto_config, get_default_config
 
 
 def test_inspector_config_defaults():
@@ -90,3 +90,66 @@ def test_inspector_with_config():
     assert inspector.config is config
     assert inspector.config.show_summary_stats is False
 
+
+
+def test_inspector_config_exact_quantiles():
+    """Test that exact quantiles are opt-in."""
+    assert InspectorConfig().exact_quantiles is False
+    assert InspectorConfig(exact_quantiles=True).to_dict()['exact_quantiles'] is True
+
+
+def test_inspector_config_performance_defaults():
+    """Test that performance settings default to the previous behavior."""
+    config = InspectorConfig()
+    
+    assert config.max_frontend_rows is None
+    assert config.max_filter_cardinality == 50
+    assert config.index_cache_max_bytes is None
+    assert config.stats_cache_max_bytes is None
+    assert config.eager_mapping is False
+    assert config.lazy_exports is False
+    assert config.export_formats == ('csv', 'json', 'excel')
+    
+    restored = InspectorConfig.from_dict(InspectorConfig(export_formats=('csv',)).to_dict())
+    assert restored == InspectorConfig(export_formats=('csv',))
+
+
+def test_get_auto_config_by_size():
+    """Test that the auto profile scales its settings with the data."""
+    small = get_auto_config(agg_rows=100, detail_rows=10_000)
+    assert small.exact_quantiles is True
+    assert small.eager_mapping is True
+    assert small.max_frontend_rows is None
+    assert small.lazy_exports is False
+    
+    large = get_auto_config(agg_rows=2_000_000, detail_rows=50_000_000)
+    assert large.exact_quantiles is False
+    assert large.eager_mapping is False
+    assert large.max_frontend_rows is not None
+    assert large.lazy_exports is True
+    assert large.index_cache_max_bytes is not None
+    # Too many rows for an Excel worksheet
+    assert large.export_formats == ('csv', 'json')
+    
+    base = InspectorConfig(table_height=800, export_formats=('json',))
+    assert get_auto_config(10, base=base).table_height == 800
+    assert get_auto_config(10, base=base).export_formats == ('json',)
+
+
+def test_inspector_auto_config():
+    """Test Inspector's auto profile and eager mapping validation."""
+    from luxin import Inspector, TrackedDataFrame
+    
+    df = TrackedDataFrame({'category': ['A', 'A', 'B'], 'value': [10, 20, 30]})
+    agg = df.groupby('category').agg({'value': 'sum'})
+    
+    inspector = Inspector(agg, config='auto')
+    assert inspector.config == get_auto_config(2, 3)
+    
+    with pytest.raises(ValueError, match="Unknown config profile"):
+        Inspector(agg, config='fast')
+    
+    agg._source_mapping = {('A',): [0, 99], ('B',): [2]}
+    Inspector(agg)
+    with pytest.raises(ValueError, match="Invalid indices"):
+        Inspector(agg, config=InspectorConfig(eager_mapping=True))
@@ -5,7 +5,12 @@ Comprehensive tests for detail_panel component, including pagination edge cases.
 import pytest
 import pandas as pd
 from unittest.mock import patch, MagicMock
-from luxin.components.detail_panel import render_detail_panel
+from luxin.components.detail_panel import (
+    render_detail_panel,
+    gather_detail_rows,
+    MAX_TRACKED_PAGES,
+    PAGE_REGISTRY_KEY,
+)
 
 
 @patch('luxin.components.detail_panel.st')
@@ -98,3 +103,142 @@ def test_detail_panel_pagination_number_input_change(mock_st):
     # Verify number_input was called with on_change
     assert mock_st.number_input.called
 
+
+
+@patch('luxin.components.detail_panel.st')
+def test_detail_panel_gathers_only_current_page(mock_st):
+    """Test that only the current page is gathered when given indices."""
+    detail_df = pd.DataFrame({'a': range(1000)}, index=range(1000, 2000))
+    detail_indices = list(range(1500, 1750))
+    
+    mock_st.columns = MagicMock(return_value=(MagicMock(), MagicMock(), MagicMock()))
+    mock_st.button = MagicMock(return_value=False)
+    mock_st.number_input = MagicMock(return_value=2)
+    mock_st.session_state = {}
+    
+    render_detail_panel(detail_df, page_size=100, detail_indices=detail_indices)
+    
+    shown = mock_st.dataframe.call_args[0][0]
+    assert len(shown) == 100
+    assert shown.index[0] == 1600
+    assert "Total: 250 row(s)" in str(mock_st.caption.call_args_list[0])
+
+
+@patch('luxin.components.detail_panel.st')
+def test_detail_panel_indices_single_page(mock_st):
+    """Test that small groups are gathered in the order of the indices."""
+    detail_df = pd.DataFrame({'a': [10, 20, 30]}, index=['x', 'y', 'z'])
+    
+    render_detail_panel(detail_df, detail_indices=['z', 'x'])
+    
+    shown = mock_st.dataframe.call_args[0][0]
+    assert shown['a'].tolist() == [30, 10]
+
+
+def test_gather_detail_rows_missing_label():
+    """Test that missing labels raise like .loc does."""
+    detail_df = pd.DataFrame({'a': [1, 2]})
+    
+    with pytest.raises(KeyError):
+        gather_detail_rows(detail_df, [0, 5])
+
+
+def test_gather_detail_rows_duplicate_index():
+    """Test gathering from a detail frame with duplicate labels."""
+    detail_df = pd.DataFrame({'a': [1, 2, 3]}, index=[0, 0, 1])
+    
+    assert gather_detail_rows(detail_df, [0])['a'].tolist() == [1, 2]
+
+
+@patch('luxin.components.detail_panel.st')
+def test_detail_panel_state_key_is_stable(mock_st):
+    """Test that pagination state is keyed by state_key, not object identity."""
+    mock_st.columns = MagicMock(return_value=(MagicMock(), MagicMock(), MagicMock()))
+    mock_st.button = MagicMock(return_value=False)
+    mock_st.session_state = {"detail_page_agg_group": 3}
+    # Like Streamlit, the widget returns the value stored under its key
+    mock_st.number_input = MagicMock(side_effect=lambda *args, **kwargs: mock_st.session_state[kwargs['key']])
+    
+    # A new DataFrame object on every rerun keeps the same page
+    for _ in range(2):
+        df = pd.DataFrame({'a': range(250)})
+        render_detail_panel(df, page_size=100, state_key="agg_group")
+    
+    assert mock_st.session_state["detail_page_agg_group"] == 3
+    assert mock_st.dataframe.call_args[0][0]['a'].iloc[0] == 200
+    assert [k for k in mock_st.session_state if k.startswith("detail_page_")] == [
+        "detail_page_agg_group", "detail_page_agg_group_input"
+    ]
+
+
+@patch('luxin.components.detail_panel.st')
+def test_detail_panel_default_state_key_from_content(mock_st):
+    """Test that equal rows share pagination state when no key is given."""
+    mock_st.columns = MagicMock(return_value=(MagicMock(), MagicMock(), MagicMock()))
+    mock_st.button = MagicMock(return_value=False)
+    mock_st.number_input = MagicMock(return_value=1)
+    mock_st.session_state = {}
+    
+    render_detail_panel(pd.DataFrame({'a': range(250)}), page_size=100)
+    render_detail_panel(pd.DataFrame({'a': range(250)}), page_size=100)
+    
+    page_keys = [k for k in mock_st.session_state if k.startswith("detail_page_") and not k.endswith("_input")]
+    assert len(page_keys) == 1
+
+
+@patch('luxin.components.detail_panel.st')
+def test_detail_panel_evicts_stale_page_state(mock_st):
+    """Test that pagination state stays bounded across many groups."""
+    mock_st.columns = MagicMock(return_value=(MagicMock(), MagicMock(), MagicMock()))
+    mock_st.button = MagicMock(return_value=False)
+    mock_st.number_input = MagicMock(return_value=1)
+    mock_st.session_state = {}
+    df = pd.DataFrame({'a': range(250)})
+    
+    for group in range(MAX_TRACKED_PAGES + 10):
+        mock_st.session_state[f"detail_page_g{group}_input"] = 1
+        render_detail_panel(df, page_size=100, state_key=f"g{group}")
+    
+    registry = mock_st.session_state[PAGE_REGISTRY_KEY]
+    assert len(registry) == MAX_TRACKED_PAGES
+    assert "detail_page_g0" not in mock_st.session_state
+    assert "detail_page_g0_input" not in mock_st.session_state
+    assert f"detail_page_g{MAX_TRACKED_PAGES + 9}" in mock_st.session_state
+
+
+def _paged_app():
+    """Streamlit script showing a 550-row group, 100 rows per page."""
+    import pandas as pd
+    from luxin.components.detail_panel import render_detail_panel
+    
+    render_detail_panel(pd.DataFrame({'a': range(550)}), page_size=100, state_key='paged')
+
+
+def test_detail_panel_page_buttons_in_streamlit():
+    """Test the page buttons and input with real widgets (no mocks)."""
+    from streamlit.testing.v1 import AppTest
+    
+    def page_caption(at):
+        return next(c.value for c in at.caption if c.value.startswith('Page '))
+    
+    def button(at, label):
+        return next(b for b in at.button if b.label == label)
+    
+    at = AppTest.from_function(_paged_app).run()
+    assert page_caption(at) == "Page 1 of 6"
+    
+    for expected in (2, 3, 4):
+        button(at, "Next ▶").click().run()
+        assert page_caption(at) == f"Page {expected} of 6"
+    assert at.dataframe[0].value['a'].iloc[0] == 300
+    
+    button(at, "◀ Previous").click().run()
+    assert page_caption(at) == "Page 3 of 6"
+    
+    at.number_input[0].set_value(6).run()
+    assert page_caption(at) == "Page 6 of 6"
+    assert button(at, "Next ▶").disabled
+    button(at, "◀ Previous").click().run()
+    assert page_caption(at) == "Page 5 of 6"
+    assert at.number_input[0].value == 5
+    assert not at.exception
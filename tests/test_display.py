@@ -1,6 +1,10 @@
 """Tests for display module."""
 
+import base64
+import json
+import zlib
 import pytest
+import numpy as np
 import pandas as pd
 from luxin.display import render_html, _detect_environment
 
@@ -59,3 +63,183 @@ def test_render_html_with_multiindex():
     assert '<html>' in html
     assert len(html) > 0
 
+
+
+def _embedded_json(html, name):
+    """Extract one entry of the embedded table payload from rendered HTML."""
+    start = html.index('<script type="application/json" id="luxin-payload-')
+    start = html.index('>', start) + 1
+    end = html.index('</script>', start)
+    return json.loads(html[start:end])[name]
+
+
+def _embedded_column(html, column):
+    """Decode one column of the embedded detail rows."""
+    detail_data = _embedded_json(html, 'detailData')
+    encoded = detail_data['data'][detail_data['columns'].index(column)]
+    if 'dict' in encoded:
+        return [encoded['dict'][code] if code >= 0 else None for code in _decode_buffer(encoded['codes'])]
+    return _decode_buffer(encoded['values'])
+
+
+def _embedded_groups(html):
+    """Decode the embedded row positions of every group, in mapping order."""
+    starts = _decode_buffer(_embedded_json(html, 'groupStarts'))
+    rows = _decode_buffer(_embedded_json(html, 'groupRows'))
+    return [rows[start:stop] for start, stop in zip(starts, starts[1:])]
+
+
+def _decode_buffer(buffer):
+    """Decode a base64 typed array buffer to a list."""
+    raw = base64.b64decode(buffer['base64'])
+    if buffer.get('deflate'):
+        raw = zlib.decompress(raw)
+    dtype = {'float64': '<f8', 'int32': '<i4', 'int16': '<i2', 'int8': 'i1', 'uint8': 'u1'}[buffer['dtype']]
+    return np.frombuffer(raw, dtype=dtype).tolist()
+
+
+def test_render_html_embeds_only_referenced_rows():
+    """Test that unreferenced detail rows are not embedded."""
+    detail_df = pd.DataFrame({
+        'category': ['A', 'A', 'B', 'B', 'C'],
+        'value': [10, 20, 30, 40, 50]
+    })
+    agg_df = detail_df[detail_df['category'] != 'C'].groupby('category').sum()
+    source_mapping = {('A',): [0, 1], ('B',): [2, 3]}
+    
+    html = render_html(agg_df, detail_df, source_mapping, ['category'])
+    
+    assert _embedded_column(html, 'value') == [10, 20, 30, 40]
+    assert _embedded_groups(html) == [[0, 1], [2, 3]]
+
+
+def test_render_html_list_values():
+    """Test that list and dict cells render as text in detail and aggregate rows."""
+    detail_df = pd.DataFrame({
+        'category': ['A', 'A', 'B'],
+        'tags': [['x'], None, {'q': 1}],
+        'value': [10, 20, 30]
+    })
+    agg_df = detail_df.groupby('category').agg({'value': list})
+    source_mapping = {('A',): [0, 1], ('B',): [2]}
+    
+    html = render_html(agg_df, detail_df, source_mapping, ['category'])
+    
+    assert _embedded_column(html, 'tags') == ["['x']", None, "{'q': 1}"]
+    agg_data = _embedded_json(html, 'aggData')
+    assert agg_data['data'][1]['dict'] == ['[10, 20]', '[30]']
+
+
+def test_render_html_max_rows_per_group():
+    """Test the per-group cap on embedded rows."""
+    detail_df = pd.DataFrame({'category': ['A'] * 5 + ['B'] * 2, 'value': range(7)})
+    agg_df = detail_df.groupby('category').sum()
+    source_mapping = {('A',): [0, 1, 2, 3, 4], ('B',): [5, 6]}
+    
+    html = render_html(agg_df, detail_df, source_mapping, ['category'], max_rows_per_group=3)
+    
+    assert _embedded_column(html, 'value') == [0, 1, 2, 5, 6]
+    assert _decode_buffer(_embedded_json(html, 'groupSizes')) == [5, 2]
+
+
+def test_render_html_payload_budget():
+    """Test that the size budget bounds the embedded detail data."""
+    detail_df = pd.DataFrame({
+        'category': ['A'] * 5000 + ['B'] * 10,
+        'text': [f'{i:050d}' for i in range(5010)]
+    })
+    agg_df = detail_df.groupby('category').count()
+    source_mapping = {('A',): list(range(5000)), ('B',): list(range(5000, 5010))}
+    
+    html = render_html(agg_df, detail_df, source_mapping, ['category'], max_payload_bytes=50_000)
+    group_a, group_b = _embedded_groups(html)
+    
+    assert len(html) < 200_000
+    assert 0 < len(group_a) < 1000
+    # Small groups are kept whole
+    assert len(group_b) == 10
+
+
+def test_render_html_compressed_payload():
+    """Test that compressed detail columns decode to the original values."""
+    detail_df = pd.DataFrame({'category': ['A', 'A', 'B'], 'value': [1.5, 2.5, 3.5]})
+    agg_df = detail_df.groupby('category').sum()
+    source_mapping = {('A',): [0, 1], ('B',): [2]}
+    
+    html = render_html(agg_df, detail_df, source_mapping, ['category'], compression='deflate')
+    
+    assert '"deflate":true' in html
+    assert _embedded_column(html, 'value') == [1.5, 2.5, 3.5]
+    assert _embedded_column(html, 'category') == ['A', 'A', 'B']
+
+
+def test_render_html_invalid_compression():
+    """Test that unknown compression methods are rejected."""
+    detail_df = pd.DataFrame({'category': ['A'], 'value': [1]})
+    agg_df = detail_df.groupby('category').sum()
+    
+    with pytest.raises(ValueError, match="Unsupported compression"):
+        render_html(agg_df, detail_df, {('A',): [0]}, ['category'], compression='gzip')
+
+
+def test_render_html_reuses_loaded_assets():
+    """Test that assets are read once and data is inserted verbatim."""
+    from luxin.display import _page_fragments
+    
+    detail_df = pd.DataFrame({'category': ['A', 'B'], 'note': ['{unique_id}', '{css}']})
+    agg_df = detail_df.groupby('category').count()
+    source_mapping = {('A',): [0], ('B',): [1]}
+    
+    render_html(agg_df, detail_df, source_mapping, ['category'])
+    hits = _page_fragments.cache_info().hits
+    html = render_html(agg_df, detail_df, source_mapping, ['category'], table_id='fixedid1')
+    
+    assert _page_fragments.cache_info().hits == hits + 1
+    assert 'id="detail-panel-fixedid1"' in html
+    # Placeholder-like text inside the data is left alone
+    assert _embedded_column(html, 'note') == ['{unique_id}', '{css}']
+
+
+def test_render_html_without_runtime():
+    """Test that tables can omit the shared CSS/JS runtime."""
+    from luxin.display import render_runtime
+    
+    detail_df = pd.DataFrame({'category': ['A', 'B'], 'value': [1, 2]})
+    agg_df = detail_df.groupby('category').sum()
+    source_mapping = {('A',): [0], ('B',): [1]}
+    
+    full = render_html(agg_df, detail_df, source_mapping, ['category'])
+    bare = render_html(agg_df, detail_df, source_mapping, ['category'], include_runtime=False)
+    
+    assert render_runtime() in full
+    assert 'luxin.mount = function' not in bare
+    assert "window.luxin.mount('" in bare
+    assert len(bare) < len(full)
+
+
+def test_render_html_virtual_agg_table():
+    """Test that the aggregate ships as columnar data with a small static preview."""
+    detail_df = pd.DataFrame({'category': [f'c{i}' for i in range(200)], 'value': range(200)})
+    agg_df = detail_df.groupby('category').sum()
+    source_mapping = {(f'c{i}',): [i] for i in range(200)}
+    
+    html = render_html(agg_df, detail_df, source_mapping, ['category'])
+    agg_data = _embedded_json(html, 'aggData')
+    
+    assert agg_data['columns'] == ['category', 'value']
+    assert agg_data['length'] == 200
+    assert _embedded_json(html, 'aggIndexColumns') == 1
+    # Only the static preview is rendered as HTML rows
+    assert html.count('<tr') < 60
+
+
+def test_render_html_row_groups_follow_agg_order():
+    """Test that aggregate rows map to groups by index value, not order."""
+    detail_df = pd.DataFrame({'category': ['A', 'B', 'C'], 'value': [1, 2, 3]})
+    agg_df = detail_df.groupby('category').sum().sort_values('value', ascending=False)
+    source_mapping = {('A',): [0], ('B',): [1], ('C',): [2]}
+    
+    html = render_html(agg_df[agg_df['value'] > 1], detail_df, source_mapping, ['category'])
+    
+    # Rows are C, B; groups are numbered in mapping order A, B, C
+    assert _decode_buffer(_embedded_json(html, 'rowGroups')) == [2, 1]
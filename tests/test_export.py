@@ -1,9 +1,10 @@
 """Tests for export functionality."""
 
+import io
 import pytest
 import pandas as pd
 from unittest.mock import patch, MagicMock
-from luxin.components.export import render_export_buttons
+from luxin.components.export import render_export_buttons, write_csv
 
 
 def test_render_export_buttons_csv():
@@ -114,3 +115,103 @@ def test_render_export_buttons_empty_dataframe():
         render_export_buttons(df)
         mock_st.download_button.assert_called()
 
+
+
+def test_render_export_buttons_lazy_not_prepared():
+    """Test that a callable source is not invoked until export is requested."""
+    source = MagicMock(return_value=pd.DataFrame({'a': [1]}))
+    
+    with patch('luxin.components.export.st') as mock_st:
+        mock_st.session_state = {}
+        mock_st.subheader = MagicMock()
+        mock_st.button = MagicMock(return_value=False)
+        mock_st.download_button = MagicMock()
+        
+        render_export_buttons(source, key="prep")
+        
+        source.assert_not_called()
+        mock_st.download_button.assert_not_called()
+        assert mock_st.button.call_args[1]['key'] == "prep"
+
+
+def test_render_export_buttons_lazy_prepared():
+    """Test that a callable source is exported once requested."""
+    source = MagicMock(return_value=pd.DataFrame({'a': [1]}))
+    
+    with patch('luxin.components.export.st') as mock_st:
+        mock_st.session_state = {'export_prepare_data_prepared': True}
+        mock_st.subheader = MagicMock()
+        mock_st.columns = MagicMock(return_value=(MagicMock(), MagicMock(), MagicMock()))
+        mock_st.download_button = MagicMock()
+        
+        render_export_buttons(source)
+        
+        source.assert_called_once()
+        assert mock_st.download_button.call_count >= 2
+
+
+def _lazy_export_app():
+    import pandas as pd
+    from luxin.components.export import render_export_buttons
+    
+    render_export_buttons(lambda: pd.DataFrame({'a': [1, 2]}), key="prep", formats=('csv',))
+
+
+def test_render_export_buttons_lazy_stays_prepared():
+    """Test that prepared exports survive later reruns until discarded."""
+    from streamlit.testing.v1 import AppTest
+    
+    at = AppTest.from_function(_lazy_export_app).run()
+    assert len(at.get('download_button')) == 0
+    
+    at.button(key="prep").click().run()
+    assert len(at.get('download_button')) == 1
+    at.run()
+    assert len(at.get('download_button')) == 1
+    
+    at.button(key="prep_discard").click().run()
+    assert len(at.get('download_button')) == 0
+    assert [button.label for button in at.button] == ["Prepare export"]
+
+
+def test_write_csv_in_chunks():
+    """Test that chunked CSV output matches a single to_csv call."""
+    df = pd.DataFrame({'a': range(25), 'b': ['x, y', 'z'] * 12 + ['w']})
+    
+    for frame in (df, df.iloc[:0]):
+        buffer = io.BytesIO()
+        write_csv(frame, buffer, chunk_size=7)
+        assert buffer.getvalue().decode('utf-8') == frame.to_csv(index=False)
+
+
+def test_render_export_buttons_formats():
+    """Test that only the configured formats are offered."""
+    df = pd.DataFrame({'a': [1, 2, 3]})
+    
+    with patch('luxin.components.export.st') as mock_st:
+        mock_st.columns = MagicMock(return_value=(MagicMock(),))
+        render_export_buttons(df, formats=('json',))
+        
+        mock_st.columns.assert_called_once_with(1)
+        mimes = [call[1]['mime'] for call in mock_st.download_button.call_args_list]
+        assert mimes == ['application/json']
+        
+        render_export_buttons(df, formats=())
+        assert mock_st.subheader.call_count == 1
+    
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        render_export_buttons(df, formats=('csv', 'parquet'))
+
+
+def test_csv_button_spools_to_disk():
+    """Test that a CSV export larger than the spool limit is written to a file."""
+    df = pd.DataFrame({'a': range(1000), 'b': ['text'] * 1000})
+    
+    with patch('luxin.components.export.st') as mock_st, \
+            patch('luxin.components.export.CSV_SPOOL_BYTES', 100), \
+            patch('luxin.components.export.write_csv', wraps=write_csv) as mock_write:
+        mock_st.columns = MagicMock(return_value=(MagicMock(),))
+        render_export_buttons(df, formats=('csv',))
+    
+    assert mock_write.call_args[0][1]._rolled
+    assert mock_st.download_button.call_args[1]['data'] == df.to_csv(index=False).encode('utf-8')
@@ -3,7 +3,7 @@
 import pytest
 import pandas as pd
 from unittest.mock import patch, MagicMock
-from luxin.components.filters import render_filters
+from luxin.components.filters import render_filters, FilterPlan
 
 
 def test_render_filters_no_filtering():
@@ -131,3 +131,106 @@ def test_render_filters_custom_key_prefix():
         call_kwargs = mock_st.text_input.call_args[1]
         assert 'custom' in call_kwargs['key']
 
+
+
+def test_render_filters_combines_search_and_multiselect():
+    """Test that search and multiselect filters are intersected."""
+    df = pd.DataFrame({
+        'category': ['A', 'A', 'B', 'B'],
+        'name': ['apple', 'pear', 'apple', 'plum'],
+        'value': [10, 20, 30, 40]
+    }, index=[100, 200, 300, 400])
+    
+    def multiselect(label, options, default, key):
+        return ['A'] if label == 'Filter category' else []
+    
+    with patch('luxin.components.filters.st') as mock_st:
+        mock_st.text_input = MagicMock(return_value="apple")
+        mock_st.expander = MagicMock(return_value=MagicMock())
+        mock_st.multiselect = MagicMock(side_effect=multiselect)
+        mock_st.slider = MagicMock(return_value=(10, 40))
+        mock_st.caption = MagicMock()
+        
+        result = render_filters(df)
+        
+        assert result.index.tolist() == [100]
+
+
+def test_render_filters_numeric_range_inclusive():
+    """Test that slider ranges keep rows on both bounds."""
+    df = pd.DataFrame({'value': [10, 20, 30, 40]})
+    
+    with patch('luxin.components.filters.st') as mock_st:
+        mock_st.text_input = MagicMock(return_value="")
+        mock_st.expander = MagicMock(return_value=MagicMock())
+        mock_st.slider = MagicMock(return_value=(20.0, 30.0))
+        mock_st.caption = MagicMock()
+        
+        result = render_filters(df)
+        
+        assert result['value'].tolist() == [20, 30]
+        assert mock_st.slider.call_args[1]['min_value'] == 10.0
+        assert mock_st.slider.call_args[1]['max_value'] == 40.0
+
+
+def test_render_filters_stores_plan_without_copying():
+    """Test that the compiled plan is stored and unfiltered data is not copied."""
+    df = pd.DataFrame({'category': ['A', 'B'], 'value': [1, 2]})
+    
+    with patch('luxin.components.filters.st') as mock_st:
+        mock_st.text_input = MagicMock(return_value="")
+        mock_st.expander = MagicMock(return_value=MagicMock())
+        mock_st.multiselect = MagicMock(return_value=[])
+        mock_st.slider = MagicMock(return_value=(1.0, 2.0))
+        mock_st.session_state = {}
+        
+        result = render_filters(df, key_prefix="k")
+        
+        assert result is df
+        assert mock_st.session_state["k_plan"].is_empty
+
+
+def test_filter_plan_apply_to_new_data():
+    """Test that a plan can be reused on a different DataFrame."""
+    plan = FilterPlan(search='a', categories={'region': ['East']}, ranges={'sales': (0, 150)})
+    
+    df1 = pd.DataFrame({
+        'region': ['East', 'East', 'West'],
+        'product': ['apple', 'banana', 'apple'],
+        'sales': [100, 200, 50]
+    })
+    df2 = pd.DataFrame({
+        'region': ['West', 'East', 'East'],
+        'product': ['kiwi', 'pear', 'mango'],
+        'sales': [10, 120, 140]
+    })
+    
+    assert plan.apply(df1)['sales'].tolist() == [100]
+    assert plan.apply(df2)['product'].tolist() == ['pear', 'mango']
+
+
+def test_filter_plan_empty_returns_input():
+    """Test that an empty plan keeps every row without copying."""
+    df = pd.DataFrame({'a': [1, 2, 3]})
+    plan = FilterPlan()
+    
+    assert plan.is_empty
+    assert plan.positions(df) is None
+    assert plan.apply(df) is df
+
+
+def test_filter_plan_missing_column():
+    """Test that filtering on an unknown column raises KeyError."""
+    df = pd.DataFrame({'a': [1, 2, 3]})
+    plan = FilterPlan(ranges={'missing': (0, 1)})
+    
+    with pytest.raises(KeyError, match="missing"):
+        plan.apply(df)
+
+
+def test_filter_plan_high_cardinality_column():
+    """Test category filters on columns too large for a category index."""
+    df = pd.DataFrame({'name': [f'item{i}' for i in range(100)]})
+    plan = FilterPlan(categories={'name': ['item3', 'item42']})
+    
+    assert plan.positions(df).tolist() == [3, 42]
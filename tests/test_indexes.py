@@ -0,0 +1,191 @@
+"""Tests for prebuilt filter indexes."""
+
+import pytest
+import numpy as np
+import pandas as pd
+from luxin.indexes import (
+    SearchIndex,
+    CategoryIndex,
+    SortedIndex,
+    get_frame_index,
+    clear_index_cache,
+    index_cache_nbytes,
+    trim_index_cache,
+    bitmap_to_positions,
+    positions_to_bitmap,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_index_cache()
+    yield
+    clear_index_cache()
+
+
+def test_search_index_matches_any_column():
+    """Test that search finds matches in string and numeric columns."""
+    df = pd.DataFrame({
+        'category': ['Apple', 'Banana', 'Cherry'],
+        'value': [10, 205, 30]
+    })
+    index = SearchIndex(df)
+    
+    assert index.search('app').tolist() == [0]
+    assert index.search('20').tolist() == [1]
+    assert index.search('AN').tolist() == [1]
+    assert index.search('xyz').tolist() == []
+
+
+def test_search_index_is_literal():
+    """Test that queries are treated as literal text, not regex."""
+    df = pd.DataFrame({'name': ['a.b', 'axb']})
+    index = SearchIndex(df)
+    
+    assert index.search('a.b').tolist() == [0]
+
+
+def test_search_index_does_not_span_columns():
+    """Test that a query cannot match across a column boundary."""
+    df = pd.DataFrame({'a': ['ab'], 'b': ['cd']})
+    index = SearchIndex(df)
+    
+    assert index.search('bc').tolist() == []
+
+
+def test_search_index_refines_previous_query():
+    """Test that extending a query narrows results correctly."""
+    df = pd.DataFrame({'name': ['apple', 'apricot', 'banana', 'grape']})
+    index = SearchIndex(df)
+    
+    assert index.search('ap').tolist() == [0, 1, 3]
+    assert index.search('apr').tolist() == [1]
+    # A query that does not extend the previous one searches everything again
+    assert index.search('an').tolist() == [2]
+
+
+def test_search_index_non_range_index():
+    """Test that results are positions even when the index is not a RangeIndex."""
+    df = pd.DataFrame({'name': ['x', 'y', 'x']}, index=[10, 20, 30])
+    index = SearchIndex(df)
+    
+    assert index.search('x').tolist() == [0, 2]
+
+
+def test_search_index_matches_scan():
+    """Test that indexed search agrees with scanning every cell's text."""
+    df = pd.DataFrame({
+        'name': ['Apple pie', 'ab', None, 'b', 'Crème brûlée', 'a😀b'],
+        'price': [1.25, np.nan, 12.5, -3.0, 125.0, 0.5],
+        'flag': [True, False, True, False, True, False],
+        'mixed': pd.Series([1, 'AB', None, 2.5, 'x', 'pie'], dtype=object),
+    })
+    index = SearchIndex(df)
+    
+    for query in ['a', 'b', 'AB', '.5', '25', 'pie', 'PIE ', 'ème', '😀', 'a😀b', 'true', 'e', 'nan', 'zz']:
+        expected = np.zeros(len(df), dtype=bool)
+        for name in df.columns:
+            text = df[name].astype(str).str.lower()
+            expected |= text.str.contains(query.lower(), regex=False).fillna(False).to_numpy(dtype=bool)
+        assert index.search(query).tolist() == np.flatnonzero(expected).tolist(), query
+
+
+def test_bitmap_round_trip():
+    """Test converting positions to a bitmap and back."""
+    positions = np.array([0, 3, 8, 9])
+    bitmap = positions_to_bitmap(positions, 10)
+    
+    assert bitmap.nbytes == 2
+    assert bitmap_to_positions(bitmap, 10).tolist() == [0, 3, 8, 9]
+
+
+def test_category_index_values_sorted_without_nulls():
+    """Test that category values are sorted and exclude nulls."""
+    index = CategoryIndex(pd.Series(['b', None, 'a', 'b']))
+    
+    assert index.values == ['a', 'b']
+
+
+def test_category_index_bitmap_union():
+    """Test that selecting several values ORs their bitmaps."""
+    index = CategoryIndex(pd.Series(['a', 'b', 'c', 'a', None]))
+    
+    assert bitmap_to_positions(index.bitmap(['a']), 5).tolist() == [0, 3]
+    assert bitmap_to_positions(index.bitmap(['a', 'c']), 5).tolist() == [0, 2, 3]
+    assert bitmap_to_positions(index.bitmap(['missing']), 5).tolist() == []
+
+
+def test_frame_index_category_cardinality_limit():
+    """Test that high-cardinality columns are not indexed."""
+    df = pd.DataFrame({'a': ['x', 'y', 'z']})
+    frame_index = get_frame_index(df)
+    
+    assert frame_index.category_index(df, 0, max_values=2) is None
+    assert frame_index.category_index(df, 0, max_values=3).values == ['x', 'y', 'z']
+
+
+def test_sorted_index_range_positions():
+    """Test that range lookups match a linear scan, bounds inclusive."""
+    values = pd.Series([5, 1, 9, 3, 7, 3])
+    index = SortedIndex(values)
+    
+    assert index.min_value == 1
+    assert index.max_value == 9
+    assert sorted(index.range_positions(3, 7).tolist()) == [0, 3, 4, 5]
+    assert index.range_positions(10, 20).tolist() == []
+    assert index.covers_all(1, 9)
+    assert not index.covers_all(2, 9)
+
+
+def test_sorted_index_excludes_missing_values():
+    """Test that NaN rows never fall inside a range."""
+    index = SortedIndex(pd.Series([1.0, np.nan, 3.0]))
+    
+    assert index.max_value == 3.0
+    assert sorted(index.range_positions(0, 10).tolist()) == [0, 2]
+    assert not index.covers_all(0, 10)
+
+
+def test_sorted_index_nullable_and_empty():
+    """Test nullable integer columns and columns without values."""
+    index = SortedIndex(pd.Series([2, None, 1], dtype='Int64'))
+    assert sorted(index.range_positions(1, 2).tolist()) == [0, 2]
+    
+    empty = SortedIndex(pd.Series([np.nan, np.nan]))
+    assert empty.min_value is None
+
+
+def test_get_frame_index_is_cached_by_content():
+    """Test that equal DataFrames share one cached FrameIndex."""
+    df1 = pd.DataFrame({'a': [1, 2, 3]})
+    df2 = pd.DataFrame({'a': [1, 2, 3]})
+    df3 = pd.DataFrame({'a': [1, 2, 4]})
+    
+    assert get_frame_index(df1) is get_frame_index(df2)
+    assert get_frame_index(df1) is not get_frame_index(df3)
+
+
+def test_get_frame_index_rebuilds_on_shape_mismatch():
+    """Test that a reused fingerprint with different shape gets a fresh index."""
+    df1 = pd.DataFrame({'a': [1, 2, 3]})
+    df2 = pd.DataFrame({'a': [1, 2]})
+    
+    first = get_frame_index(df1, fingerprint='same')
+    second = get_frame_index(df2, fingerprint='same')
+    
+    assert first is not second
+    assert second.n_rows == 2
+
+
+def test_trim_index_cache_keeps_most_recent():
+    """Test that trimming evicts old indexes but keeps the latest one."""
+    frames = [pd.DataFrame({'a': [f'{i}-{j}' for j in range(100)]}) for i in range(3)]
+    for df in frames:
+        get_frame_index(df).search_index(df)
+    latest = get_frame_index(frames[-1])
+    
+    trim_index_cache(latest.nbytes + 1)
+    assert index_cache_nbytes() == latest.nbytes
+    
+    trim_index_cache(0)
+    assert get_frame_index(frames[-1]) is latest
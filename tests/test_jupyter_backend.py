@@ -0,0 +1,240 @@
+"""
+Tests for the Jupyter backend and its kernel-side detail fetching.
+"""
+
+import gc
+import json
+import sys
+import pytest
+import pandas as pd
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from luxin import jupyter_backend
+from luxin.jupyter_backend import (
+    display_jupyter,
+    register_detail_source,
+    fetch_detail_page,
+    MAX_REGISTERED_TABLES,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_sources():
+    """Start every test with no registered tables and no runtime loaded."""
+    jupyter_backend._detail_sources.clear()
+    jupyter_backend._pending_sources.clear()
+    with patch('luxin.jupyter_backend._runtime_loaded', False), \
+            patch('luxin.jupyter_backend._runtime_cell', None), \
+            patch('luxin.jupyter_backend._runtime_cell_pending', False):
+        yield
+    jupyter_backend._detail_sources.clear()
+    jupyter_backend._pending_sources.clear()
+
+
+def _sample():
+    detail_df = pd.DataFrame({'category': ['A'] * 250 + ['B'] * 5, 'value': range(255)})
+    source_mapping = {('A',): list(range(250)), ('B',): list(range(250, 255))}
+    return detail_df, source_mapping
+
+
+def test_fetch_detail_page():
+    """Test fetching one page of a group's rows."""
+    detail_df, source_mapping = _sample()
+    register_detail_source('t1', detail_df, source_mapping)
+    
+    page = fetch_detail_page('t1', 0, offset=100, limit=100)
+    data = json.loads(page['detail_data'])
+    
+    assert page['offset'] == 100
+    assert page['total'] == 250
+    assert data['length'] == 100
+    assert data['columns'] == ['category', 'value']
+
+
+def test_fetch_detail_page_unknown():
+    """Test that unknown tables and groups raise KeyError."""
+    detail_df, source_mapping = _sample()
+    register_detail_source('t1', detail_df, source_mapping)
+    
+    with pytest.raises(KeyError, match="no longer registered"):
+        fetch_detail_page('missing', 0)
+    with pytest.raises(KeyError, match="not found"):
+        fetch_detail_page('t1', 2)
+
+
+def test_registered_tables_are_bounded():
+    """Test that only the most recent tables stay registered."""
+    detail_df, source_mapping = _sample()
+    for i in range(MAX_REGISTERED_TABLES + 3):
+        register_detail_source(f't{i}', detail_df, source_mapping)
+    
+    assert len(jupyter_backend._detail_sources) == MAX_REGISTERED_TABLES
+    with pytest.raises(KeyError):
+        fetch_detail_page('t0', 0)
+
+
+def test_detail_comm_replies_to_requests():
+    """Test that the comm handler answers page requests and errors."""
+    detail_df, source_mapping = _sample()
+    register_detail_source('t1', detail_df, source_mapping)
+    comm = MagicMock()
+    jupyter_backend._open_detail_comm(comm, {})
+    on_msg = comm.on_msg.call_args[0][0]
+    
+    on_msg({'content': {'data': {'request': 7, 'table': 't1', 'group': 1, 'offset': 0, 'limit': 100}}})
+    reply = comm.send.call_args[0][0]
+    assert reply['request'] == 7
+    assert reply['total'] == 5
+    
+    on_msg({'content': {'data': {'request': 8, 'table': 'gone', 'group': 1}}})
+    reply = comm.send.call_args[0][0]
+    assert reply['request'] == 8
+    assert 'no longer registered' in reply['error']
+
+
+def test_display_jupyter_without_kernel_embeds_all_rows():
+    """Test that outside a kernel every detail row is embedded."""
+    detail_df, source_mapping = _sample()
+    agg_df = detail_df.groupby('category').sum()
+    
+    with patch('luxin.jupyter_backend.display') as mock_display, \
+            patch('luxin.jupyter_backend._get_comm_manager', return_value=None):
+        display_jupyter(agg_df, detail_df, source_mapping, ['category'])
+    
+    html = mock_display.call_args[0][0].data
+    assert '"kernelFetch":false' in html
+    assert '"length":255' in html
+    assert not jupyter_backend._detail_sources
+
+
+def test_display_jupyter_with_kernel_keeps_budgeted_rows():
+    """Test that kernel fetching does not reduce the embedded rows."""
+    detail_df, source_mapping = _sample()
+    agg_df = detail_df.groupby('category').sum()
+    manager = MagicMock()
+    
+    with patch('luxin.jupyter_backend.display') as mock_display, \
+            patch('luxin.jupyter_backend._comm_target_registered', False), \
+            patch('luxin.jupyter_backend._get_comm_manager', return_value=manager):
+        display_jupyter(agg_df, detail_df, source_mapping, ['category'], page_size=50)
+    
+    html = mock_display.call_args[0][0].data
+    manager.register_target.assert_called_once()
+    assert '"kernelFetch":true' in html
+    # Frontends that cannot reach the kernel still see every row
+    assert '"length":255' in html
+    # Kept only weakly until the table opens its comm
+    assert not jupyter_backend._detail_sources
+    assert len(jupyter_backend._pending_sources) == 1
+    
+    with patch('luxin.jupyter_backend.display') as mock_display, \
+            patch('luxin.jupyter_backend._get_comm_manager', return_value=manager):
+        display_jupyter(agg_df, detail_df, source_mapping, ['category'], max_rows_per_group=50)
+    assert '"length":55' in mock_display.call_args[0][0].data
+
+
+def test_detail_source_registered_when_comm_opens():
+    """Test that a table's rows are kept once its frontend connects, and not before."""
+    detail_df, source_mapping = _sample()
+    agg_df = detail_df.groupby('category').sum()
+    
+    with patch('luxin.jupyter_backend.display'), \
+            patch('luxin.jupyter_backend._comm_target_registered', True):
+        display_jupyter(agg_df, detail_df, source_mapping, ['category'])
+        display_jupyter(agg_df, detail_df.copy(), source_mapping, ['category'])
+    (opened, _), (dropped, _) = jupyter_backend._pending_sources.items()
+    
+    jupyter_backend._open_detail_comm(MagicMock(), {'content': {'data': {'table': opened}}})
+    assert list(jupyter_backend._detail_sources) == [opened]
+    assert fetch_detail_page(opened, 1)['total'] == 5
+    
+    # The second table's frame was a temporary: nothing keeps it alive
+    gc.collect()
+    with pytest.raises(KeyError, match="no longer registered"):
+        fetch_detail_page(dropped, 1)
+
+
+def test_runtime_is_sent_once_per_session():
+    """Test that only the first table carries the shared runtime."""
+    detail_df, source_mapping = _sample()
+    agg_df = detail_df.groupby('category').sum()
+    
+    with patch('luxin.jupyter_backend.display') as mock_display, \
+            patch('luxin.jupyter_backend._get_comm_manager', return_value=None):
+        display_jupyter(agg_df, detail_df, source_mapping, ['category'])
+        display_jupyter(agg_df, detail_df, source_mapping, ['category'])
+    
+    first, second = (call[0][0].data for call in mock_display.call_args_list)
+    assert 'luxin.mount = function' in first
+    assert 'luxin.mount = function' not in second
+
+
+def test_runtime_is_resent_when_its_cell_reruns():
+    """Test that re-running the cell carrying the runtime sends it again."""
+    detail_df, source_mapping = _sample()
+    agg_df = detail_df.groupby('category').sum()
+    
+    def cell(cell_id):
+        return SimpleNamespace(cell_id=cell_id, raw_cell='show()')
+    
+    with patch('luxin.jupyter_backend.display') as mock_display, \
+            patch('luxin.jupyter_backend._get_comm_manager', return_value=None):
+        jupyter_backend._on_pre_run_cell(cell('c1'))
+        display_jupyter(agg_df, detail_df, source_mapping, ['category'])
+        jupyter_backend._on_post_run_cell(SimpleNamespace(info=cell('c1')))
+        
+        jupyter_backend._on_pre_run_cell(cell('c2'))
+        display_jupyter(agg_df, detail_df, source_mapping, ['category'])
+        jupyter_backend._on_post_run_cell(SimpleNamespace(info=cell('c2')))
+        
+        jupyter_backend._on_pre_run_cell(cell('c1'))
+        display_jupyter(agg_df, detail_df, source_mapping, ['category'])
+    
+    carries_runtime = ['luxin.mount = function' in call[0][0].data for call in mock_display.call_args_list]
+    assert carries_runtime == [True, False, True]
+
+
+def test_table_without_runtime_queues_mount():
+    """Test that a table shown before the runtime waits for it to load."""
+    detail_df, source_mapping = _sample()
+    agg_df = detail_df.groupby('category').sum()
+    
+    with patch('luxin.jupyter_backend.display') as mock_display, \
+            patch('luxin.jupyter_backend._get_comm_manager', return_value=None), \
+            patch('luxin.jupyter_backend._runtime_loaded', True):
+        display_jupyter(agg_df, detail_df, source_mapping, ['category'])
+    
+    html = mock_display.call_args[0][0].data
+    assert 'window.luxinPending' in html
+    assert 'init_notebook(force=True)' in html
+
+
+def test_init_notebook_loads_runtime():
+    """Test that init_notebook sends the runtime once unless forced."""
+    import luxin
+    
+    with patch('luxin.jupyter_backend.display') as mock_display:
+        luxin.init_notebook()
+        luxin.init_notebook()
+        assert mock_display.call_count == 1
+        luxin.init_notebook(force=True)
+        assert mock_display.call_count == 2
+    assert 'luxin.mount = function' in mock_display.call_args[0][0].data
+
+
+def test_isolated_outputs_always_carry_runtime():
+    """Test that every table carries the runtime when outputs cannot share it."""
+    import luxin
+    
+    detail_df, source_mapping = _sample()
+    agg_df = detail_df.groupby('category').sum()
+    
+    with patch('luxin.jupyter_backend.display') as mock_display, \
+            patch('luxin.jupyter_backend._get_comm_manager', return_value=None), \
+            patch.dict(sys.modules, {'google.colab': MagicMock()}):
+        luxin.init_notebook()
+        display_jupyter(agg_df, detail_df, source_mapping, ['category'])
+        display_jupyter(agg_df, detail_df, source_mapping, ['category'])
+    
+    carries_runtime = ['luxin.mount = function' in call[0][0].data for call in mock_display.call_args_list]
+    assert carries_runtime == [True, True]
@@ -0,0 +1,109 @@
+"""Tests for memory accounting."""
+
+import sys
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from luxin import Inspector, TrackedDataFrame
+from luxin.components.filters import FilterPlan
+from luxin.indexes import clear_index_cache, index_cache_nbytes
+from luxin.memory import memory_usage_report, source_mapping_nbytes
+from luxin.stats import clear_stats_cache, get_summary_stats
+from luxin.utils import frame_fingerprint
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    clear_index_cache()
+    clear_stats_cache()
+    yield
+    clear_index_cache()
+    clear_stats_cache()
+
+
+def _aggregate():
+    df = TrackedDataFrame({
+        'category': ['A', 'B'] * 500,
+        'value': np.arange(1000),
+    })
+    return df.groupby('category').agg({'value': 'sum'})
+
+
+def test_source_mapping_nbytes_counts_objects():
+    """Test that the mapping size includes keys, lists and labels."""
+    mapping = {('A',): [1000, 1001], ('B',): [1002]}
+    
+    expected = (
+        sys.getsizeof(mapping)
+        + 2 * sys.getsizeof(('A',)) + 2 * sys.getsizeof('A')
+        + sys.getsizeof(mapping[('A',)]) + sys.getsizeof(mapping[('B',)])
+        + 3 * sys.getsizeof(1000)
+    )
+    assert source_mapping_nbytes(mapping) == expected
+
+
+def test_tracked_memory_usage_report():
+    """Test the breakdown of an aggregated TrackedDataFrame."""
+    agg = _aggregate()
+    
+    report = agg.memory_usage_report()
+    
+    assert list(report.index) == [
+        'aggregate', 'source_df', 'source_mapping', 'filter_indexes', 'summary_stats',
+        'detail_sources', 'total'
+    ]
+    assert report['source_df'] == agg._source_df.memory_usage(deep=True).sum()
+    assert report['source_mapping'] > 1000 * sys.getsizeof(1000)
+    assert report['filter_indexes'] == 0
+    assert report['total'] == report.drop('total').sum()
+
+
+def test_memory_usage_report_counts_cached_artifacts():
+    """Test that caches built for the aggregate are attributed to it."""
+    agg = _aggregate()
+    fingerprint = frame_fingerprint(agg)
+    get_summary_stats(agg, fingerprint=fingerprint)
+    display_df = agg.reset_index()
+    FilterPlan(ranges={'value': (0, 1)}).positions(display_df, f"{fingerprint}:display")
+    # Caches of other frames are not counted
+    FilterPlan(search='x').positions(pd.DataFrame({'a': ['x', 'y']}))
+    
+    report = memory_usage_report(agg, agg._source_df, agg._source_mapping)
+    
+    assert report['summary_stats'] > 0
+    assert 0 < report['filter_indexes'] < index_cache_nbytes()
+
+
+def test_memory_usage_report_requires_aggregation():
+    """Test that plain TrackedDataFrames are rejected."""
+    with pytest.raises(ValueError, match="aggregated"):
+        TrackedDataFrame({'a': [1]}).memory_usage_report()
+
+
+def test_inspector_memory_usage_report():
+    """Test the Inspector report with and without aggregation tracking."""
+    agg = _aggregate()
+    assert Inspector(agg).memory_usage_report().equals(agg.memory_usage_report())
+    
+    report = Inspector(pd.DataFrame({'a': [1, 2]})).memory_usage_report()
+    assert report['source_df'] == 0
+    assert report['source_mapping'] == 0
+    assert report['total'] == report['aggregate']
+
+
+def test_memory_usage_report_counts_detail_sources():
+    """Test that detail frames kept by the Jupyter kernel are reported once."""
+    from luxin import jupyter_backend
+    
+    agg = _aggregate()
+    other = pd.DataFrame({'a': np.arange(1000)})
+    with patch.dict(jupyter_backend._detail_sources, clear=True):
+        jupyter_backend.register_detail_source('t1', agg._source_df, agg._source_mapping)
+        jupyter_backend.register_detail_source('t2', other, {('x',): [0]})
+        jupyter_backend.register_detail_source('t3', other, {('x',): [1]})
+        
+        report = agg.memory_usage_report()
+    
+    frame_bytes = other.memory_usage(index=True, deep=True).sum()
+    assert frame_bytes < report['detail_sources'] < 2 * frame_bytes
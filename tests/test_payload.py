@@ -0,0 +1,135 @@
+"""
+Tests for the columnar drill-down payload encoding.
+"""
+
+import base64
+import json
+import zlib
+import numpy as np
+import pandas as pd
+import pytest
+from luxin.payload import encode_frame, build_drill_payload, encode_row_groups
+
+
+def _decode(buffer):
+    """Decode a base64 typed array buffer to a NumPy array."""
+    raw = base64.b64decode(buffer['base64'])
+    if buffer.get('deflate'):
+        raw = zlib.decompress(raw)
+    dtype = {'float64': '<f8', 'int32': '<i4', 'int16': '<i2', 'int8': 'i1', 'uint8': 'u1'}[buffer['dtype']]
+    return np.frombuffer(raw, dtype=dtype)
+
+
+def test_encode_frame_numeric_typed_arrays():
+    """Test that numeric columns become little-endian typed arrays."""
+    df = pd.DataFrame({'a': [1, 2, 3], 'b': [1.5, np.nan, 2.25], 'big': [2**40, 0, 1]})
+    
+    encoded = json.loads(encode_frame(df))
+    
+    assert encoded['columns'] == ['a', 'b', 'big']
+    assert encoded['length'] == 3
+    # Integers use the smallest typed array that holds them
+    assert encoded['data'][0]['values']['dtype'] == 'int8'
+    assert _decode(encoded['data'][0]['values']).tolist() == [1, 2, 3]
+    np.testing.assert_array_equal(_decode(encoded['data'][1]['values']), [1.5, np.nan, 2.25])
+    # Integers outside the Int32Array range fall back to Float64Array
+    assert encoded['data'][2]['values']['dtype'] == 'float64'
+    assert _decode(encoded['data'][2]['values']).tolist() == [2**40, 0, 1]
+
+
+def test_encode_frame_booleans():
+    """Test that booleans are bytes, with 2 marking missing values."""
+    df = pd.DataFrame({'flag': pd.array([True, False, None], dtype='boolean')})
+    
+    encoded = json.loads(encode_frame(df))
+    
+    assert _decode(encoded['data'][0]['values']).tolist() == [1, 0, 2]
+
+
+def test_encode_frame_deflate():
+    """Test that compressed buffers decode to the same values."""
+    df = pd.DataFrame({'value': np.arange(1000, dtype='float64')})
+    
+    plain = encode_frame(df)
+    compressed = encode_frame(df, compression='deflate')
+    
+    assert len(compressed) < len(plain)
+    buffer = json.loads(compressed)['data'][0]['values']
+    assert buffer['deflate'] is True
+    np.testing.assert_array_equal(_decode(buffer), np.arange(1000))
+    
+    with pytest.raises(ValueError, match="Unsupported compression"):
+        encode_frame(df, compression='brotli')
+
+
+def test_encode_frame_rows_and_chunked_buffers():
+    """Test row selection and buffers larger than one encoding chunk."""
+    df = pd.DataFrame({'value': np.arange(10, dtype='float64'), 'label': list('abcdefghij')})
+    
+    assert encode_frame(df, rows=np.array([7, 2])) == encode_frame(df.take([7, 2]))
+    
+    big = pd.DataFrame({'value': np.random.default_rng(0).random(500_000)})
+    for compression in (None, 'deflate'):
+        buffer = json.loads(encode_frame(big, compression))['data'][0]['values']
+        np.testing.assert_array_equal(_decode(buffer), big['value'].to_numpy())
+
+
+def test_encode_frame_dictionary_encodes_strings():
+    """Test that string columns store each distinct value once."""
+    df = pd.DataFrame({'city': ['NYC', 'LA', 'NYC', None]})
+    
+    encoded = json.loads(encode_frame(df))
+    
+    assert encoded['data'][0]['dict'] == ['NYC', 'LA']
+    assert _decode(encoded['data'][0]['codes']).tolist() == [0, 1, 0, -1]
+
+
+def test_encode_frame_complex_as_text():
+    """Test that complex numbers keep their imaginary part, as text."""
+    df = pd.DataFrame({'z': np.array([1 + 2j, 3 - 1j, 1 + 2j])})
+    
+    encoded = json.loads(encode_frame(df))
+    
+    assert encoded['data'][0]['dict'] == ['(1+2j)', '(3-1j)']
+    assert _decode(encoded['data'][0]['codes']).tolist() == [0, 1, 0]
+
+
+def test_encode_frame_is_script_safe():
+    """Test that embedded text cannot close the surrounding script element."""
+    df = pd.DataFrame({'note': ['</script><b>']})
+    
+    text = encode_frame(df)
+    
+    assert '</script>' not in text
+    assert json.loads(text)['data'][0]['dict'] == ['</script><b>']
+
+
+def test_build_drill_payload_positions():
+    """Test that groups refer to embedded rows by position."""
+    detail_df = pd.DataFrame({'value': [10, 20, 30, 40]}, index=[100, 101, 102, 103])
+    source_mapping = {('A',): [103, 100], ('B',): [101]}
+    
+    payload = build_drill_payload(detail_df, source_mapping)
+    detail_data = json.loads(payload['detail_data'])
+    starts = _decode(json.loads(payload['group_starts'])).tolist()
+    rows = _decode(json.loads(payload['group_rows'])).tolist()
+    
+    values = _decode(detail_data['data'][0]['values']).tolist()
+    assert values == [10, 20, 40]
+    assert starts == [0, 2, 3]
+    assert [values[i] for i in rows[0:2]] == [40, 10]
+    assert [values[i] for i in rows[2:3]] == [20]
+    assert _decode(json.loads(payload['group_sizes'])).tolist() == [2, 1]
+
+
+def test_encode_row_groups():
+    """Test matching aggregate rows to groups, including missing groups."""
+    agg_df = pd.DataFrame(
+        {'value': [1, 2, 3]},
+        index=pd.MultiIndex.from_tuples([('b', 1), ('a', 1), ('c', 9)], names=['x', 'y'])
+    )
+    source_mapping = {('a', 1): [0], ('b', 1): [1]}
+    
+    row_groups = _decode(json.loads(encode_row_groups(agg_df, source_mapping)))
+    
+    assert row_groups.tolist() == [1, 0, -1]
@@ -0,0 +1,193 @@
+"""Tests for timing spans and the performance panel."""
+
+import logging
+import threading
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from luxin import perf, Inspector, TrackedDataFrame
+from luxin.config import InspectorConfig
+from luxin.components.perf_panel import SESSION_SINK_KEY, render_perf_panel, _last_rerun
+
+
+@pytest.fixture(autouse=True)
+def _disable_perf():
+    """Leave instrumentation off for other tests."""
+    perf.disable()
+    yield
+    perf.disable()
+
+
+def test_span_disabled_is_shared_noop():
+    """Test that spans cost no allocation while instrumentation is off."""
+    assert not perf.is_enabled()
+    assert perf.span('a') is perf.span('b', rows=1)
+    with perf.span('a'):
+        pass
+
+
+def test_nested_spans_record_depth():
+    """Test that nested spans are recorded with their depth."""
+    buffer = perf.RingBufferSink()
+    perf.enable(buffer)
+    
+    with perf.span('outer', rows=3):
+        with perf.span('inner'):
+            pass
+    
+    records = buffer.records()
+    assert [(r.name, r.depth) for r in records] == [('inner', 1), ('outer', 0)]
+    assert records[1].attributes == {'rows': 3}
+    assert records[1].duration >= records[0].duration >= 0
+
+
+def test_timed_decorator():
+    """Test that decorated functions are recorded only while enabled."""
+    calls = []
+    
+    @perf.timed('stage')
+    def work(x):
+        return x * 2
+    
+    assert work(2) == 4
+    perf.enable(calls.append)
+    assert work(3) == 6
+    assert [r.name for r in calls] == ['stage']
+
+
+def test_span_recorded_on_exception():
+    """Test that a span is recorded when its block raises."""
+    buffer = perf.RingBufferSink()
+    perf.enable(buffer)
+    
+    with pytest.raises(ValueError):
+        with perf.span('failing'):
+            raise ValueError("boom")
+    
+    assert [r.name for r in buffer.records()] == ['failing']
+    with perf.span('after'):
+        pass
+    assert buffer.records()[-1].depth == 0
+
+
+def test_broken_sink_does_not_break_code():
+    """Test that sink errors are logged, not raised."""
+    buffer = perf.RingBufferSink()
+    
+    def broken(record):
+        raise RuntimeError("sink down")
+    
+    perf.enable(broken, buffer)
+    with perf.span('stage'):
+        pass
+    
+    assert [r.name for r in buffer.records()] == ['stage']
+
+
+def test_logging_sink(caplog):
+    """Test that the logging sink logs span timings."""
+    perf.enable(perf.LoggingSink())
+    
+    with caplog.at_level(logging.DEBUG, logger='luxin.perf'):
+        with perf.span('display.render_html', rows=10):
+            pass
+    
+    assert 'display.render_html took' in caplog.text
+    assert 'rows=10' in caplog.text
+
+
+def test_ring_buffer_capacity_and_last_trace():
+    """Test that the ring buffer drops old spans and finds the last trace."""
+    buffer = perf.RingBufferSink(capacity=3)
+    perf.enable(buffer)
+    
+    for name in ('first', 'second'):
+        with perf.span(name):
+            with perf.span(f'{name}.child'):
+                pass
+    
+    assert [r.name for r in buffer.records()] == ['first', 'second.child', 'second']
+    assert [r.name for r in buffer.last_trace()] == ['second.child', 'second']
+    buffer.clear()
+    assert buffer.last_trace() == []
+
+
+def test_ring_buffer_enables_once():
+    """Test that ring_buffer() reuses the active buffer."""
+    buffer = perf.ring_buffer()
+    
+    assert perf.is_enabled()
+    assert perf.ring_buffer() is buffer
+    perf.disable()
+    assert perf.ring_buffer() is not buffer
+
+
+def test_groupby_stages_are_timed():
+    """Test that a tracked aggregation records its stages."""
+    buffer = perf.ring_buffer()
+    df = TrackedDataFrame({'category': ['A', 'A', 'B'], 'value': [1, 2, 3]})
+    
+    df.groupby('category').agg({'value': 'sum'})
+    
+    assert [r.name for r in buffer.records()] == ['groupby.agg', 'groupby.source_mapping']
+
+
+def test_last_rerun_includes_work_before_render():
+    """Test that the panel shows the spans since the previous render."""
+    records = [
+        perf.SpanRecord('groupby.agg', 0.1, 0, 1.0),
+        perf.SpanRecord('inspector.render', 0.2, 0, 2.0),
+        perf.SpanRecord('groupby.agg', 0.1, 0, 3.0),
+        perf.SpanRecord('filters.apply', 0.05, 1, 4.1),
+        perf.SpanRecord('inspector.render', 0.3, 0, 4.0),
+    ]
+    
+    assert [r.started for r in _last_rerun(records)] == [3.0, 4.1, 4.0]
+
+
+def test_inspector_perf_panel():
+    """Test that Inspector shows the rerun breakdown when configured."""
+    df = TrackedDataFrame({'category': ['A', 'B'], 'value': [1, 2]})
+    agg = df.groupby('category').agg({'value': 'sum'})
+    
+    with patch('luxin.inspector.st'), \
+         patch('luxin.components.table_view.render_table_view'), \
+         patch('luxin.components.perf_panel.st') as mock_st:
+        mock_st.session_state = {}
+        Inspector(agg, config=InspectorConfig(show_perf_panel=True)).render()
+    
+    table = mock_st.dataframe.call_args[0][0]
+    assert isinstance(table, pd.DataFrame)
+    assert table['Stage'].tolist() == ['inspector.render']
+    assert isinstance(mock_st.session_state[SESSION_SINK_KEY], perf.RingBufferSink)
+    assert not perf.is_enabled()
+
+
+def test_capture_records_current_thread_only():
+    """Test that a capture ignores spans from other threads and then turns off."""
+    buffer = perf.RingBufferSink()
+    
+    def other_session():
+        with perf.span('other'):
+            pass
+    
+    with perf.capture(buffer):
+        assert perf.is_enabled()
+        with perf.span('mine'):
+            thread = threading.Thread(target=other_session)
+            thread.start()
+            thread.join()
+    with perf.span('after'):
+        pass
+    
+    assert [r.name for r in buffer.records()] == ['mine']
+    assert not perf.is_enabled()
+
+
+def test_perf_panel_without_records():
+    """Test the panel before anything was recorded."""
+    with patch('luxin.components.perf_panel.st') as mock_st:
+        render_perf_panel(perf.RingBufferSink())
+    
+    mock_st.caption.assert_called_once()
+    mock_st.dataframe.assert_not_called()
@@ -0,0 +1,99 @@
+"""Tests for standalone HTML report export."""
+
+import pytest
+import numpy as np
+import pandas as pd
+from luxin import TrackedDataFrame, export_report
+from tests.test_display import _embedded_column, _embedded_groups, _embedded_json, _decode_buffer
+
+
+def _tracked_agg(n_rows=300, n_groups=3):
+    """Aggregate a tracked DataFrame with unique text per detail row."""
+    df = TrackedDataFrame({
+        'category': [f'G{i % n_groups}' for i in range(n_rows)],
+        'value': np.arange(n_rows),
+        'note': [f'note {i} ' * 5 for i in range(n_rows)],
+    })
+    return df.groupby('category').agg({'value': 'sum'})
+
+
+def test_export_report_writes_standalone_html(tmp_path):
+    """Test that the report embeds the runtime and every detail row."""
+    agg = _tracked_agg()
+    path = tmp_path / 'report.html'
+    
+    size = export_report(agg, path)
+    
+    html = path.read_text(encoding='utf-8')
+    assert size == len(html.encode('utf-8'))
+    assert 'window.luxin' in html
+    assert '"kernelFetch":false' in html
+    assert '"deflate":true' in html
+    assert sorted(_embedded_column(html, 'value')) == list(range(300))
+
+
+def test_export_report_top_n_by_column(tmp_path):
+    """Test that top_n keeps the largest sort_by values of each group."""
+    agg = _tracked_agg()
+    path = tmp_path / 'report.html'
+    
+    export_report(agg, path, top_n=2, sort_by='value')
+    
+    html = path.read_text(encoding='utf-8')
+    values = _embedded_column(html, 'value')
+    shown = [[values[row] for row in group] for group in _embedded_groups(html)]
+    assert shown == [[297, 294], [298, 295], [299, 296]]
+    # Totals still count every row of the group
+    assert _decode_buffer(_embedded_json(html, 'groupSizes')) == [100, 100, 100]
+
+
+def test_export_report_respects_max_bytes(tmp_path):
+    """Test that detail rows are dropped to fit the size budget."""
+    agg = _tracked_agg(n_rows=3000)
+    path = tmp_path / 'report.html'
+    unbounded = export_report(agg, tmp_path / 'full.html', compression=None)
+    max_bytes = unbounded - 50_000
+    
+    size = export_report(agg, path, max_bytes=max_bytes, compression=None)
+    
+    html = path.read_text(encoding='utf-8')
+    assert size <= max_bytes
+    embedded = [len(group) for group in _embedded_groups(html)]
+    assert 0 < sum(embedded) < 3000
+
+
+def test_export_report_drops_agg_rows_that_do_not_fit(tmp_path):
+    """Test that trailing aggregated rows are left out of a tiny budget."""
+    agg = _tracked_agg(n_rows=2000, n_groups=1000)
+    path = tmp_path / 'report.html'
+    empty = export_report(agg.iloc[:0], tmp_path / 'empty.html', compression=None)
+    
+    size = export_report(agg, path, max_bytes=empty + 2000, compression=None)
+    
+    html = path.read_text(encoding='utf-8')
+    assert size <= empty + 2000
+    assert 0 < _embedded_json(html, 'aggData')['length'] < 1000
+
+
+def test_export_report_plain_dataframe(tmp_path):
+    """Test exporting a plain aggregate with its detail DataFrame."""
+    detail_df = pd.DataFrame({'category': ['A', 'A', 'B'], 'value': [1, 2, 3]})
+    agg_df = detail_df.groupby('category').sum()
+    path = tmp_path / 'report.html'
+    
+    export_report(agg_df, path, detail_df=detail_df, groupby_cols=['category'])
+    
+    html = path.read_text(encoding='utf-8')
+    assert _embedded_groups(html) == [[0, 1], [2]]
+
+
+def test_export_report_errors(tmp_path):
+    """Test invalid export arguments."""
+    agg = _tracked_agg()
+    
+    with pytest.raises(ValueError, match="detail_df and groupby_cols"):
+        export_report(pd.DataFrame({'a': [1]}), tmp_path / 'a.html')
+    with pytest.raises(ValueError, match="sort_by column 'missing'"):
+        export_report(agg, tmp_path / 'b.html', sort_by='missing')
+    with pytest.raises(ValueError, match="too small"):
+        export_report(agg, tmp_path / 'c.html', max_bytes=100)
@@ -0,0 +1,92 @@
+"""Tests for cached and incremental summary statistics."""
+
+import pytest
+import numpy as np
+import pandas as pd
+from luxin.stats import SummaryStats, get_summary_stats, clear_stats_cache, stats_cache_nbytes, trim_stats_cache
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_stats_cache()
+    yield
+    clear_stats_cache()
+
+
+def test_summary_stats_matches_describe():
+    """Test that small frames reproduce DataFrame.describe()."""
+    df = pd.DataFrame({
+        'category': ['A', 'B', 'C', 'D'],
+        'sales': [100.0, 250.0, np.nan, 75.0],
+        'quantity': [1, 5, 3, 2]
+    })
+    
+    result = SummaryStats.from_frame(df).to_frame()
+    
+    pd.testing.assert_frame_equal(result, df.describe())
+
+
+def test_summary_stats_incremental_update():
+    """Test that updating batch by batch matches describing all rows."""
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'x': rng.normal(size=3000), 'y': rng.integers(0, 100, size=3000)})
+    
+    stats = SummaryStats(exact_quantiles=True)
+    for start in range(0, len(df), 700):
+        stats.update(df.iloc[start:start + 700])
+    
+    pd.testing.assert_frame_equal(stats.to_frame(), df.describe())
+
+
+def test_summary_stats_approximate_quantiles():
+    """Test that sampled quantiles are close for large columns."""
+    values = np.arange(100_000, dtype=float)
+    df = pd.DataFrame({'x': values})
+    
+    stats = SummaryStats.from_frame(df, sample_size=5_000)
+    result = stats.to_frame()['x']
+    
+    assert not stats.is_exact('x')
+    assert result['count'] == 100_000
+    assert result['mean'] == pytest.approx(values.mean())
+    assert result['min'] == 0 and result['max'] == 99_999
+    assert result['50%'] == pytest.approx(50_000, rel=0.05)
+
+
+def test_summary_stats_approximate_after_updates():
+    """Test that the sample stays bounded and representative across updates."""
+    stats = SummaryStats(sample_size=5_000)
+    for start in range(0, 200_000, 20_000):
+        stats.update(pd.DataFrame({'x': np.arange(start, start + 20_000, dtype=float)}))
+    
+    result = stats.to_frame()['x']
+    assert len(stats._values['x']) == 5_000
+    assert result['25%'] == pytest.approx(50_000, rel=0.1)
+    assert result['75%'] == pytest.approx(150_000, rel=0.1)
+
+
+def test_get_summary_stats_cached_by_fingerprint():
+    """Test that equal frames reuse the cached statistics."""
+    df1 = pd.DataFrame({'x': [1.0, 2.0, 3.0]})
+    df2 = pd.DataFrame({'x': [1.0, 2.0, 3.0]})
+    
+    assert get_summary_stats(df1) is get_summary_stats(df2)
+    assert get_summary_stats(df1) is not get_summary_stats(df1, exact_quantiles=True)
+
+
+def test_get_summary_stats_non_numeric():
+    """Test that frames without numeric columns fall back to describe()."""
+    df = pd.DataFrame({'name': ['a', 'b', 'a']})
+    
+    pd.testing.assert_frame_equal(get_summary_stats(df), df.describe())
+
+
+def test_trim_stats_cache_keeps_most_recent():
+    """Test that trimming evicts old statistics but keeps the latest."""
+    get_summary_stats(pd.DataFrame({'x': [1.0, 2.0]}))
+    latest = get_summary_stats(pd.DataFrame({'x': [3.0, 4.0]}))
+    
+    trim_stats_cache(0)
+    
+    assert stats_cache_nbytes() == latest.memory_usage(deep=True).sum()
+    assert get_summary_stats(pd.DataFrame({'x': [3.0, 4.0]})) is latest
@@ -110,3 +110,79 @@ def test_render_table_view_no_summary_stats(mock_export, mock_filters, mock_st):
     expander_calls = [call[0][0] for call in mock_st.expander.call_args_list]
     assert "Summary Statistics" not in str(expander_calls)
 
+
+@patch('luxin.components.table_view.st')
+@patch('luxin.components.table_view.render_filters')
+@patch('luxin.components.table_view.render_export_buttons')
+def test_render_table_view_performance_settings(mock_export, mock_filters, mock_st):
+    """Test the frontend row cap and on-demand exports."""
+    agg_df = pd.DataFrame({'value': range(10)}, index=pd.Index(list('abcdefghij'), name='key'))
+    detail_df = pd.DataFrame({'value': range(10)})
+    source_mapping = {(key,): [i] for i, key in enumerate(agg_df.index)}
+    config = InspectorConfig(
+        max_frontend_rows=4, max_filter_cardinality=7, lazy_exports=True, export_formats=('csv',)
+    )
+    
+    mock_st.columns = MagicMock(return_value=(MagicMock(), MagicMock()))
+    mock_st.dataframe = MagicMock(return_value=MagicMock(selection=MagicMock(rows=[])))
+    mock_filters.side_effect = lambda df, **kwargs: df
+    
+    render_table_view(agg_df, detail_df, source_mapping, ['key'], config)
+    
+    assert mock_filters.call_args[1]['max_cardinality'] == 7
+    assert len(mock_st.dataframe.call_args_list[0][0][0]) == 4
+    exported = mock_export.call_args[0][0]
+    assert callable(exported)
+    assert len(exported()) == 10
+    assert mock_export.call_args[1]['formats'] == ('csv',)
+
+
+@patch('luxin.components.table_view.st')
+@patch('luxin.components.table_view.render_filters')
+@patch('luxin.components.table_view.render_export_buttons')
+def test_render_table_view_table_key_survives_reruns(mock_export, mock_filters, mock_st):
+    """Test that an equal aggregate rebuilt on a rerun keeps the table key."""
+    agg_df = pd.DataFrame({'category': ['A', 'B'], 'value': [30, 70]})
+    detail_df = pd.DataFrame({'category': ['A', 'A', 'B', 'B'], 'value': [10, 20, 30, 40]})
+    source_mapping = {('A',): [0, 1], ('B',): [2, 3]}
+    
+    mock_st.columns = MagicMock(return_value=(MagicMock(), MagicMock()))
+    mock_st.dataframe = MagicMock(return_value=MagicMock(selection=MagicMock(rows=[])))
+    mock_st.session_state = {}
+    mock_filters.side_effect = lambda df, **kwargs: df
+    
+    render_table_view(agg_df, detail_df, source_mapping, ['category'], InspectorConfig())
+    render_table_view(agg_df.copy(), detail_df, source_mapping, ['category'], InspectorConfig())
+    render_table_view(agg_df.iloc[::-1], detail_df, source_mapping, ['category'], InspectorConfig())
+    
+    keys = [call[1]['key'] for call in mock_st.dataframe.call_args_list if 'on_select' in call[1]]
+    assert keys[0] == keys[1] != keys[2]
+    assert keys[0].startswith('luxin_table_')
+
+
+@patch('luxin.components.table_view.st')
+@patch('luxin.components.table_view.render_filters')
+@patch('luxin.components.table_view.render_export_buttons')
+@patch('luxin.components.table_view._show_row_details')
+def test_render_table_view_selection_in_filtered_rows(mock_details, mock_export, mock_filters, mock_st):
+    """Test that a row selected in the filtered table maps to its aggregated row."""
+    from luxin.components.filters import FilterPlan
+    
+    agg_df = pd.DataFrame({'value': [10, 20, 30]}, index=pd.Index(['A', 'B', 'C'], name='category'))
+    detail_df = pd.DataFrame({'category': ['A', 'B', 'C'], 'value': [10, 20, 30]})
+    source_mapping = {('A',): [0], ('B',): [1], ('C',): [2]}
+    plan = FilterPlan(categories={'category': ['C']})
+    
+    def render_filters(df, key_prefix, **kwargs):
+        mock_st.session_state[f"{key_prefix}_plan"] = plan
+        return plan.apply(df, fingerprint=kwargs['fingerprint'])
+    
+    mock_st.columns = MagicMock(return_value=(MagicMock(), MagicMock()))
+    mock_st.dataframe = MagicMock(return_value=MagicMock(selection=MagicMock(rows=[0])))
+    mock_st.session_state = {}
+    mock_filters.side_effect = render_filters
+    
+    render_table_view(agg_df, detail_df, source_mapping, ['category'], InspectorConfig())
+    
+    # The only row shown is C, the third aggregated row
+    assert mock_details.call_args[0][0] == 2
@@ -90,3 +90,20 @@ def test_show_drill_table_requires_aggregation():
     with pytest.raises(ValueError, match="can only be called on aggregated DataFrames"):
         df.show_drill_table()
 
+
+
+def test_source_mapping_index_labels():
+    """Test the mapping for unordered, duplicate and missing keys."""
+    data = {
+        'category': ['B', 'A', None, 'B', 'A', 'B'],
+        'value': [1, 2, 3, 4, 5, 6]
+    }
+    
+    unique = TrackedDataFrame(data).groupby('category').agg({'value': 'sum'})
+    assert unique._source_mapping == {('A',): [1, 4], ('B',): [0, 3, 5]}
+    
+    # Labels out of order and repeated come back sorted and unique
+    df = TrackedDataFrame(data, index=[9, 7, 5, 3, 3, 1])
+    result = df.groupby('category', dropna=False).agg({'value': 'sum'})
+    assert list(result._source_mapping)[:2] == [('A',), ('B',)]
+    assert list(result._source_mapping.values()) == [[3, 7], [1, 3, 9], [5]]
@@ -1,8 +1,10 @@
 """Tests for utility functions."""
 
+import types
 import pytest
+import numpy as np
 import pandas as pd
-from luxin.utils import optimize_source_mapping, chunk_dataframe
+from luxin.utils import optimize_source_mapping, chunk_dataframe, frame_fingerprint, index_fingerprint, iter_chunks
 
 
 def test_optimize_source_mapping():
@@ -38,6 +40,54 @@ def test_optimize_source_mapping_already_optimized():
     
     # Should remain the same
     assert optimized == source_mapping
+    # Sorted groups are copied, so the result does not alias the input
+    assert optimized[('A',)] is not source_mapping[('A',)]
+    optimized[('A',)].append(9)
+    assert source_mapping[('A',)] == [0, 1, 2]
+
+
+def test_optimize_source_mapping_many_groups():
+    """Test that groups are deduplicated separately in one pass."""
+    source_mapping = {(g,): [g + 20, g, g + 20, g - 5] for g in range(100)}
+    
+    optimized = optimize_source_mapping(source_mapping)
+    
+    assert optimized == {(g,): [g - 5, g, g + 20] for g in range(100)}
+    assert all(type(label) is int for labels in optimized.values() for label in labels)
+
+
+def test_optimize_source_mapping_large_groups():
+    """Test that checked groups are copied and the others sorted and deduplicated."""
+    source_mapping = {
+        ('A',): list(range(0, 100, 2)),
+        ('B',): list(range(100, 0, -1)) + [50],
+        ('C',): list(range(1, 100, 2)),
+    }
+    
+    optimized = optimize_source_mapping(source_mapping)
+    
+    assert optimized == {
+        ('A',): list(range(0, 100, 2)),
+        ('B',): list(range(1, 101)),
+        ('C',): list(range(1, 100, 2)),
+    }
+    assert optimized[('A',)] is not source_mapping[('A',)]
+
+
+def test_optimize_source_mapping_label_types():
+    """Test that labels keep their types, including non-numeric labels."""
+    source_mapping = {
+        ('A',): [2.5, 1, 1],
+        ('B',): ['y', 'x', 'y'],
+        ('C',): [('b', 1), ('a', 2)],
+    }
+    
+    optimized = optimize_source_mapping(source_mapping)
+    
+    assert optimized[('A',)] == [1, 2.5]
+    assert type(optimized[('A',)][0]) is int
+    assert optimized[('B',)] == ['x', 'y']
+    assert optimized[('C',)] == [('a', 2), ('b', 1)]
 
 
 def test_chunk_dataframe():
@@ -76,3 +126,105 @@ def test_chunk_dataframe_exact_size():
     assert len(chunks) == 1
     assert len(chunks[0]) == 100
 
+
+def test_iter_chunks_lazy_views():
+    """Test that chunks are produced lazily and share the frame's data."""
+    df = pd.DataFrame({'a': np.arange(250), 'b': np.arange(250) * 2.0, 'c': ['x'] * 250})
+    
+    chunks = iter_chunks(df, chunk_size=100, columns=['b', 'a'])
+    
+    assert isinstance(chunks, types.GeneratorType)
+    chunks = list(chunks)
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+    assert all(list(chunk.columns) == ['b', 'a'] for chunk in chunks)
+    assert np.shares_memory(chunks[1]['a'].to_numpy(), df['a'].to_numpy())
+    pd.testing.assert_frame_equal(pd.concat(chunks), df[['b', 'a']])
+
+
+def test_iter_chunks_prefetch():
+    """Test that prefetched chunks match and errors reach the caller."""
+    df = pd.DataFrame({'a': range(1000)})
+    
+    sums = list(iter_chunks(df, chunk_size=64, transform=lambda c: c['a'].sum(), prefetch=2))
+    assert sums == [c['a'].sum() for c in chunk_dataframe(df, chunk_size=64)]
+    
+    # Stopping early releases the background thread
+    chunks = iter_chunks(df, chunk_size=10, prefetch=1)
+    assert len(next(chunks)) == 10
+    chunks.close()
+    
+    def fail(chunk):
+        raise RuntimeError("bad chunk")
+    
+    with pytest.raises(RuntimeError, match="bad chunk"):
+        list(iter_chunks(df, chunk_size=100, transform=fail, prefetch=1))
+
+
+def test_iter_chunks_invalid_arguments():
+    """Test that bad chunk sizes and columns are rejected up front."""
+    df = pd.DataFrame({'a': [1, 2]})
+    
+    with pytest.raises(ValueError, match="chunk_size"):
+        iter_chunks(df, chunk_size=0)
+    with pytest.raises(KeyError):
+        iter_chunks(df, columns=['missing'])
+
+
+
+def test_frame_fingerprint_content_based():
+    """Test that fingerprints depend on content, not object identity."""
+    df1 = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']})
+    df2 = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']})
+    
+    assert frame_fingerprint(df1) == frame_fingerprint(df2)
+    assert frame_fingerprint(df1) != frame_fingerprint(df1.iloc[::-1])
+    assert frame_fingerprint(df1) != frame_fingerprint(df1.rename(columns={'a': 'c'}))
+    assert frame_fingerprint(df1) != frame_fingerprint(df1.astype({'a': float}))
+
+
+def test_frame_fingerprint_unhashable_values():
+    """Test fingerprinting DataFrames holding unhashable values."""
+    df = pd.DataFrame({'a': [[1, 2], [3]]})
+    
+    assert frame_fingerprint(df) == frame_fingerprint(df.copy())
+    assert frame_fingerprint(pd.DataFrame()) == frame_fingerprint(pd.DataFrame())
+
+
+def test_frame_fingerprint_memoized_per_object(monkeypatch):
+    """Test that a DataFrame is hashed once while it lives and keeps its shape."""
+    from luxin import utils
+    
+    df = pd.DataFrame({'a': range(100), 'b': ['x'] * 100})
+    calls = []
+    hash_frame = utils._hash_frame
+    monkeypatch.setattr(utils, '_hash_frame', lambda *args: calls.append(1) or hash_frame(*args))
+    
+    first = frame_fingerprint(df)
+    assert frame_fingerprint(df) == first
+    assert len(calls) == 1
+    
+    # An equal new object is hashed and gets the same fingerprint
+    assert frame_fingerprint(df.copy()) == first
+    assert len(calls) == 2
+    
+    # A new column changes the header, so the object is hashed again
+    df['c'] = 1.0
+    assert frame_fingerprint(df) != first
+    assert len(calls) == 3
+    
+    key = id(df)
+    del df
+    assert key not in utils._fingerprint_cache
+
+
+def test_index_fingerprint_content_based():
+    """Test that index fingerprints depend on labels, dtype and names."""
+    index = pd.Index(['b', 'a', 'c'], name='key')
+    
+    assert index_fingerprint(index) == index_fingerprint(index.copy())
+    assert index_fingerprint(index) != index_fingerprint(index[::-1])
+    assert index_fingerprint(index) != index_fingerprint(index.rename('other'))
+    assert index_fingerprint(pd.RangeIndex(3)) != index_fingerprint(pd.Index([0, 1, 2], dtype='int32'))
+    # Labels pandas cannot hash are fingerprinted through their text
+    mixed = pd.Index([1, 'a', (1, 2)], dtype=object)
+    assert index_fingerprint(mixed) == index_fingerprint(mixed.copy())
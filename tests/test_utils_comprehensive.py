@@ -4,24 +4,71 @@ Comprehensive tests for utility functions.
 
 import pytest
 import pandas as pd
-from luxin.utils import get_cached_index_mapping, optimize_source_mapping, chunk_dataframe
+from luxin import utils
+from luxin.utils import (
+    IndexResolver,
+    clear_resolver_cache,
+    get_index_resolver,
+    optimize_source_mapping,
+    chunk_dataframe,
+)
+
+
+def test_index_resolver_range_index():
+    """Test label lookups against a RangeIndex."""
+    resolver = IndexResolver(pd.RangeIndex(0, 20, 2))
+    
+    assert resolver.positions([0, 4, 18]).tolist() == [0, 2, 9]
+    assert resolver.positions([5, 20, -2]).tolist() == [-1, -1, -1]
+
+
+def test_index_resolver_sorted_and_hashed():
+    """Test that sorted numeric and other indexes give the same answers."""
+    labels = [9, 3, 4, 100]
+    sorted_resolver = IndexResolver(pd.Index([3, 5, 9]))
+    hashed_resolver = IndexResolver(pd.Index([9, 3, 5]))
+    
+    assert sorted_resolver.positions(labels).tolist() == [2, 0, -1, -1]
+    assert hashed_resolver.positions(labels).tolist() == [0, 1, -1, -1]
+    assert IndexResolver(pd.Index(['a', 'b'])).positions(['b', 'z']).tolist() == [1, -1]
+    multi = IndexResolver(pd.MultiIndex.from_tuples([(1, 'a'), (2, 'b')]))
+    assert multi.positions([(2, 'b'), (3, 'c')]).tolist() == [1, -1]
+
+
+def test_index_resolver_non_unique():
+    """Test that a non-unique index returns every matching position."""
+    resolver = IndexResolver(pd.Index([1, 1, 2]))
+    
+    assert resolver.positions([1, 3]).tolist() == [0, 1]
+    assert resolver.contains([1, 3]).tolist() == [True, False]
+
+
+def test_index_resolver_group_positions():
+    """Test bulk translation of several label lists."""
+    resolver = IndexResolver(pd.Index([10, 20, 30]))
+    
+    groups = resolver.group_positions([[20, 99], [10, 30], []])
+    
+    assert [positions.tolist() for positions in groups] == [[1], [0, 2], []]
 
 
-def test_get_cached_index_mapping():
-    """Test get_cached_index_mapping function."""
-    # Test with empty tuple (should return empty dict)
-    result = get_cached_index_mapping(())
-    assert isinstance(result, dict)
-    assert len(result) == 0
+def test_get_index_resolver_cache():
+    """Test that resolvers are cached by index content."""
+    clear_resolver_cache()
+    index = pd.Index([1, 2, 3])
     
-    # Test with non-empty tuple
-    result = get_cached_index_mapping((1, 2, 3))
-    assert isinstance(result, dict)
+    first = get_index_resolver(index)
+    assert get_index_resolver(index) is first
+    # An equal index arriving as a new object reuses the resolver
+    assert get_index_resolver(pd.Index([1, 2, 3])) is first
+    assert get_index_resolver(pd.Index([3, 2, 1])) is not first
+    assert get_index_resolver(pd.Index([1, 2, 3]), fingerprint='abc') is not first
     
-    # Test caching (same input should return same object due to lru_cache)
-    result1 = get_cached_index_mapping((1, 2, 3))
-    result2 = get_cached_index_mapping((1, 2, 3))
-    assert result1 is result2
+    # Only one entry per distinct index, however many equal objects arrive
+    for _ in range(20):
+        get_index_resolver(pd.Index([1, 2, 3]))
+    assert len(utils._resolver_cache) == 3
+    clear_resolver_cache()
 
 
 def test_optimize_source_mapping_with_duplicates():